@@ -0,0 +1,55 @@
+#! /usr/bin/python
+
+"""aa_stub.py
+Stand-in for Stephen Moshier's aa with the same input protocol as used by
+celnav.aaStarTable() (aa.ini in the working directory, date, interval,
+number of tabulations, 88 and catalogue file/star number pairs on stdin)
+and output lines in aa's format for magnitude, topocentric altitude and
+azimuth and apparent R.A./Dec. The values are not ephemeris data but
+functions of the input (see expected()), so results can be checked for
+each star and observer. An optional argument delays each star by that many
+seconds to simulate aa's run time:
+
+    AA_EXE_FILE = python bench/aa_stub.py 0.05
+"""
+
+import sys
+import time
+
+
+def expected(lat, lon, ut, starNum):
+    """Returns tuple (mag, alt, az, dec, raHours) the stub prints for starNum
+    at ut for an observer at lat/lon (E = -)
+    """
+    return (starNum / 10.0, (lat + starNum + ut[3]) % 90, (lon + 5.0 * starNum) % 360,
+            -(starNum % 60) + 0.5, (starNum + ut[4] / 60.0) % 24)
+
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+
+    ini = [l.strip() for l in open('aa.ini')]
+    (lon, lat) = (float(ini[0]), float(ini[1]))
+
+    lines = [l.strip() for l in sys.stdin]
+    ut = [int(x) for x in lines[:6]]
+    if lines[8] != '88':
+        return
+    i = 9
+    while i + 1 < len(lines) and lines[i] != '-1':
+        n = int(lines[i + 1])
+        i += 2
+        time.sleep(delay)
+
+        (mag, alt, az, dec, ra) = expected(lat, lon, ut, n)
+        d = abs(dec)
+        print 'approx. visual magnitude %.2f' % mag
+        print 'Topocentric:  Altitude %.3f deg, Azimuth %.3f deg' % (alt, az)
+        print '   Apparent:  R.A. %2dh %2dm %6.3fs  Dec. %s%2dd %2d\' %5.2f"' % (int(ra),
+                int(ra * 60) % 60, ra * 3600 % 60, '- ' if dec < 0 else '', int(d),
+                int(d * 60) % 60, d * 3600 % 60)
+        print
+
+
+if __name__ == '__main__':
+    main()
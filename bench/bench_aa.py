@@ -0,0 +1,83 @@
+#! /usr/bin/python
+
+"""bench_aa.py
+Benchmark and check for the aa interface of celnav, run against the stub
+bench/aa_stub.py (no aa installation needed): one run per star vs. one
+aaStarTable() run for all 58 stars, and many observers calculated
+sequentially vs. concurrently by aaStarTables() and aaStarTableAsync().
+Every result is compared with the values the stub derives from its input,
+so crosstalk between concurrent calls would show up as mismatches. Run
+from the package root:
+
+    python bench/bench_aa.py
+"""
+
+import os
+import sys
+import time
+import pipes
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'celnav'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import celnav
+import aa_stub
+
+DELAY = 0.01            # simulated aa run time per star in s
+JOBS = 16               # observers for the concurrent runs
+UT = (2013, 6, 28, 5, 30, 0)
+STARS = range(1, 59)
+
+
+def check(job, records):
+    """Returns number of stars in records (aaStarTable() result for job)
+    that differ from the stub's values
+    """
+    bad = 0
+    for (n, r) in zip(job['starNums'], records):
+        d = celnav.aaStarData(r)
+        (mag, alt, az, dec, ra) = aa_stub.expected(job['lat'], job['lon'], job['ut'], n)
+        if (abs(d['mag'] - mag) > 0.01 or abs(d['alt'].decD - alt) > 0.001 or
+                abs(d['az'].decD - az) > 0.001 or abs(d['dec'].decD - dec) > 0.001):
+            bad += 1
+    return bad + abs(len(records) - len(job['starNums']))
+
+
+if __name__ == '__main__':
+
+    celnav.AA_EXE_FILE = '%s %s %f' % (pipes.quote(sys.executable),
+            pipes.quote(aa_stub.__file__.replace('.pyc', '.py')), DELAY)
+    cwd = os.getcwd()
+
+    job = dict(reDict = celnav.StarFinder.reDict, starCatFile = 'star.cat', starNums = STARS,
+            ut = UT, lat = 30, lon = -40)
+
+    t = time.time()
+    single = [celnav.aaStars(job['reDict'], 'star.cat', n, UT, 30, -40) for n in STARS]
+    tSingle = time.time() - t
+    t = time.time()
+    table = celnav.aaStarTable(**job)
+    tTable = time.time() - t
+    print '58 stars, one aa run per star: %6.3f s, %d wrong' % (tSingle, check(job, single))
+    print '58 stars, one aa run:          %6.3f s, %d wrong' % (tTable, check(job, table))
+
+    jobs = [dict(job, starNums = STARS[:20], lat = -60 + 7.5 * i, lon = -170 + 20 * i)
+            for i in range(JOBS)]
+
+    t = time.time()
+    results = celnav.aaStarTables(jobs, threads = 1)
+    print '%d observers, sequential:      %6.3f s, %d wrong' % (JOBS, time.time() - t,
+            sum(map(check, jobs, results)))
+
+    t = time.time()
+    results = celnav.aaStarTables(jobs, threads = JOBS)
+    print '%d observers, %d threads:      %6.3f s, %d wrong' % (JOBS, JOBS, time.time() - t,
+            sum(map(check, jobs, results)))
+
+    t = time.time()
+    pending = [celnav.aaStarTableAsync(**j) for j in jobs]
+    results = [p.get() for p in pending]
+    print '%d observers, async:           %6.3f s, %d wrong (%s threads)' % (JOBS,
+            time.time() - t, sum(map(check, jobs, results)), celnav.AA_THREADS or 'CPU')
+
+    print 'working directory unchanged:  ', os.getcwd() == cwd
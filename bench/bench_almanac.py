@@ -0,0 +1,132 @@
+#! /usr/bin/python
+
+"""bench_almanac.py
+Benchmark for celnav.AlmanacPage: compares the number of ephem calls and the
+run time per page of the current implementation (one hourly time grid, GHA
+Aries evaluated once per hour and shared by all bodies) against the previous
+updateData() which called ghaAries() for the Aries rows and again via gha()
+for each of 6 bodies x 24 hours, creating a new ephem.Observer each time
+(reproduced below as oldUpdateData). Every page is calculated: the almanac
+cache (almcache) and the Chebyshev ephemeris (chebeph) are switched off and
+no days are kept from the previous page. Run from the package root:
+
+    python bench/bench_almanac.py
+"""
+
+import os
+import sys
+import time
+from math import *
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'celnav'))
+
+import ephem
+
+import celnav
+import almcache
+import chebeph
+import ephpool
+
+REPEAT = 5
+DAYS = 20
+
+
+class Counter(object):
+    observers = 0
+    siderealTimes = 0
+
+
+class CountingObserver(ephem.Observer):
+    """ephem.Observer counting instances and sidereal time evaluations
+    """
+    def __init__(self, *args, **kwargs):
+        ephem.Observer.__init__(self, *args, **kwargs)
+        Counter.observers += 1
+
+    def sidereal_time(self):
+        Counter.siderealTimes += 1
+        return ephem.Observer.sidereal_time(self)
+
+
+class CountingEphem(object):
+    """Stands in for module ephem in celnav; replaces Observer
+    """
+    Observer = CountingObserver
+
+    def __getattr__(self, name):
+        return getattr(ephem, name)
+
+
+def oldUpdateData(self):
+    """celnav.AlmanacPage.updateData() as of version 0.2.2 (ephem results
+    taken from ephpool like the current version)
+    """
+    self.aries.decD = [celnav.ghaAries(self.date + (h, 0, 0)) for h in range(24)]
+
+    for body in ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn'):
+        decList = []
+        ghaList = []
+        hpList = []
+        for h in range(24):
+            t = self.date + (h, 0, 0)
+            p = ephpool.compute(self.__dict__[body]['ephemClass'], t)
+            decList.append(degrees(p.dec))
+            ghaList.append(celnav.gha(p.ra, t))
+            if body == 'moon':
+                hpList.append(celnav.hpMoon(degrees(p.radius)))
+
+        self.__dict__[body]['dec'].decD = decList
+        self.__dict__[body]['gha'].decD = ghaList
+        if body == 'moon':
+            self.__dict__[body]['hp'].decD = hpList
+
+
+def run(updateData):
+    """Returns tuple (observers, sidereal times, body computations, seconds)
+    per page, each page computed with an empty ephem cache; best of REPEAT
+    runs over DAYS pages
+    """
+    page = celnav.AlmanacPage((2013, 1, 1), window = 1)
+    best = None
+
+    for r in range(REPEAT):
+        elapsed = 0.0
+        (observers, siderealTimes, computes) = (0, 0, 0)
+        for d in range(DAYS):
+            page.date = (2013, 1, 1 + d)
+            ephpool.cache.clear()
+            page.windowDays = []
+            page.windowData = []
+            Counter.observers = 0
+            Counter.siderealTimes = 0
+            t = time.time()
+            updateData(page)
+            elapsed += time.time() - t
+            observers += Counter.observers
+            siderealTimes += Counter.siderealTimes
+            computes += ephpool.cache.misses
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return (observers / DAYS, siderealTimes / DAYS, computes / DAYS, best / DAYS)
+
+
+if __name__ == '__main__':
+
+    # calculate every page (no reads from or writes to the almanac cache file,
+    # no Chebyshev ephemeris):
+    almcache.USE_CACHE = False
+    almcache._pageCache = None
+    chebeph.CHEB_FILE = None
+    chebeph._ephemeris = None
+
+    celnav.ephem = CountingEphem()
+
+    old = run(oldUpdateData)
+    new = run(celnav.AlmanacPage.updateData.im_func)
+
+    print 'per almanac page:      %12s %12s' % ('old', 'new')
+    print 'ephem.Observer objects %12d %12d' % (old[0], new[0])
+    print 'sidereal time calls    %12d %12d' % (old[1], new[1])
+    print 'body computations      %12d %12d' % (old[2], new[2])
+    print 'time [ms]              %12.2f %12.2f' % (old[3] * 1000, new[3] * 1000)
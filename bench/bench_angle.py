@@ -0,0 +1,104 @@
+#! /usr/bin/python
+
+"""bench_angle.py
+Micro-benchmark for celnav.Angle: compares construction and update cost of the
+lazy, __slots__-based Angle against the previous implementation which
+recomputed decD, rad and degMin eagerly in __setattr__ (reproduced below as
+EagerAngle). Run from the package root:
+
+    python bench/bench_angle.py
+"""
+
+import os
+import sys
+import timeit
+from math import *
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'celnav'))
+
+import celnav
+
+REPEAT = 5
+NUMBER = 100000
+
+
+class EagerAngle:
+    """celnav.Angle as of version 0.2.2 (eager update of all attributes)
+    """
+    def __init__(self, decD = 0):
+        self.decD = decD
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = value
+
+        if name == "degMin":
+            if self.degMin[0] >= 360:
+                n = int(self.degMin[0] / float(360))
+                self.__dict__["degMin"] = ((self.degMin[0] - n*360), ) + self.degMin[1:]
+
+            self.__dict__["decD"] = (self.degMin[0] + self.degMin[1]/60.0) * self.degMin[2]
+            self.__dict__["rad"] = radians(self.decD)
+
+        elif name == "rad":
+            if abs(self.rad) >= 2*pi:
+                n = int(self.rad / (2*pi))
+                self.__dict__["rad"] = self.rad - n*2*pi
+            decD = degrees(self.rad)
+            d = abs(int(decD))
+            m = (abs(degrees(self.rad)) - d) * 60
+            if self.rad != 0:
+                sign =  int(abs(self.rad)/self.rad)
+            else:
+                sign = 1
+            self.__dict__["degMin"] = (d, m, sign)
+            self.__dict__["decD"] = decD
+
+        elif name == "decD":
+            if abs(self.decD) >= 360:
+                n = int(self.decD / float(360))
+                self.__dict__["decD"] = self.decD - n*360
+            self.__dict__["rad"] = radians(self.decD)
+            d = abs(int(self.decD))
+            m = (abs(self.decD) - d) * 60
+            if self.decD != 0:
+                sign =  int(abs(self.decD)/self.decD)
+            else:
+                sign = 1
+            self.__dict__["degMin"] = (d, m, sign)
+
+
+# (label, statement) pairs; 'A' will be bound to the class under test and 'a'
+# to an existing instance
+CASES = [
+        ('construct',               'A(123.456)'),
+        ('set decD',                'a.decD = 123.456'),
+        ('set rad',                 'a.rad = 2.1547'),
+        ('rad += x (LOP.calcIcAz)', 'a.rad += 0.0001'),
+        ('construct + read rad',    'A(123.456).rad'),
+        ('construct + latStr()',    'A(-23.456).latStr()'),
+        ]
+
+
+def bestTime(stmt, cls):
+    """Returns best time per statement execution in microseconds
+    """
+    setup = 'from __main__ import %s as A; a = A(10.5)' % cls.__name__
+    t = timeit.Timer(stmt, setup)
+    return min(t.repeat(REPEAT, NUMBER)) / NUMBER * 1e6
+
+
+if __name__ == '__main__':
+
+    EagerAngle.latStr = celnav.Angle.latStr.im_func
+    Angle = celnav.Angle
+
+    print '%-26s %12s %12s %8s' % ('case [usec]', 'eager', 'lazy', 'ratio')
+    for (label, stmt) in CASES:
+        tEager = bestTime(stmt, EagerAngle)
+        tLazy = bestTime(stmt, Angle)
+        print '%-26s %12.3f %12.3f %8.2f' % (label, tEager, tLazy, tEager / tLazy)
+
+    print
+    print 'instance size [bytes]: eager %d (+ __dict__ %d), lazy %d' % (
+            sys.getsizeof(EagerAngle(1)), sys.getsizeof(EagerAngle(1).__dict__),
+            sys.getsizeof(Angle(1)))
@@ -0,0 +1,317 @@
+"""almcache: support module for celnav
+Persistent on-disk cache for the hourly almanac data of celnav.AlmanacPage
+(GHA Aries, GHA and Dec of Sun, Moon, Venus, Mars, Jupiter and Saturn, HP of
+the Moon), so that a date that has been calculated once is loaded from the
+cache file instead of being recalculated with ephem.
+
+The cache file has a fixed layout: a header (magic, layout version, ephem
+version, first day, number of days) followed by one record per day from
+January 1st of FIRST_YEAR for YEARS years. A record is a valid flag followed
+by 24 x len(COLUMNS) float64 values (hour x column, degrees incl. decimal
+fraction). The file is created at full size as a sparse file and mapped
+read-only with numpy.memmap; cached days are returned as views into the
+mapping (no copy).
+
+Records are written with ordinary file writes: first the values, then the
+valid flag, so a reader never sees a partly written day. Several celnav
+processes on the same machine can therefore share one cache file; two
+processes filling the same day write identical values. If the cache file is
+not writable it is used read-only (misses are calculated but not stored). A
+file written by another layout or ephem version is replaced when it is next
+opened for writing (and ignored otherwise).
+
+Exports:
+
+    AlmanacCache    -   cache file wrapper; see get(), put() and fill()
+
+    pageCache()     -   shared AlmanacCache used by celnav.AlmanacPage, or
+                        None if the cache is disabled or cannot be opened
+
+    COLUMNS         -   (body, key) of the data columns of a day record
+
+    AlmanacCacheError
+                    -   raised if a cache file cannot be used
+
+The constants below can be overwritten in celnav.ini in section [almcache].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import os
+import tempfile
+
+import numpy as np
+import ephem
+
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [almcache].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'almcache'
+
+# use cache file for almanac pages:
+USE_CACHE = True
+if cncfg.cncfg.has_option(SECTION_ID, 'USE_CACHE'):
+    USE_CACHE = cncfg.cncfg.getboolean(SECTION_ID, 'USE_CACHE')
+
+# cache file:
+CACHE_FILE = os.path.expandvars("$HOME/.celnav/almanac.cache")
+if cncfg.cncfg.has_option(SECTION_ID, 'CACHE_FILE'):
+    CACHE_FILE = cncfg.cncfg.get(SECTION_ID, 'CACHE_FILE')
+
+# years covered by the cache file (about 1 MB per year when fully filled):
+FIRST_YEAR = 2000
+if cncfg.cncfg.has_option(SECTION_ID, 'FIRST_YEAR'):
+    FIRST_YEAR = cncfg.cncfg.getint(SECTION_ID, 'FIRST_YEAR')
+
+YEARS = 50
+if cncfg.cncfg.has_option(SECTION_ID, 'YEARS'):
+    YEARS = cncfg.cncfg.getint(SECTION_ID, 'YEARS')
+
+#-----------------------------------------------------------------------------
+
+MAGIC = 'CNALMC'
+LAYOUT_VERSION = 1
+
+# columns of a day record; body 'aries' is AlmanacPage.aries, all others are
+# keys into the body dictionaries of AlmanacPage:
+COLUMNS = (('aries', None), ('sun', 'gha'), ('sun', 'dec'), ('moon', 'gha'), ('moon', 'dec'),
+        ('moon', 'hp'), ('venus', 'gha'), ('venus', 'dec'), ('mars', 'gha'), ('mars', 'dec'),
+        ('jupiter', 'gha'), ('jupiter', 'dec'), ('saturn', 'gha'), ('saturn', 'dec'))
+
+HEADER = np.dtype([('magic', 'S8'), ('layout', '<i8'), ('ephem', 'S16'), ('firstDay', '<f8'),
+        ('days', '<i8'), ('hours', '<i8'), ('columns', '<i8'), ('reserved', 'S8')])
+
+RECORD = np.dtype([('valid', '<i8'), ('values', '<f8', (24, len(COLUMNS)))])
+
+VALID = 1
+
+_VALID_OFFSET = RECORD.fields['valid'][1]
+_VALUES_OFFSET = RECORD.fields['values'][1]
+
+
+class AlmanacCacheError(Exception):
+    """Raised if a cache file cannot be opened or has an unexpected layout
+    """
+    pass
+
+
+def _dayNumber(date):
+    """Returns ephem date of 0h UT of date (Y, M, D)
+    """
+    return float(ephem.Date(tuple(date)[:3] + (0, 0, 0)))
+
+
+def _header(firstDay, days):
+    h = np.zeros(1, HEADER)
+    h['magic'] = MAGIC
+    h['layout'] = LAYOUT_VERSION
+    h['ephem'] = ephem.__version__
+    h['firstDay'] = firstDay
+    h['days'] = days
+    h['hours'] = 24
+    h['columns'] = len(COLUMNS)
+    return h
+
+
+class AlmanacCache(classprint.AttrDisplay):
+    """Almanac cache file fileName covering years years from January 1st of
+    firstYear. The file is created if it does not exist (and its directory
+    does). If readOnly is True, or the file is not writable, put() and fill()
+    will not write.
+    """
+    def __init__(self, fileName, firstYear = FIRST_YEAR, years = YEARS, readOnly = False):
+        self.fileName = fileName
+        self.firstDay = _dayNumber((firstYear, 1, 1))
+        self.days = int(round(_dayNumber((firstYear + years, 1, 1)) - self.firstDay))
+
+        if not os.path.exists(fileName) or not self.__fileIsCurrent():
+            if readOnly or not os.access(os.path.dirname(os.path.abspath(fileName)), os.W_OK):
+                raise AlmanacCacheError("No usable almanac cache file %s" % fileName)
+            self.__create()
+
+        self.writable = not readOnly and os.access(fileName, os.W_OK)
+
+        header = np.fromfile(fileName, HEADER, 1)[0]
+        self.firstDay = float(header['firstDay'])
+        self.days = int(header['days'])
+        self.records = np.memmap(fileName, dtype = RECORD, mode = 'r', offset = HEADER.itemsize,
+                shape = (self.days, ))
+        if self.writable:
+            self.__file = open(fileName, 'r+b')
+        else:
+            self.__file = None
+
+
+    def __fileIsCurrent(self):
+        """Returns True if the existing file has this layout and ephem version
+        """
+        try:
+            h = np.fromfile(self.fileName, HEADER, 1)
+        except (IOError, ValueError):
+            return False
+        if len(h) != 1 or os.path.getsize(self.fileName) < (HEADER.itemsize
+                + h['days'][0] * RECORD.itemsize):
+            return False
+        h = h[0]
+        return (h['magic'] == MAGIC and h['layout'] == LAYOUT_VERSION and
+                h['ephem'] == ephem.__version__ and h['hours'] == 24 and
+                h['columns'] == len(COLUMNS))
+
+
+    def __create(self):
+        """Writes an empty (sparse) cache file; written under a temporary name
+        and renamed, so processes still using an older file are not affected
+        """
+        (fd, tmpName) = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(self.fileName)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_header(self.firstDay, self.days).tostring())
+                f.truncate(HEADER.itemsize + self.days * RECORD.itemsize)
+            os.chmod(tmpName, 0644)
+            os.rename(tmpName, self.fileName)
+        except:
+            if os.path.exists(tmpName):
+                os.remove(tmpName)
+            raise
+
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        self.records = None
+
+
+    def dayIndex(self, date):
+        """Returns record index of date (Y, M, D) or None if date is not
+        covered by the cache file
+        """
+        i = int(round(_dayNumber(date) - self.firstDay))
+        if 0 <= i < self.days:
+            return i
+        return None
+
+
+    def get(self, date):
+        """Returns read-only array (24 hours x len(COLUMNS)) with the values
+        for date (Y, M, D), a view into the mapped file, or None if date has
+        not been cached
+        """
+        i = self.dayIndex(date)
+        if i is None or self.records[i]['valid'] != VALID:
+            return None
+        return self.records[i]['values']
+
+
+    def __write(self, i, values):
+        """Writes values (days x 24 x len(COLUMNS)) to the records starting
+        at index i: values first, valid flags after all values
+        """
+        offset = HEADER.itemsize + i * RECORD.itemsize
+        rec = np.zeros(len(values), RECORD)
+        rec['values'] = values
+        self.__file.seek(offset)
+        self.__file.write(rec.tostring())
+        self.__file.flush()
+        for n in range(len(values)):
+            self.__file.seek(offset + n * RECORD.itemsize + _VALID_OFFSET)
+            self.__file.write(np.array([VALID], '<i8').tostring())
+        self.__file.flush()
+
+
+    def put(self, date, values):
+        """Stores array values (24 hours x len(COLUMNS)) for date (Y, M, D);
+        returns False if the cache is not writable or does not cover date
+        """
+        i = self.dayIndex(date)
+        if not self.writable or i is None:
+            return False
+        self.__write(i, np.asarray(values, dtype = np.float64).reshape((1, 24, len(COLUMNS))))
+        return True
+
+
+    def fill(self, start, days, processes = None):
+        """Calculates and stores all days not yet cached in the range of days
+        days starting at date start (Y, M, D), using almrange (processes:
+        see almrange.AlmanacRange); returns number of days calculated
+        """
+        import almrange
+
+        first = self.dayIndex(start)
+        if not self.writable or first is None:
+            return 0
+        days = min(days, self.days - first)
+        missing = np.flatnonzero(self.records['valid'][first:first + days] != VALID)
+        if len(missing) == 0:
+            return 0
+
+        # calculate from first to last missing day in one range:
+        (i0, n) = (first + missing[0], missing[-1] - missing[0] + 1)
+        r = almrange.AlmanacRange(ephem.Date(self.firstDay + i0).tuple()[:3], n, processes)
+        values = np.column_stack([(r.aries if b == 'aries' else r.__dict__[b][k]).decD
+                for (b, k) in COLUMNS]).reshape((n, 24, len(COLUMNS)))
+        self.__write(i0, values)
+        return len(missing)
+
+
+    def info(self):
+        """Returns tuple (days cached, days covered)
+        """
+        return (int(np.count_nonzero(self.records['valid'] == VALID)), self.days)
+
+
+_pageCache = None
+
+
+def pageCache():
+    """Returns the AlmanacCache for CACHE_FILE shared by all AlmanacPages of
+    this process (opened on first use), or None if USE_CACHE is False or the
+    file cannot be opened
+    """
+    global _pageCache, USE_CACHE
+
+    if _pageCache is None and USE_CACHE:
+        try:
+            _pageCache = AlmanacCache(CACHE_FILE)
+        except (AlmanacCacheError, EnvironmentError, ValueError):
+            USE_CACHE = False
+
+    return _pageCache
+
+
+if __name__ == '__main__':
+
+    import sys
+    import time
+
+    import celnav
+
+    # pre-fill the cache for one year and compare page load times:
+    #   python almcache.py YEAR
+    year = int(sys.argv[1])
+    c = pageCache()
+
+    t = time.time()
+    n = c.fill((year, 1, 1), int(round(_dayNumber((year + 1, 1, 1)) - _dayNumber((year, 1, 1)))))
+    print 'filled %d days in %.2f s, %d of %d days cached' % ((n, time.time() - t) + c.info())
+
+    p = celnav.AlmanacPage((year, 6, 1))
+    t = time.time()
+    for d in range(1, 31):
+        p.date = (year, 6, d)
+        p.updateData()
+    print 'cached page: %.3f ms' % ((time.time() - t) / 30 * 1000)
+
+    celnav.almcache.USE_CACHE = False
+    celnav.almcache._pageCache = None
+    t = time.time()
+    for d in range(1, 31):
+        p.date = (year, 6, d)
+        p.updateData()
+    print 'calculated page: %.3f ms' % ((time.time() - t) / 30 * 1000)
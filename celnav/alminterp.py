@@ -0,0 +1,312 @@
+"""alminterp: support module for celnav
+Interpolation of the hourly almanac data of celnav.AlmanacPage (taken from
+the almanac cache, see almcache) for any UT, the way the Nautical Almanac is
+used with paper sight reduction forms:
+
+    GHA = GHA at hour + increment for minutes and seconds + v correction
+    Dec = Dec at hour + d correction
+
+with increments at the NA's fixed hourly rates (15 deg for Sun and planets,
+14 deg 19.0' for the Moon, 15 deg 02.46' for Aries) and v/d from the
+difference of consecutive hourly values. Methods:
+
+    na      -   NA arithmetic incl. its rounding: tabulated values, v and d
+                to 0.1', increments to 0.1', v/d corrections for the middle
+                of the minute (as the NA correction tables) to 0.1'
+
+    linear  -   same formula without rounding (linear interpolation between
+                the hourly values)
+
+    cubic   -   4-point (cubic) interpolation over the hours h-1 .. h+2
+
+HP of the Moon is interpolated from the hourly values and its SD is derived
+from HP (as celnav.hpMoon()); this HP (the NA's SD / 0.2724) differs from
+the parallax for ephem's distance by up to about 0.1'. SD of the Sun and HP
+of Sun and planets are daily values (for 12h UT, as printed in the NA).
+
+interpolationError() reports the max. differences to ephem for any UTs.
+With ICAZ_CALC == 'almanac' celnav.reduceSights() takes GHA, Dec, HP and SD
+of Sun, Moon and planets from here (see geoPositions()) and solves the
+navigational triangle with navtri.
+
+Exports:
+
+    interpolate()   -   GHA, Dec, HP and SD of one body for an array of UTs
+
+    geoPositions()  -   same interface as celnav.geoPositions() (stars taken
+                        from there)
+
+    interpolationError()
+                    -   max. differences to ephem
+
+    HourlyTable     -   hourly data for a range of days the above work on
+
+The constant below can be overwritten in celnav.ini in section [alminterp].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+from math import *
+
+import numpy as np
+import ephem
+
+import celnav
+import ephpool
+import navtri
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [alminterp].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'alminterp'
+
+# default interpolation method ('na', 'linear' or 'cubic'):
+METHOD = 'cubic'
+if cncfg.cncfg.has_option(SECTION_ID, 'METHOD'):
+    METHOD = cncfg.cncfg.get(SECTION_ID, 'METHOD')
+
+#-----------------------------------------------------------------------------
+
+# AlmanacPage attributes per body:
+PAGE_BODY = { 'Aries' : 'aries', 'Sun' : 'sun', 'Moon' : 'moon', 'Venus' : 'venus',
+        'Mars' : 'mars', 'Jupiter' : 'jupiter', 'Saturn' : 'saturn' }
+
+# hourly rates of the NA increments tables in degrees:
+INCREMENT_RATE = { 'Aries' : 15 + 2.46 / 60, 'Sun' : 15.0, 'Moon' : 14 + 19.0 / 60,
+        'Venus' : 15.0, 'Mars' : 15.0, 'Jupiter' : 15.0, 'Saturn' : 15.0 }
+
+
+def _round(a):
+    """Rounds degrees in a to 0.1' (half away from zero)
+    """
+    return np.sign(a) * np.floor(np.abs(a) * 600 + 0.5) / 600
+
+
+def _wrap(a):
+    """Reduces GHA differences to -180 .. 180
+    """
+    return np.mod(a + 180.0, 360.0) - 180.0
+
+
+class HourlyTable(classprint.AttrDisplay):
+    """Hourly almanac data for days days starting at 0h UT of ephem day number
+    firstDay, from one AlmanacPage per day. Attributes: firstDay, days,
+    hourly (dictionary body -> dictionary with arrays 'gha', 'dec' and, for
+    the Moon, 'hp'; 24 * days values in degrees) and daily (dictionary body
+    -> dictionary with arrays 'hp' and 'sd' for 12h UT of each day).
+    """
+    def __init__(self, firstDay, days):
+        self.firstDay = float(firstDay)
+        self.days = days
+        self.hourly = dict([(b, {}) for b in PAGE_BODY])
+        self.daily = dict([(b, { 'hp' : np.zeros(days), 'sd' : np.zeros(days) })
+            for b in PAGE_BODY])
+
+        pages = []
+        page = None
+        for d in range(days):
+            date = ephem.Date(self.firstDay + d).tuple()[:3]
+            if page is None:
+                page = celnav.AlmanacPage(date)
+            else:
+                page.date = date
+                page.updateData()
+            hours = { 'Aries' : { 'gha' : page.aries.decD } }
+            for (b, p) in PAGE_BODY.items():
+                if b != 'Aries':
+                    data = getattr(page, p)
+                    hours[b] = dict([(q, data[q].decD) for q in ('gha', 'dec', 'hp') if q in data])
+            pages.append(hours)
+
+            noon = self.firstDay + d + 0.5
+            for b in PAGE_BODY:
+                if b != 'Aries':
+                    e = ephpool.compute(b, noon)
+                    self.daily[b]['hp'][d] = navtri.hpFromDist(e.dist)
+                    self.daily[b]['sd'][d] = degrees(e.radius)
+
+        for b in PAGE_BODY:
+            for q in pages[0][b]:
+                self.hourly[b][q] = np.concatenate([p[b][q] for p in pages])
+
+
+    def covers(self, ut):
+        """Returns True if all hours needed for cubic interpolation at ut
+        (array of ephem dates) are in the table
+        """
+        t = (np.asarray(ut, dtype = np.float64) - self.firstDay) * 24
+        return bool(np.all(t >= 1) and np.all(t < 24 * self.days - 2))
+
+
+    def interpolate(self, body, ut, method = None):
+        """Returns tuple (gha, dec, hp, sd) of NumPy arrays in degrees incl.
+        decimal fraction for body (ephem class name or 'Aries'; dec, hp and sd
+        are 0 for Aries) at ut (array of ephem dates covered by the table);
+        method: see module doc string, defaults to METHOD
+        """
+        if method is None:
+            method = METHOD
+
+        ut = np.asarray(ut, dtype = np.float64)
+        t = (ut - self.firstDay) * 24
+        h = np.floor(t).astype(int)
+        f = t - h
+        day = h // 24
+        zero = np.zeros(len(ut))
+
+        y = self.hourly[body]
+        result = {}
+        for q in ('gha', 'dec', 'hp'):
+            if q not in y:
+                result[q] = zero
+                continue
+            a = y[q]
+
+            if method == 'na':
+                y0 = _round(a[h])
+                if q == 'gha':
+                    rate = INCREMENT_RATE[body]
+                    # whole minutes and seconds of the hour (increments table):
+                    sec = np.floor(f * 3600 + 0.5)
+                    inc = _round(rate * sec / 3600)
+                    v = _round(_wrap(_round(a[h + 1]) - y0) - rate)
+                    corr = _round(v * (np.floor(sec / 60) + 0.5) / 60)
+                    result[q] = np.mod(y0 + inc + corr, 360.0)
+                else:
+                    d = _round(a[h + 1]) - y0
+                    sec = np.floor(f * 3600 + 0.5)
+                    result[q] = y0 + _round(d * (np.floor(sec / 60) + 0.5) / 60)
+
+            elif method == 'linear':
+                d1 = a[h + 1] - a[h]
+                if q == 'gha':
+                    d1 = _wrap(d1)
+                result[q] = a[h] + f * d1
+
+            elif method == 'cubic':
+                # Lagrange polynomial through hours -1, 0, 1, 2 (relative to h):
+                (dm1, d1, d2) = (a[h - 1] - a[h], a[h + 1] - a[h], a[h + 2] - a[h])
+                if q == 'gha':
+                    (dm1, d1, d2) = (_wrap(dm1), _wrap(d1), _wrap(d2))
+                result[q] = a[h] + (-f * (f - 1) * (f - 2) / 6 * dm1 + (f + 1) * f * (f - 2)
+                        / -2 * d1 + (f + 1) * f * (f - 1) / 6 * d2)
+
+            else:
+                raise ValueError("Unknown interpolation method '%s'" % method)
+
+        gha = np.mod(result['gha'], 360.0)
+        if body == 'Aries':
+            return (gha, zero, zero, zero)
+        if body == 'Moon':
+            hp = result['hp']
+            sd = hp * 0.2724
+            if method == 'na':
+                sd = _round(sd)
+        else:
+            hp = self.daily[body]['hp'][day]
+            sd = self.daily[body]['sd'][day]
+
+        return (gha, result['dec'], hp, sd)
+
+
+_table = None
+
+
+def _tableFor(ut):
+    """Returns shared HourlyTable covering ut (array of ephem dates); builds a
+    new one if necessary
+    """
+    global _table
+
+    if _table is None or not _table.covers(ut):
+        firstDay = floor(np.min(ut) - 0.5) + 0.5 - 1        # 0h UT of day before
+        lastDay = floor(np.max(ut) - 0.5) + 0.5 + 1         # 0h UT of day after
+        _table = HourlyTable(firstDay, int(round(lastDay - firstDay)) + 1)
+
+    return _table
+
+
+def interpolate(body, ut, method = None):
+    """Returns tuple (gha, dec, hp, sd) of NumPy arrays in degrees for body
+    ('Aries', 'Sun', 'Moon', 'Venus', ...; a limb indicator like 'Sun LL' is
+    ignored) at ut (sequence of (Y, M, D, h, m, s) tuples or ephem dates),
+    interpolated with method (see module doc string, defaults to METHOD)
+    """
+    ut = celnav.utArray(ut)
+    body = body.split()[0]
+    return _tableFor(ut).interpolate(body, ut, method)
+
+
+def geoPositions(ut, body, starName = None, method = None):
+    """Same as celnav.geoPositions(), with GHA, Dec, HP and SD of Sun, Moon
+    and planets interpolated from the almanac tables (stars from
+    celnav.geoPositions())
+    """
+    date = celnav.utArray(ut)
+    n = len(date)
+    body = celnav._bcast(body, n)
+    starName = celnav._bcast(starName, n)
+
+    (gha, dec, hp, sd, limb) = [np.zeros(n) for i in range(5)]
+    names = np.array([b.split()[0] for b in body])
+    for i in range(n):
+        splitBody = body[i].split()
+        if len(splitBody) > 1:
+            limb[i] = navtri.LIMB[splitBody[1]]
+
+    stars = names == 'star'
+    if np.any(stars):
+        idx = np.flatnonzero(stars)
+        (gha[stars], dec[stars], hp[stars], sd[stars], limb[stars]) = celnav.geoPositions(
+                date[stars], [body[i] for i in idx], [starName[i] for i in idx])
+
+    for name in set(names[~stars]):
+        m = names == name
+        (gha[m], dec[m], hp[m], sd[m]) = interpolate(name, date[m], method)
+    sd[limb == 0] = 0
+
+    return (gha, dec, hp, sd, limb)
+
+
+def interpolationError(body, ut, method = None):
+    """Returns tuple with the max. absolute differences (gha, dec, hp, sd) in
+    arc minutes between interpolate() and ephem for body at ut
+    """
+    ut = celnav.utArray(ut)
+    body = body.split()[0]
+    (gha, dec, hp, sd) = interpolate(body, ut, method)
+
+    ghaE = celnav.ghaAriesArray(ut)
+    (decE, hpE, sdE) = [np.zeros(len(ut)) for i in range(3)]
+    if body != 'Aries':
+        for (i, t) in enumerate(ut):
+            e = ephpool.compute(body, t)
+            ghaE[i] -= degrees(e.ra)
+            decE[i] = degrees(e.dec)
+            hpE[i] = navtri.hpFromDist(e.dist)
+            sdE[i] = degrees(e.radius)
+
+    return tuple([np.abs(x).max() * 60 for x in (_wrap(gha - ghaE), dec - decE, hp - hpE,
+        sd - sdE)])
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # errors against ephem for a month of random UTs (whole seconds, as
+    # sights are timed):
+    ut = float(ephem.Date((2013, 3, 1))) + np.floor(np.random.random(5000) * 30 * 86400) / 86400
+    print "max. error [']   gha     dec      hp      sd"
+    for method in ('na', 'linear', 'cubic'):
+        for body in ('Aries', 'Sun', 'Moon', 'Venus', 'Jupiter'):
+            print '%-6s %-8s' % (method, body) + '%8.4f' * 4 % interpolationError(body, ut, method)
+
+    t = time.time()
+    interpolate('Moon', ut)
+    print '%s: %.2f us per UT' % (METHOD, (time.time() - t) / len(ut) * 1e6)
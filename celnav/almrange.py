@@ -0,0 +1,227 @@
+"""almrange: support module for celnav
+Almanac data for a range of days (e.g. a month or a full year before a
+passage): hourly GHA Aries plus GHA and Dec for Sun, Moon, Venus, Mars,
+Jupiter and Saturn and HP for the Moon, i.e. the data of celnav.AlmanacPage
+for any number of consecutive days.
+
+The range is split into chunks of CHUNK_DAYS days which are calculated in a
+multiprocessing pool and assembled into one contiguous result in date order.
+Each chunk is calculated on its own hourly time grid with GHA Aries evaluated
+once per hour and one pass per body (same as AlmanacPage.updateData()).
+
+Exports:
+
+    AlmanacRange    -   hourly data for a range of days in AngleArrays of
+                        length 24 * days (same structure as AlmanacPage);
+                        page() returns an AlmanacPage for a single day and
+                        writeCSV() writes the whole range as a table
+
+    tables()        -   plain calculation for a range of days (no pool);
+                        returns dictionary of NumPy arrays in degrees
+
+The constants below can be overwritten in celnav.ini in section [almrange].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import multiprocessing
+
+import numpy as np
+import ephem
+
+import celnav
+import almcache
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [almrange].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'almrange'
+
+# number of days per chunk sent to a worker process:
+CHUNK_DAYS = 31
+if cncfg.cncfg.has_option(SECTION_ID, 'CHUNK_DAYS'):
+    CHUNK_DAYS = cncfg.cncfg.getint(SECTION_ID, 'CHUNK_DAYS')
+
+# number of worker processes (0 = number of CPUs):
+PROCESSES = 0
+if cncfg.cncfg.has_option(SECTION_ID, 'PROCESSES'):
+    PROCESSES = cncfg.cncfg.getint(SECTION_ID, 'PROCESSES')
+
+#-----------------------------------------------------------------------------
+
+# bodies as used for AlmanacPage attributes, mapped to ephem class names:
+BODIES = ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn')
+EPHEM_CLASS = { 'sun' : 'Sun', 'moon' : 'Moon', 'venus' : 'Venus', 'mars' : 'Mars',
+        'jupiter' : 'Jupiter', 'saturn' : 'Saturn' }
+
+
+def tables(start, days):
+    """Returns dictionary with NumPy arrays of length 24 * days for the
+    hourly data of days days starting at 0h UT of date start (ephem date or
+    (Y, M, D) tuple): key 'ut' (ephem dates), 'aries' (GHA Aries) and one
+    dictionary per body (see BODIES) with keys 'gha' and 'dec' (plus 'hp' for
+    the Moon). Angles are in degrees incl. decimal fraction.
+    """
+    if not isinstance(start, float):
+        start = float(ephem.Date(tuple(start)[:3] + (0, 0, 0)))
+
+    ut = start + np.arange(24 * days) / 24.0
+    aries = celnav.ghaAriesArray(ut)
+    result = { 'ut' : ut, 'aries' : aries }
+
+    ra = np.empty(len(ut))
+    dec = np.empty(len(ut))
+    radius = np.empty(len(ut))
+    for b in BODIES:
+        body = ephem.__dict__[EPHEM_CLASS[b]]()     # private object, no cache for bulk data
+        for (i, t) in enumerate(ut):
+            body.compute(t)
+            ra[i] = body.ra
+            dec[i] = body.dec
+            radius[i] = body.radius
+
+        result[b] = { 'gha' : np.mod(aries + 360 - np.degrees(ra), 360.0),
+                'dec' : np.degrees(dec) }
+        if b == 'moon':
+            result[b]['hp'] = celnav.hpMoon(np.degrees(radius))
+
+    return result
+
+
+def _chunkTables(chunk):
+    return tables(*chunk)
+
+
+class _RangePage(celnav.AlmanacPage):
+    """AlmanacPage filled by AlmanacRange.page() instead of ephem, with a
+    window of one day (seeded by page(), see AlmanacPage.updateData())
+    """
+    def __init__(self, date):
+        self.date = date
+        self.window = 1
+        self.windowDays = []
+        self.windowData = []
+
+
+class AlmanacRange(classprint.AttrDisplay):
+    """Hourly almanac data for days days starting at date start (Y, M, D).
+    Attributes (same structure as AlmanacPage, arrays of length 24 * days,
+    index 24 * day + hour):
+        utGrid      -   NumPy array with ephem dates
+        aries       -   AngleArray with GHA Aries
+        sun, moon, venus, mars, jupiter, saturn
+                    -   dictionaries with AngleArrays under keys 'gha' and
+                        'dec' (plus 'hp' for the Moon)
+    processes is the number of worker processes (None = PROCESSES, 0 = number
+    of CPUs, 1 = calculate in this process) and chunkDays the number of days
+    per worker task (default CHUNK_DAYS).
+    """
+    def __init__(self, start, days = 365, processes = None, chunkDays = None):
+        self.start = tuple(start)[:3]
+        self.days = days
+
+        if processes is None:
+            processes = PROCESSES
+        if chunkDays is None:
+            chunkDays = CHUNK_DAYS
+
+        d0 = float(ephem.Date(self.start + (0, 0, 0)))
+        chunks = [(d0 + d, min(chunkDays, days - d)) for d in range(0, days, chunkDays)]
+
+        if processes == 1 or len(chunks) == 1:
+            parts = [_chunkTables(c) for c in chunks]
+        else:
+            pool = multiprocessing.Pool(processes or None)
+            try:
+                parts = pool.map(_chunkTables, chunks)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+
+        self.utGrid = np.concatenate([p['ut'] for p in parts])
+        self.aries = celnav.AngleArray(np.concatenate([p['aries'] for p in parts]))
+        for b in BODIES:
+            self.__dict__[b] = { 'ephemClass' : EPHEM_CLASS[b] }
+            for key in parts[0][b]:
+                self.__dict__[b][key] = celnav.AngleArray(np.concatenate([p[b][key] for p in parts]))
+
+
+    def page(self, day):
+        """Returns celnav.AlmanacPage for day day (0-based) of the range, filled
+        from this range's data (no ephem calculations)
+        """
+        s = slice(24 * day, 24 * (day + 1))
+        p = _RangePage(ephem.Date(self.utGrid[24 * day]).tuple()[:3])
+        p.utGrid = self.utGrid[s]
+        p.aries = self.aries[s]
+        for b in BODIES:
+            p.__dict__[b] = dict([(k, v[s]) if k != 'ephemClass' else (k, v)
+                for (k, v) in self.__dict__[b].items()])
+
+        # window data as AlmanacPage.updateData() keeps it:
+        p.windowDays = [float(self.utGrid[24 * day])]
+        p.windowData = [np.column_stack([(p.aries if b == 'aries' else p.__dict__[b][k]).decD
+            for (b, k) in almcache.COLUMNS])]
+        return p
+
+
+    def writeCSV(self, fileName, colSep = ','):
+        """Writes the range as table with one row per hour (UT date and hour,
+        then GHA Aries, GHA/Dec per body and HP of the Moon) to fileName;
+        angles in degrees with decimal fraction followed by the same values as
+        degrees and minutes strings
+        """
+        hdg1 = ['Aries']
+        hdg2 = ['GHA']
+        for b in BODIES:
+            hdg1 += [EPHEM_CLASS[b]] * (3 if b == 'moon' else 2)
+            hdg2 += ['GHA', 'Dec'] + (['HP'] if b == 'moon' else [])
+
+        numCols = [self.aries.decD]
+        strCols = [self.aries.absStr()]
+        for b in BODIES:
+            numCols += [self.__dict__[b]['gha'].decD, self.__dict__[b]['dec'].decD]
+            strCols += [self.__dict__[b]['gha'].absStr(), self.__dict__[b]['dec'].latStr()]
+            if b == 'moon':
+                numCols.append(self.__dict__[b]['hp'].decD)
+                strCols.append(self.__dict__[b]['hp'].absStr())
+
+        outFile = open(fileName, 'w')
+        outFile.write(colSep.join(['UT', 'UT'] + hdg1 + hdg1) + '\n')
+        outFile.write(colSep.join(['[date]', '[hrs]'] + hdg2 + hdg2) + '\n')
+        for i in range(len(self.utGrid)):
+            dateStr = "%04d/%02d/%02d" % ephem.Date(self.utGrid[i] + 1e-8).tuple()[:3]
+            outFile.write(colSep.join([dateStr, "%02d" % (i % 24)] + ["%f" % c[i] for c in numCols]
+                + [c[i] for c in strCols]) + '\n')
+        outFile.close()
+
+
+if __name__ == '__main__':
+
+    import time
+
+    t = time.time()
+    r = AlmanacRange((2013, 1, 1), 365)
+    print '365 days: %.2f s (%d processes)' % (time.time() - t, multiprocessing.cpu_count())
+
+    # compare one day with AlmanacPage:
+    p = celnav.AlmanacPage((2013, 6, 28))
+    q = r.page(178)
+    print q.date, max([np.abs(p.__dict__[b]['gha'].decD - q.__dict__[b]['gha'].decD).max()
+        for b in BODIES])
+
+    # a page of the range moved to another date is calculated like any other:
+    q.date = (2013, 6, 29)
+    q.updateData()
+    p.date = (2013, 6, 29)
+    p.updateData()
+    print q.date, max([np.abs(p.__dict__[b]['gha'].decD - q.__dict__[b]['gha'].decD).max()
+        for b in BODIES])
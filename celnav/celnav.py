@@ -19,12 +19,20 @@ from math import *
 import datetime as dt
 import os
 import re
+import shlex
+import shutil
+import subprocess
 import tempfile
+import threading
+from multiprocessing.pool import ThreadPool
 import ConfigParser
 
 # import PyEphem (see http://rhodesmill.org/pyephem/index.html)
 import ephem
 
+# import NumPy for array-backed angle storage (see AngleArray below)
+import numpy as np
+
 # celestial body list
 bodyList = ["Sun LL", "Sun UL", "Moon LL", "Moon UL", "Venus", "Mars", "Jupiter", "Saturn", "star"]
 
@@ -40,14 +48,47 @@ starList.sort()
 # import cncfg to get access to ConfigParser obejct:
 import cncfg
 
+# import ephpool which provides shared ephem body objects and a cache for
+# computed positions
+import ephpool
+
+# import navtri for vectorized solution of the navigational triangle
+import navtri
+
+# import lsqfix for least-squares fixes from any number of LOPs
+import lsqfix
+
+# import fixmc for Monte Carlo estimate of fix uncertainty
+import fixmc
+
+# import sightsel for automatic selection of the sight to be used for a fix
+import sightsel
+
+# import starvec for vectorized apparent places of the navigational stars
+import starvec
+
+# import starindex for spatial queries of (extended) star catalogues
+import starindex
+
+# import starid to identify stars from altitude and azimuth
+import starid
+
+# import almcache which keeps almanac page data in a memory-mapped file
+import almcache
+
+# import chebeph which provides Chebyshev-polynomial positions for Sun, Moon
+# and planets (if a coefficient file is configured)
+import chebeph
+
 #-----------------------------------------------------------------------------
-# The following three constants can be overritten in celnav.ini in section
+# The following constants can be overritten in celnav.ini in section
 # [celnav].
 #-----------------------------------------------------------------------------
 
 SECTION_ID = 'celnav'
 
-# path to aa executable and star catalog
+# path to aa executable (optionally followed by arguments; run without a
+# shell) and star catalog
 AA_EXE_FILE = "/usr/bin/aa"
 if cncfg.cncfg.has_option(SECTION_ID, 'AA_EXE_FILE'):
     AA_EXE_FILE = cncfg.cncfg.get(SECTION_ID, 'AA_EXE_FILE')
@@ -56,12 +97,34 @@ AA_STAR_CAT_FILE = "/usr/share/aa/star.cat"
 if cncfg.cncfg.has_option(SECTION_ID, 'AA_STAR_CAT_FILE'):
     AA_STAR_CAT_FILE = cncfg.cncfg.get(SECTION_ID, 'AA_STAR_CAT_FILE')
 
+# number of aa processes run concurrently by aaStarTables() (0 = number of
+# CPUs):
+AA_THREADS = 0
+if cncfg.cncfg.has_option(SECTION_ID, 'AA_THREADS'):
+    AA_THREADS = cncfg.cncfg.getint(SECTION_ID, 'AA_THREADS')
+
 # ephemeris calculator to be used for stars ("aa" -> Stephen Mosher's
-# Astronomical Almanac, "ephem" = PyEphem)
+# Astronomical Almanac, "ephem" = PyEphem, "vector" -> all stars at once by
+# starvec)
 STAR_CALC = "ephem"
 if cncfg.cncfg.has_option(SECTION_ID, 'STAR_CALC'):
     STAR_CALC = cncfg.cncfg.get(SECTION_ID, 'STAR_CALC')
 
+# engine used by LOP.calcIcAz()/reduceSights() to get Hc and Az ("ephem" ->
+# topocentric apparent position from ephem for each sight, "navtri" -> geocentric
+# GHA/Dec from ephem, navigational triangle solved for all sights at once by
+# navtri, "almanac" -> as navtri, but GHA/Dec of Sun, Moon and planets
+# interpolated from hourly almanac data by alminterp)
+ICAZ_CALC = "ephem"
+if cncfg.cncfg.has_option(SECTION_ID, 'ICAZ_CALC'):
+    ICAZ_CALC = cncfg.cncfg.get(SECTION_ID, 'ICAZ_CALC')
+
+# number of days of hourly data kept by AlmanacPage (date and following days);
+# when the date advances within that window only the new days are calculated
+ALMANAC_WINDOW = 1
+if cncfg.cncfg.has_option(SECTION_ID, 'ALMANAC_WINDOW'):
+    ALMANAC_WINDOW = cncfg.cncfg.getint(SECTION_ID, 'ALMANAC_WINDOW')
+
 #-----------------------------------------------------------------------------
 
 # assemble start-up log-string (can be written to log-file by other module):
@@ -72,7 +135,7 @@ START_UP_LOG_MSG = ('### celnav.STAR_CALC == \'%s\' ###  starcat.DB_SOURCE == \'
 import classprint
 
 
-class Angle(classprint.AttrDisplay):
+class Angle(object):
     """Stores Angle as
         - decD: degrees as decimal fraction
         - rad: radians
@@ -80,61 +143,88 @@ class Angle(classprint.AttrDisplay):
           degrees, minutes (incl. fraction) and a sign (+1 / -1)
     Setting one attribute will automatically update the others.
     Values >= 360 or <= -360 will automatically be reduced by
-    multiples of 360
+    multiples of 360.
+    Only the value that was last set is stored; the other two representations
+    are derived on first access and cached until the next assignment. Uses
+    __slots__ to keep instances small (no per-instance __dict__).
     """
 
+    __slots__ = ('_rad', '_decD', '_degMin')
+
     signDict = {}
     signDict['lat'] = { 1 : 'N', -1:'S' }
     signDict['lon'] = { 1 : 'E', -1:'W' }
     signDict['generic'] = { 1 : '+', -1:'-' }
 
     def __init__(self, decD = 0):
-        """Initializes decimal degree attribute of Angle;
-        __setattr__ will take care of the other attributes
+        """Initializes decimal degree attribute of Angle; rad and degMin
+        will be derived when first accessed
         """
         self.decD = decD
 
+    def __getDecD(self):
+        if self._decD is None:
+            self._decD = degrees(self._rad)
+        return self._decD
+
+    def __setDecD(self, value):
+        if abs(value) >= 360:
+            n = int(value / float(360))
+            value = value - n*360
+        self._decD = value
+        self._rad = None
+        self._degMin = None
+
+    decD = property(__getDecD, __setDecD)
+
+    def __getRad(self):
+        if self._rad is None:
+            self._rad = radians(self._decD)
+        return self._rad
+
+    def __setRad(self, value):
+        if abs(value) >= 2*pi:
+            n = int(value / (2*pi))
+            value = value - n*2*pi
+        self._rad = value
+        self._decD = None
+        self._degMin = None
+
+    rad = property(__getRad, __setRad)
+
+    def __getDegMin(self):
+        if self._degMin is None:
+            decD = self.decD
+            d = abs(int(decD))
+            m = (abs(decD) - d) * 60
+            if decD != 0:
+                sign =  int(abs(decD)/decD)
+            else:
+                sign = 1
+            self._degMin = (d, m, sign)
+        return self._degMin
 
-    def __setattr__(self, name, value):
-        """Keep rad and deg values in synch, remove 360 multiples
-        """
+    def __setDegMin(self, value):
+        if value[0] >= 360:
+            n = int(value[0] / float(360))
+            value = ((value[0] - n*360), ) + tuple(value[1:])
+        self._degMin = value
+        self._decD = (value[0] + value[1]/60.0) * value[2]
+        self._rad = None
 
-        self.__dict__[name] = value
+    degMin = property(__getDegMin, __setDegMin)
 
-        if name == "degMin":
-            if self.degMin[0] >= 360:
-                n = int(self.degMin[0] / float(360))
-                self.__dict__["degMin"] = ((self.degMin[0] - n*360), ) + self.degMin[1:]
+    def __getstate__(self):
+        return (self.decD, )
 
-            self.__dict__["decD"] = (self.degMin[0] + self.degMin[1]/60.0) * self.degMin[2]
-            self.__dict__["rad"] = radians(self.decD)
+    def __setstate__(self, state):
+        self.decD = state[0]
 
-        elif name == "rad":
-            if abs(self.rad) >= 2*pi:
-                n = int(self.rad / (2*pi))
-                self.__dict__["rad"] = self.rad - n*2*pi
-            decD = degrees(self.rad)
-            d = abs(int(decD))
-            m = (abs(degrees(self.rad)) - d) * 60
-            if self.rad != 0:
-                sign =  int(abs(self.rad)/self.rad)
-            else:
-                sign = 1
-            self.__dict__["degMin"] = (d, m, sign)
-            self.__dict__["decD"] = decD
-
-        elif name == "decD":
-            if abs(self.decD) >= 360:
-                n = int(self.decD / float(360))
-                self.__dict__["decD"] = self.decD - n*360
-            self.__dict__["rad"] = radians(self.decD)
-            d = abs(int(self.decD))
-            m = (abs(self.decD) - d) * 60
-            if self.decD != 0:
-                sign =  int(abs(self.decD)/self.decD)
-            else:
-                sign = 1
-            self.__dict__["degMin"] = (d, m, sign)
+    def __str__(self):
+        """Same format as classprint.AttrDisplay (which relies on __dict__)
+        """
+        return '[%s: decD=%s, degMin=%s, rad=%s]' % (self.__class__.__name__, self.decD,
+                self.degMin, self.rad)
 
     def latStr(self):
         """Returns angle as latitude string (e.g. 'N 20 34.5')
@@ -169,6 +259,171 @@ class Angle(classprint.AttrDisplay):
         return '%3d' % int(round(self.decD))
 
 
+class AngleArray(classprint.AttrDisplay, object):
+    """Array counterpart to Angle for bulk data (e.g. hourly almanac values).
+    Stores a sequence of angles as contiguous NumPy float arrays
+        - decD: degrees as decimal fraction
+        - rad: radians
+    Whole degrees, minutes and signs (the elements of Angle.degMin) are only
+    computed when degMin or one of the string methods is called. Setting decD,
+    rad or degMin will update the other attributes. As with Angle, values >=
+    360 or <= -360 will automatically be reduced by multiples of 360.
+    Indexing with an integer returns an Angle object, slicing returns an
+    AngleArray; assigning an Angle or a float (degrees) to an index updates the
+    stored arrays.
+    """
+
+    def __init__(self, decD = ()):
+        """Initializes decD (and rad) from a scalar or a sequence of degrees
+        with decimal fraction
+        """
+        self.decD = decD
+
+    def fromRad(cls, rad):
+        """Returns a new AngleArray initialized from a sequence of radians
+        """
+        a = cls()
+        a.rad = rad
+        return a
+
+    fromRad = classmethod(fromRad)
+
+    def view(cls, decD):
+        """Returns a new AngleArray using the float64 array decD (degrees, no
+        multiples of 360) without copying it, e.g. a column of a memory-mapped
+        almanac cache; read-only arrays will stay read-only
+        """
+        a = cls()
+        a._decD = decD
+        a._rad = np.radians(decD)
+        return a
+
+    view = classmethod(view)
+
+    def __getDecD(self):
+        return self._decD
+
+    def __setDecD(self, value):
+        decD = np.array(value, dtype = np.float64, ndmin = 1)
+        decD = np.fmod(decD, 360.0)         # removes 360 multiples, keeps sign
+        self._decD = decD
+        self._rad = np.radians(decD)
+
+    decD = property(__getDecD, __setDecD)
+
+    def __getRad(self):
+        return self._rad
+
+    def __setRad(self, value):
+        rad = np.fmod(np.array(value, dtype = np.float64, ndmin = 1), 2*pi)
+        self._rad = rad
+        self._decD = np.degrees(rad)
+
+    rad = property(__getRad, __setRad)
+
+    def __getDegMin(self):
+        """Returns tuple (deg, min, sign) of arrays with whole degrees, minutes
+        (incl. fraction) and sign (+1 / -1)
+        """
+        absD = np.abs(self._decD)
+        d = np.trunc(absD)
+        m = (absD - d) * 60
+        sign = np.where(self._decD < 0, -1, 1)
+        return (d.astype(int), m, sign)
+
+    def __setDegMin(self, value):
+        d = np.array(value[0], dtype = np.float64, ndmin = 1)
+        d = np.where(d >= 360, d - np.trunc(d / 360.0) * 360, d)
+        self.decD = (d + np.asarray(value[1]) / 60.0) * np.asarray(value[2])
+
+    degMin = property(__getDegMin, __setDegMin)
+
+    def __len__(self):
+        return len(self._decD)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return AngleArray(self._decD[index])
+        return Angle(float(self._decD[index]))
+
+    def __setitem__(self, index, value):
+        if isinstance(value, Angle):
+            value = value.decD
+        self._decD[index] = np.fmod(value, 360.0)
+        self._rad[index] = np.radians(self._decD[index])
+
+    def __iter__(self):
+        for d in self._decD:
+            yield Angle(float(d))
+
+    def tolist(self):
+        """Returns list of Angle objects
+        """
+        return list(self)
+
+    def latStr(self):
+        """Returns array of latitude strings (e.g. 'N 20 34.5')
+        """
+        d, m, sign = self.degMin
+        return _joinStr(_signArray(sign, 'lat'), ' ', np.char.mod('%02d', d), ' ',
+                np.char.mod('%04.1f', m))
+
+    def latStrDeg(self):
+        """Returns array of latitude strings, rounded to full degrees (e.g. 'N30')
+        """
+        return _joinStr(_signArray(self.degMin[2], 'lat'),
+                np.char.mod('%02d', _roundArray(np.abs(self._decD))))
+
+    def lonStr(self):
+        """Returns array of longitude strings (e.g. 'E 178 34.5')
+        """
+        d, m, sign = self.degMin
+        return _joinStr(_signArray(sign, 'lon'), ' ', np.char.mod('%03d', d), ' ',
+                np.char.mod('%04.1f', m))
+
+    def absStr(self):
+        """Returns array of strings without sign (e.g. '178 34.5')
+        """
+        d, m, sign = self.degMin
+        return _joinStr(np.char.mod('%d', d), ' ', np.char.mod('%04.1f', m))
+
+    def signStr(self):
+        """Returns array of +/- signed strings (e.g. '-178 34.5')
+        """
+        d, m, sign = self.degMin
+        return _joinStr(_signArray(sign, 'generic'), np.char.mod('%d', d), ' ',
+                np.char.mod('%04.1f', m))
+
+    def intStr(self):
+        """Returns array of integer strings (e.g. '178'). Fractional degrees
+        will be rounded and a '-' will be shown for negative values.
+        """
+        return np.char.mod('%3d', _roundArray(self._decD))
+
+
+def _signArray(sign, kind):
+    """Maps an array of +1/-1 signs to the sign characters in
+    Angle.signDict[kind]
+    """
+    return np.where(sign < 0, Angle.signDict[kind][-1], Angle.signDict[kind][1])
+
+
+def _roundArray(a):
+    """Rounds half away from zero (like the built-in round()) and returns an
+    int array
+    """
+    return (np.sign(a) * np.floor(np.abs(a) + 0.5)).astype(int)
+
+
+def _joinStr(*parts):
+    """Concatenates string arrays (or plain strings) element-wise
+    """
+    s = np.asarray(parts[0])
+    for p in parts[1:]:
+        s = np.char.add(s, p)
+    return s
+
+
 class Sight(classprint.AttrDisplay):
     """Wrapper for sextant height, apparent height, UT, Ic and Az
     """
@@ -192,6 +447,8 @@ class Sight(classprint.AttrDisplay):
         self.srfIc = Ic             # Ic corrected for short run fix (based on vessel SOG, COG)
         self.Az = Angle(Az)         # Azimuth
 
+        self.outlier = False        # set by LOP.selectSight()
+
 
 class MyObserver(ephem.Observer, classprint.AttrDisplay):
     """Customizes PyEphem's Observer class to allow initialization and lat/lon in
@@ -309,6 +566,20 @@ class LOP(classprint.AttrDisplay):
             s.Ha.rad = s.Hs.rad + self.observer.indexError.rad + self.observer.dip.rad
 
 
+    def identifyStar(self, az, sightIndex = -1):
+        """Returns list of starid.StarMatch records for the stars matching
+        the Sight self.sightList[sightIndex] observed at approximate azimuth
+        az (degrees) from the observer's position (DR), best match first.
+        Matches are taken from starindex.catalogue(); only navigational stars
+        (see starcat) can be set as self.starName/self.starNum for reduction.
+        """
+        s = self.sightList[sightIndex]
+        return starid.identify(s.Hs.decD, az, s.UT, degrees(self.observer.lat),
+                degrees(self.observer.lon), indexError = self.observer.indexError.decD * 60,
+                heightOfEye = self.observer.heightOfEye, elevation = self.observer.elevation,
+                temp = self.observer.temp, pressure = self.observer.pressure)
+
+
     def calcIcAz(self):
         """Calculates intercept Ic and azimuth Az for all shots in self.sightList
         and updates Ic and Az attributes of each shot accordingly. Also updates
@@ -319,72 +590,260 @@ class LOP(classprint.AttrDisplay):
         to sextant altitude corrected for index error and dip in order to calculate
         intercepts. For sun and moon, PyEphem also provides radii which are used to
         adjust computed apparen topocentric altitudes to yield values that can be compared
-        to upper or lower limb sights.
+        to upper or lower limb sights. The actual reduction is done for all
+        sights at once by reduceSights().
         """
-        splitBody = self.body.split()   # split off "LL" or "UL" for sun and moon
-
         self.calcHa()                   # calculate apparent observed altitude for
                                         # all shots
 
-        for s in self.sightList:
+        if len(self.sightList) == 0:
+            return
 
-            self.observer.date = s.UT
+        (Ic, srfIc, Az, Hc) = reduceSights([s.UT for s in self.sightList],
+                [s.Hs.decD for s in self.sightList], self.body, degrees(self.observer.lat),
+                degrees(self.observer.lon), starName = self.starName,
+                indexError = self.observer.indexError.decD * 60,
+                heightOfEye = self.observer.heightOfEye, elevation = self.observer.elevation,
+                temp = self.observer.temp, pressure = self.observer.pressure,
+                fixUT = self.fix.UT, SOG = self.fix.SOG, COG = self.fix.COG.decD)
 
-            # create ephem object instance for body;
-            if splitBody[0] == 'star':
+        for (i, s) in enumerate(self.sightList):
+            s.Ic = float(Ic[i])
+            s.srfIc = float(srfIc[i])
+            s.Az = Angle(float(Az[i]))
 
-                if STAR_CALC == 'ephem':
+        self.observer.date = self.sightList[-1].UT
 
-                    e = starcat.navStar(self.starName)
-                    e.compute(self.observer)    # computing with Observer argument will
-                                                # yield topocentric apparent altitude
-                    Hc = Angle(e.alt * 180 / pi)
-                                                # calculated topocentric apparent altitude
-                                                # incl. refraction
-                    s.Az = Angle(e.az * 180 / pi)
 
-                elif STAR_CALC == 'aa':
+    def selectSight(self, method = None):
+        """Fits the series of Sights in self.sightList against time (see
+        sightsel), sets the outlier attribute of each Sight and sets
+        self.lopSightIndex to the best Sight. method is 'curve' (fits srfIc,
+        requires prior call to calcIcAz()) or 'linear' (fits Hs); defaults to
+        sightsel.METHOD. Returns the sightsel.SeriesFit or None if
+        self.sightList is empty.
+        """
+        if len(self.sightList) == 0:
+            return None
+        if method is None:
+            method = sightsel.METHOD
+
+        t = utArray([s.UT for s in self.sightList]) * 86400
+        if method == 'linear':
+            fit = sightsel.fitSeries(t, [s.Hs.decD * 60 for s in self.sightList], degree = 1)
+        else:
+            fit = sightsel.fitSeries(t, [s.srfIc for s in self.sightList], degree = 0)
 
-                    d = aaStars(LOP.aaReDict, AA_STAR_CAT_FILE, self.starNum, ut = s.UT,
-                            lat = degrees(self.observer.lat), lon = degrees(self.observer.lon),
-                            hoe = self.observer.heightOfEye, temp = self.observer.temp,
-                            pressure = self.observer.pressure)
+        for (s, outlier) in zip(self.sightList, fit.outliers):
+            s.outlier = bool(outlier)
+        self.lopSightIndex = fit.index
 
-                    # extract Hc and Az:
-                    Hc = Angle(float(d['alt']))
-                    s.Az = Angle(float(d['az']))
+        return fit
 
+
+    def synthSight(self, fit):
+        """Returns a new Sight synthesized from sightsel.SeriesFit fit (as
+        returned by selectSight()): UT of the Sight closest to the mean time
+        of all inliers, Hs corrected by that Sight's residual, i.e. the value
+        the fitted curve has at that time. The Sight is not reduced and not
+        added to self.sightList.
+        """
+        s = self.sightList[fit.synthIndex]
+        return Sight(Hs = s.Hs.decD - fit.residuals[fit.synthIndex] / 60.0, UT = s.UT)
+
+
+def reduceSights(ut, Hs, body, lat, lon, starName = None, indexError = 0, heightOfEye = 0,
+        elevation = 0, temp = 20, pressure = 1010, fixUT = None, SOG = 0, COG = 0, method = None):
+    """Batch sight reduction: calculates intercepts and azimuths for any number
+    of sights in one call. Returns a tuple (Ic, srfIc, Az, Hc) of NumPy arrays
+    with one element per sight:
+        Ic          -   intercept in nm (towards = +)
+        srfIc       -   intercept corrected for MOO to fixUT based on SOG/COG
+        Az          -   azimuth in degrees
+        Hc          -   computed topocentric apparent altitude in degrees (incl.
+                        refraction and, for Sun/Moon limb sights, semidiameter)
+    Arguments (all except ut and Hs may be scalars which then apply to all
+    sights, or sequences with one value per sight):
+        ut          -   sequence of (Y, M, D, h, m, s) tuples or ephem dates
+        Hs          -   sextant altitudes in degrees incl. decimal fraction
+        body        -   one of the values in bodyList (e.g. 'Sun LL', 'star')
+        lat, lon    -   AP in degrees incl. decimal fraction (S, W = -)
+        starName    -   star name for body == 'star' (see starcat)
+        indexError  -   in arc minutes
+        heightOfEye -   in m
+        elevation   -   above sea level in m
+        temp        -   in deg C
+        pressure    -   in mbar
+        fixUT       -   UT of fix (tuple or ephem date) for MOO correction;
+                        srfIc will equal Ic if None
+        SOG, COG    -   vessel speed in kn and course in degrees true
+        method      -   'ephem', 'navtri' or 'almanac' (see ICAZ_CALC);
+                        defaults to ICAZ_CALC
+    Uses PyEphem (or aa or starvec for stars, see STAR_CALC). Bodies and the
+    observer are re-used for all sights (see ephpool) and results for
+    body/UT/observer combinations that have been computed before are taken
+    from ephpool.cache; Ha, Ic and the MOO correction are calculated as array
+    operations. With method == 'navtri' ephem only provides geocentric
+    GHA/Dec/HP/SD per body and UT, and Hc/Az are obtained for all sights at
+    once from navtri.apparentHcZn() (parallax, refraction and limb corrections
+    applied the same way ephem does). method == 'almanac' works like 'navtri'
+    with GHA/Dec/HP/SD of Sun, Moon and planets interpolated from the hourly
+    almanac data (see alminterp).
+    """
+    utList = list(ut)
+    date = utArray(utList)
+    n = len(date)
+
+    body = _bcast(body, n)
+    starName = _bcast(starName, n)
+    latArr = np.array(_bcast(lat, n), dtype = np.float64)
+    lonArr = np.array(_bcast(lon, n), dtype = np.float64)
+    hoe = np.array(_bcast(heightOfEye, n), dtype = np.float64)
+    tempArr = _bcast(temp, n)
+    pressureArr = _bcast(pressure, n)
+    elevationArr = _bcast(elevation, n)
+
+    # apparent altitude (same as LOP.calcHa() and MyObserver.calcDip()):
+    Ha = (np.asarray(Hs, dtype = np.float64) + np.asarray(indexError, dtype = np.float64) / 60.0
+            - 0.0293 * np.sqrt(hoe))
+
+    Hc = np.empty(n)
+    Az = np.empty(n)
+
+    if method is None:
+        method = ICAZ_CALC
+
+    triMask = np.zeros(n, dtype = bool)
+
+    for i in range(n):
+
+        splitBody = body[i].split()     # split off "LL" or "UL" for sun and moon
+
+        if splitBody[0] == 'star' and STAR_CALC == 'aa':
+            t = utList[i]
+            if not isinstance(t, tuple):
+                t = ephem.Date(t).tuple()
+                t = t[:5] + (int(round(t[5])), )
+            d = aaStars(LOP.aaReDict, AA_STAR_CAT_FILE, starcat.navStarNum[starName[i]], ut = t,
+                    lat = latArr[i], lon = lonArr[i], hoe = hoe[i], temp = tempArr[i],
+                    pressure = pressureArr[i])
+            Hc[i] = float(d['alt'])
+            Az[i] = float(d['az'])
+            continue
+
+        if method in ('navtri', 'almanac') or (splitBody[0] == 'star' and STAR_CALC == 'vector'):
+            triMask[i] = True           # done for all sights below
+            continue
+
+        # topocentric apparent altitude incl. refraction (from ephem or from
+        # the result cache):
+        e = ephpool.compute(splitBody[0], date[i], starName = starName[i], lat = latArr[i],
+                lon = lonArr[i], elevation = elevationArr[i], temp = tempArr[i],
+                pressure = pressureArr[i])
+        alt = e.alt
+        if len(splitBody) > 1:          # Sun or Moon with "LL" or "UL": add/subtract
+                                        # (topocentric) semidiameter
+            if splitBody[1] == "UL":
+                alt += e.radius
             else:
+                alt -= e.radius
+        Hc[i] = degrees(alt)
+        Az[i] = degrees(e.az)
+
+    if np.any(triMask):
+        # geocentric GHA/Dec/HP/SD per sight (independent of AP, hence cached
+        # across AP changes; interpolated from the almanac tables for
+        # 'almanac'), triangle solved for all sights at once:
+        m = triMask
+        if method == 'almanac':
+            import alminterp
+            positions = alminterp.geoPositions
+        else:
+            positions = geoPositions
+        (ghaArr, decArr, hpArr, sdArr, limbArr) = positions(date[m],
+                [body[i] for i in np.flatnonzero(m)], [starName[i] for i in np.flatnonzero(m)])
+        (Hc[m], Az[m]) = navtri.apparentHcZn(ghaArr, decArr, latArr[m], lonArr[m],
+                hp = hpArr, sd = sdArr, limb = limbArr,
+                elevation = np.asarray(elevationArr, dtype = np.float64)[m],
+                temp = np.asarray(tempArr, dtype = np.float64)[m],
+                pressure = np.asarray(pressureArr, dtype = np.float64)[m])
+
+    Ic = (Ha - Hc) * 60
+
+    # short-run fix intercept, corrected for MOO between sight and fix time:
+    if fixUT is None:
+        srfIc = Ic.copy()
+    else:
+        dT_hrs = (float(ephem.Date(fixUT)) - date) * 24
+        srfIc = Ic + np.cos(radians(COG) - np.radians(Az)) * SOG * dT_hrs
 
-                e = ephem.__dict__[splitBody[0]]()
-
-                e.compute(self.observer)    # computing with Observer argument will
-                                            # yield topocentric apparent altitude
-                s.Az = Angle(e.az * 180 / pi)
-                Hc = Angle(e.alt * 180 / pi)
-                                            # calculated topocentric apparent altitude
-                                            # incl. refraction
-                if len(splitBody) > 1:      # Sun or Moon with "LL" or "UL"
-                    if splitBody[1] == "UL":
-                        Hc.rad += e.radius  # add semidiamter to calc. altitude to make
-                                            # it comparable to observed Ha
-                    else:
-                        Hc.rad -= e.radius  # same logic for lower limb sight
-                                            # Note: this radius is topocentric since the
-                                            # intercept calculation is done with all topo-
-                                            # centric values. The value of e.radius will
-                                            # will differ from the SD value listed in the
-                                            # NA (geocentric).
-
-            s.Ic = (s.Ha.decD - Hc.decD) * 60
-
-            # calculate short-run fix intercept, corrected for MOO:
-            # calculate difference between fix and sight times:
-            dT = dt.datetime(*self.fix.UT) - dt.datetime(*s.UT) # as dt.timedelta
-            dT_hrs = dT.days * 24 + dT.seconds / 3600.0         # in hours
-
-            # now calculate MOO corrected Intercept based on Fix SOG/COG
-            s.srfIc = s.Ic + cos(self.fix.COG.rad - s.Az.rad) * self.fix.SOG * dT_hrs
+    return (Ic, srfIc, Az, Hc)
+
+
+def geoPositions(ut, body, starName = None):
+    """Returns tuple (gha, dec, hp, sd, limb) of NumPy arrays with geocentric
+    apparent GHA, Dec, horizontal parallax and semidiameter (all in degrees)
+    plus limb indicator (+1 UL, -1 LL, 0 otherwise; see navtri.LIMB) for each
+    element of ut (sequence of (Y, M, D, h, m, s) tuples or ephem dates). body
+    and starName may be scalars or sequences (see reduceSights()). hp is 0 for
+    stars, sd is 0 unless body is a Sun/Moon limb sight. Positions are taken
+    from the Chebyshev ephemeris (see chebeph) for the UTs it covers, stars
+    from starvec if STAR_CALC == 'vector', all others from ephpool.cache.
+    """
+    date = utArray(ut)
+    n = len(date)
+    body = _bcast(body, n)
+    starName = _bcast(starName, n)
+
+    gha = np.empty(n)
+    dec = np.empty(n)
+    hp = np.zeros(n)
+    sd = np.zeros(n)
+    limb = np.zeros(n)
+
+    splitBody = [b.split() for b in body]   # split off "LL" or "UL" for sun and moon
+    for (i, b) in enumerate(splitBody):
+        if len(b) > 1:
+            limb[i] = navtri.LIMB[b[1]]
+
+    # Sun, Moon and planets from the Chebyshev ephemeris:
+    done = np.zeros(n, dtype = bool)
+    cheb = chebeph.ephemeris()
+    if cheb is not None:
+        names = np.array([b[0] for b in splitBody])
+        for name in set(names):
+            m = (names == name) & cheb.covers(name, date)
+            if np.any(m):
+                (gha[m], dec[m], hp[m], sd[m]) = cheb.positions(name, date[m])
+                done |= m
+        sd[limb == 0] = 0
+
+    # stars all at once from starvec:
+    if STAR_CALC == 'vector':
+        m = np.array([b[0] == 'star' for b in splitBody], dtype = bool)
+        if np.any(m):
+            (gha[m], dec[m]) = starvec.positions(date[m], [starName[i] for i in np.flatnonzero(m)])
+            done |= m
+
+    # all others from ephem:
+    todo = np.flatnonzero(~done)
+    if len(todo) > 0:
+        ra = np.empty(len(todo))
+        dist = np.empty(len(todo))
+        dist.fill(np.inf)
+        for (j, i) in enumerate(todo):
+            e = ephpool.compute(splitBody[i][0], date[i], starName = starName[i])
+            ra[j] = e.ra
+            dec[i] = degrees(e.dec)
+            if e.dist is not None:
+                dist[j] = e.dist
+            if limb[i] != 0:
+                sd[i] = degrees(e.radius)
+
+        gha[todo] = np.mod(ghaAriesArray(date[todo]) - np.degrees(ra), 360.0)
+        hp[todo] = navtri.hpFromDist(dist)
+
+    return (gha, dec, hp, sd, limb)
 
 
 class Fix(classprint.AttrDisplay):
@@ -414,6 +873,103 @@ class Fix(classprint.AttrDisplay):
         self.lat = Angle(lat)
         self.lon = Angle(lon)
 
+        self.fixResult = None   # lsqfix.FixResult from last call to calcFix()
+        self.fixMC = None       # fixmc.MCResult from last call to calcFixMC()
+
+
+    def calcFix(self, useAllSights = False):
+        """Calculates fix from any number of LOPs by iterative least squares
+        (see lsqfix). Each LOP may have its own AP. If useAllSights is False
+        only the Sight indicated by LOP.lopSightIndex is used for each LOP
+        (LOPs without a selected Sight are skipped), otherwise all Sights of
+        all LOPs are used. Observed altitudes are corrected for MOO to self.UT
+        based on Fix.SOG and Fix.COG. Sets self.lat, self.lon and
+        self.fixResult (a lsqfix.FixResult with covariance and residuals) and
+        returns self.fixResult. Raises FixLOPError if there are fewer than two
+        Sights or if the LOPs do not intersect (parallel azimuths).
+        """
+        (sights, date, apLat, apLon, ghaArr, decArr, corr) = self.__fixSights(useAllSights)
+
+        dT_hrs = (float(ephem.Date(self.UT)) - date) * 24
+
+        try:
+            self.fixResult = lsqfix.lsqFix(ghaArr, decArr, [s.Ha.decD for (lop, s) in sights],
+                    apLat[0], apLon[0], corr = corr, dT = dT_hrs, SOG = self.SOG, COG = self.COG.decD)
+        except lsqfix.LSQFixError:
+            raise FixLOPError
+
+        self.lat.decD = self.fixResult.lat
+        self.lon.decD = self.fixResult.lon
+
+        return self.fixResult
+
+
+    def calcFixMC(self, useAllSights = False, nDraws = None, seed = None, **sigmas):
+        """Monte Carlo estimate of the uncertainty of the fix calculated by
+        calcFix() (see fixmc): perturbs Hs, index error, height of eye, UT and
+        SOG/COG and re-solves the fix for each draw. nDraws defaults to
+        fixmc.N_DRAWS; keyword arguments HsSigma, ieSigma, hoeSigma, utSigma,
+        sogSigma and cogSigma override the std. deviations set in fixmc. Calls
+        calcFix() first, sets self.fixMC to the fixmc.MCResult and returns it.
+        Raises FixLOPError in the same cases as calcFix().
+        """
+        self.calcFix(useAllSights)
+
+        (sights, date, apLat, apLon, ghaArr, decArr, corr) = self.__fixSights(useAllSights)
+
+        # rate of change of GHA for UT errors (one minute difference):
+        (gha2, dec2, hp2, sd2, limb2) = geoPositions(date + 60 / 86400.0,
+                [lop.body for (lop, s) in sights], [lop.starName for (lop, s) in sights])
+        ghaRate = (np.mod(gha2 - ghaArr + 180, 360.0) - 180) / 60.0
+
+        if nDraws is None:
+            nDraws = fixmc.N_DRAWS
+
+        try:
+            self.fixMC = fixmc.monteCarloFix(ghaArr, decArr, ghaRate,
+                    [s.Hs.decD for (lop, s) in sights],
+                    [lop.observer.indexError.decD * 60 for (lop, s) in sights],
+                    [lop.observer.heightOfEye for (lop, s) in sights], corr,
+                    (float(ephem.Date(self.UT)) - date) * 24, self.lat.decD, self.lon.decD,
+                    SOG = self.SOG, COG = self.COG.decD, nDraws = nDraws, seed = seed, **sigmas)
+        except lsqfix.LSQFixError:
+            raise FixLOPError
+
+        return self.fixMC
+
+
+    def __fixSights(self, useAllSights):
+        """Returns tuple (sights, date, apLat, apLon, gha, dec, corr) for the
+        Sights to be used by calcFix() and calcFixMC(): list of (lop, sight)
+        pairs and NumPy arrays with ephem date, AP, geocentric GHA/Dec and
+        altitude correction (lsqfix.altCorrections()) per Sight. Raises
+        FixLOPError if there are fewer than 2 Sights.
+        """
+        sights = []         # (lop, sight) pairs
+        for lop in self.lopList:
+            lop.calcHa()
+            if useAllSights:
+                sights.extend([(lop, s) for s in lop.sightList])
+            elif 0 <= lop.lopSightIndex < len(lop.sightList):
+                sights.append((lop, lop.sightList[lop.lopSightIndex]))
+
+        if len(sights) < 2:
+            raise FixLOPError
+
+        date = utArray([s.UT for (lop, s) in sights])
+        apLat = np.array([degrees(lop.observer.lat) for (lop, s) in sights])
+        apLon = np.array([degrees(lop.observer.lon) for (lop, s) in sights])
+
+        (ghaArr, decArr, hpArr, sdArr, limbArr) = geoPositions(date,
+                [lop.body for (lop, s) in sights], [lop.starName for (lop, s) in sights])
+
+        corr = lsqfix.altCorrections(ghaArr, decArr, apLat, apLon, hp = hpArr, sd = sdArr,
+                limb = limbArr, elevation = np.array([lop.observer.elevation for (lop, s) in sights]),
+                temp = np.array([lop.observer.temp for (lop, s) in sights], dtype = np.float64),
+                pressure = np.array([lop.observer.pressure for (lop, s) in sights], dtype = np.float64))
+
+        return (sights, date, apLat, apLon, ghaArr, decArr, corr)
+
 
     def calc2LOPFix(self):
         """Calculates fix from two LOPs by using plane trig. For each LOP the sight indicated
@@ -472,7 +1028,7 @@ class Fix(classprint.AttrDisplay):
 
 class FixLOPError(Exception):
     """Exception to be used if Fix calculation is requested with something other than 2 LOPs with
-    1 Sight selected each.
+    1 Sight selected each (calc2LOPFix()) or with fewer than 2 usable Sights (calcFix()).
     """
     pass
 
@@ -719,69 +1275,132 @@ class SunMoonRiseSet(classprint.AttrDisplay):
 class AlmanacPage(classprint.AttrDisplay):
     """Caluclates hourly GHA and Dec data for self.date for Sun, Moon, Venus,
     Mars, Jupiter and Saturn. Data for each body is stored in a dictionary with
-    keys 'gha' and 'dec' and a list with 24 Angle objects stored against either
-    key.  For the Moon 24 Angle objects for HP are also provided under key
-    'hp'. Also provides hourly GHA for Aries for self.date which is stored in a
-    list with 24 Angle items.
+    keys 'gha' and 'dec' and an AngleArray with 24 hourly values stored against
+    either key.  For the Moon an AngleArray with 24 values for HP is also
+    provided under key 'hp'. Also provides hourly GHA for Aries for self.date
+    which is stored in an AngleArray with 24 items. Indexing any of these
+    arrays by hour returns an Angle object. All values are calculated on one
+    hourly time grid (self.utGrid, NumPy array of ephem dates); GHA Aries is
+    evaluated once per hour and shared by all bodies. Dates calculated before
+    are loaded from the almanac cache file (see almcache), in which case the
+    arrays are read-only views into that file; others are calculated from the
+    Chebyshev ephemeris (see chebeph) if it covers self.date, else with ephem.
+    The hourly data of self.window days from self.date on is kept in
+    self.windowData (one array per day, columns as almcache.COLUMNS), so
+    stepping the date forward only calculates the day entering the window.
     """
-    def __init__(self, date = None):
+    def __init__(self, date = None, window = None):
         """Sets up data structures and initializes these with values provided
         by PyEphem for <date> (see class doc string for details). date is a (Y,
         M, D) triple. If no date is provided datetime.datetime.utcnow() will be
-        used, with hour, minute and second set to 0.
+        used, with hour, minute and second set to 0. window is the number of
+        days of hourly data kept from date on (see updateData(), defaults to
+        ALMANAC_WINDOW).
         """
-        self.aries = []
-        self.sun = { 'ephemClass' : 'Sun', 'gha' : [], 'dec' : [] }
-        self.moon = { 'ephemClass' : 'Moon', 'gha' : [], 'dec' : [], 'hp' : [] }
-        self.venus = { 'ephemClass' : 'Venus', 'gha' : [], 'dec' : [] }
-        self.mars = { 'ephemClass' : 'Mars', 'gha' : [], 'dec' : [] }
-        self.jupiter = { 'ephemClass' : 'Jupiter', 'gha' : [], 'dec' : [] }
-        self.saturn = { 'ephemClass' : 'Saturn', 'gha' : [], 'dec' : [] }
+        self.aries = AngleArray(np.zeros(24))
+        self.sun = { 'ephemClass' : 'Sun', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)) }
+        self.moon = { 'ephemClass' : 'Moon', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)),
+                'hp' : AngleArray(np.zeros(24)) }
+        self.venus = { 'ephemClass' : 'Venus', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)) }
+        self.mars = { 'ephemClass' : 'Mars', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)) }
+        self.jupiter = { 'ephemClass' : 'Jupiter', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)) }
+        self.saturn = { 'ephemClass' : 'Saturn', 'gha' : AngleArray(np.zeros(24)), 'dec' : AngleArray(np.zeros(24)) }
 
         if date == None:
             date = dt.datetime.utcnow().timetuple()[:3]
 
         self.date = date
 
-        # start with Aries:
-        for h in range(24):
-            t = self.date + (h, 0, 0)
-            self.aries.append(Angle(ghaAries(t)))
+        if window is None:
+            window = ALMANAC_WINDOW
+        self.window = max(1, window)
+        self.windowDays = []
+        self.windowData = []
 
-        # now planets...
-        for body in ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn'):
-
-            p = ephem.__dict__[self.__dict__[body]['ephemClass']]()
-
-            for h in range(24):
-                t = self.date + (h, 0, 0)
-                p.compute(t)
-                self.__dict__[body]['dec'].append(Angle(degrees(p.dec)))
-                self.__dict__[body]['gha'].append(Angle(gha(p.ra, t)))
-                if body == 'moon':
-                    self.__dict__[body]['hp'].append(Angle(hpMoon(degrees(p.radius))))
+        self.updateData()
 
 
     def updateData(self):
-        """Updates Aries list and planet dictionaries based on self.date
+        """Updates Aries array and planet dictionaries based on self.date. The
+        hourly data of self.window days from self.date is kept; days already
+        in that window are not calculated again, i.e. when self.date advances
+        by one day only the new last day of the window is calculated.
         """
-        # start with Aries:
-        for h in range(24):
-            t = self.date + (h, 0, 0)
-            self.aries[h].decD = ghaAries(t)
+        # hourly time grid:
+        self.utGrid = utArray([tuple(self.date) + (h, 0, 0) for h in range(24)])
+
+        # slide window, re-using the days it had before:
+        day = float(self.utGrid[0])
+        days = [day + d for d in range(self.window)]
+        known = dict(zip(self.windowDays, self.windowData))
+        self.windowData = [known[d] if d in known else self.__dayData(d) for d in days]
+        self.windowDays = days
+
+        for (c, (body, key)) in enumerate(almcache.COLUMNS):
+            if body == 'aries':
+                self.aries = AngleArray.view(self.windowData[0][:, c])
+            else:
+                self.__dict__[body][key] = AngleArray.view(self.windowData[0][:, c])
 
-        # now planets...
-        for body in ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn'):
 
-            p = ephem.__dict__[self.__dict__[body]['ephemClass']]()
+    def __dayData(self, day):
+        """Returns array (24 hours x len(almcache.COLUMNS)) with the values for
+        ephem date day (0h UT): from the almanac cache for dates calculated
+        before, else from the Chebyshev ephemeris if it covers the date, else
+        from ephem (and stored in the cache)
+        """
+        date = ephem.Date(day).tuple()[:3]
+        utGrid = day + np.arange(24) / 24.0
+
+        # data for dates calculated before is taken from the almanac cache:
+        pageCache = almcache.pageCache()
+        if pageCache is not None:
+            values = pageCache.get(date)
+            if values is not None:
+                return values
+
+        columns = {}
+
+        # from the Chebyshev ephemeris if it covers the date:
+        cheb = chebeph.ephemeris()
+        if cheb is not None and np.all(cheb.covers('Aries', utGrid)):
+            columns[('aries', None)] = cheb.positions('Aries', utGrid)[0]
+            for body in ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn'):
+                (ghaDeg, decDeg, hp, sd) = cheb.positions(self.__dict__[body]['ephemClass'],
+                        utGrid)
+                columns[(body, 'gha')] = ghaDeg
+                columns[(body, 'dec')] = decDeg
+                if body == 'moon':
+                    columns[(body, 'hp')] = hpMoon(sd)
 
-            for h in range(24):
-                t = self.date + (h, 0, 0)
-                p.compute(t)
-                self.__dict__[body]['dec'][h].decD = degrees(p.dec)
-                self.__dict__[body]['gha'][h].decD = gha(p.ra, t)
+        else:
+            # GHA Aries on the grid:
+            ariesDeg = ghaAriesArray(utGrid)
+            columns[('aries', None)] = ariesDeg
+
+            # now planets, one pass over the grid per body...
+            ra = np.empty(24)
+            dec = np.empty(24)
+            radius = np.empty(24)
+            for body in ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn'):
+
+                for (h, t) in enumerate(utGrid):
+                    p = ephpool.compute(self.__dict__[body]['ephemClass'], t)
+                    ra[h] = p.ra
+                    dec[h] = p.dec
+                    radius[h] = p.radius
+
+                # GHA = GHA Aries + SHA:
+                columns[(body, 'gha')] = np.mod(ariesDeg + 360 - np.degrees(ra), 360.0)
+                columns[(body, 'dec')] = np.degrees(dec)
                 if body == 'moon':
-                    self.__dict__[body]['hp'][h].decD = hpMoon(degrees(p.radius))
+                    columns[(body, 'hp')] = hpMoon(np.degrees(radius))
+
+        values = np.column_stack([np.fmod(columns[c], 360.0) for c in almcache.COLUMNS])
+        if pageCache is not None:
+            pageCache.put(date, values)
+
+        return values
 
 
 class StarFinder(classprint.AttrDisplay):
@@ -793,7 +1412,9 @@ class StarFinder(classprint.AttrDisplay):
     'dec' and 'sha'. 'mag' will be mapped to a float giving the star's
     magnitude. All other keys will be mapped to Angle objects providing
     topocentric apparent altitude and azimuth, and declination and SHA
-    repsctively.  Exports method updateStarData().
+    repsctively.  Exports method updateStarData(). starsNear() and
+    visibleStars() return the same data for stars selected from
+    starindex.catalogue() by position.
     """
 
     # shared dictionary to match aa output lines containing magnitude,
@@ -845,6 +1466,8 @@ class StarFinder(classprint.AttrDisplay):
             self.__ephemUpdateStarData()
         elif STAR_CALC == 'aa':
             self.__aaUpdateStarData()
+        elif STAR_CALC == 'vector':
+            self.__vectorUpdateStarData()
 
 
     def __ephemUpdateStarData(self):
@@ -858,52 +1481,190 @@ class StarFinder(classprint.AttrDisplay):
             'sha'   -   Sideral hour angle as celnav object
         """
         self.starData = {}
-        obs = ephem.Observer()
-        obs.date = self.ut
-        obs.lat = self.lat.rad
-        obs.lon = self.lon.rad
-        obs.temp = self.temp
-        obs.pressure = self.pressure
         for starName in self.starList:
-            s = starcat.navStar(starName)
-            s.compute(obs)
+            s = ephpool.compute('star', self.ut, starName = starName, lat = self.lat.decD,
+                    lon = self.lon.decD, temp = self.temp, pressure = self.pressure)
             self.starData[starName] = { 'mag' : s.mag, 'alt' : Angle(s.alt*180/pi),
                     'az' : Angle(s.az*180/pi), 'dec' : Angle(s.dec*180/pi),
                     'sha' : Angle(sha(s.ra)) }
 
 
+    def starsNear(self, alt, az, radius, maxMag = None):
+        """Returns dictionary with the same structure as self.starData for the
+        stars of starindex.catalogue() within radius degrees of altitude alt
+        and azimuth az (topocentric apparent) for the current self.ut,
+        self.lat, self.lon, ..., optionally only those not fainter than maxMag
+        """
+        return self.__indexStarData(starindex.catalogue().cone(self.ut, alt, az, radius,
+            self.lat.decD, self.lon.decD, maxMag = maxMag, elevation = self.elevation,
+            temp = self.temp, pressure = self.pressure))
+
+
+    def visibleStars(self, minAlt = 15, maxMag = None):
+        """Returns dictionary with the same structure as self.starData for the
+        stars of starindex.catalogue() at or above altitude minAlt (degrees,
+        topocentric apparent), optionally only those not fainter than maxMag
+        """
+        return self.__indexStarData(starindex.catalogue().visible(self.ut, self.lat.decD,
+            self.lon.decD, minAlt = minAlt, maxMag = maxMag, elevation = self.elevation,
+            temp = self.temp, pressure = self.pressure))
+
+
+    def __indexStarData(self, p):
+        return dict([(n, { 'mag' : p['mag'][j], 'alt' : Angle(p['alt'][j]),
+            'az' : Angle(p['az'][j]), 'dec' : Angle(p['dec'][j]), 'sha' : Angle(p['sha'][j]) })
+            for (j, n) in enumerate(p['names'])])
+
+
+    def __vectorUpdateStarData(self):
+        """Same as self.__ephemUpdateStarData() but with all stars in
+        self.starList calculated at once by starvec
+        """
+        t = starvec.table(self.ut, self.starList, lat = self.lat.decD, lon = self.lon.decD,
+                temp = self.temp, pressure = self.pressure)
+        self.starData = {}
+        for (j, starName) in enumerate(self.starList):
+            self.starData[starName] = { 'mag' : t['mag'][j], 'alt' : Angle(t['alt'][0, j]),
+                    'az' : Angle(t['az'][0, j]), 'dec' : Angle(t['dec'][0, j]),
+                    'sha' : Angle(t['sha'][0, j]) }
+
+
     def __aaUpdateStarData(self):
         """Updates self.starData based on current values of self.UT, self.lat,
-        self.lon, ... ; uses aa
+        self.lon, ... ; uses aa (one run for all stars in self.starList)
         """
-        self.starData = {}
-        for star in self.starList:
-            i = starNum(star)
-            odRaw = aaStars(StarFinder.reDict, AA_STAR_CAT_FILE, i, ut =
-                    self.ut, lat = self.lat.decD, lon = self.lon.decD, hoe =
-                    self.hoe, temp = self.temp, pressure = self.pressure)
-            od = {}
-            for key in odRaw:
-                if key == 'dec':
-                    s = odRaw[key].replace('d', '').replace('"', '').replace("'", "").split()
-                    if len(s) == 4:
-                        offs = 1
-                        sign = -1
-                    else:
-                        offs = 0
-                        sign = 1
-                    od[key] = Angle(sign * (float(s[0+offs]) + float(s[1+offs])/60 + float(s[2+offs])/3600))
-                elif key == 'sha':
-                    s = odRaw[key].replace('h', '').replace('m', '').replace("s", "").split()
-                    # convert RA hrs to rad:
-                    r = (float(s[0]) + float(s[1])/60 + float(s[2])/3600) * pi / 12.0
-                    od[key] = Angle(sha(r))
-                elif key == 'mag':
-                    od[key] = float(odRaw[key])
-                else:
-                    od[key] = Angle(float(odRaw[key]))
-
-            self.starData[star] = od
+        nums = [starNum(star) for star in self.starList]
+        odRaw = aaStarTable(StarFinder.reDict, AA_STAR_CAT_FILE, nums, ut = self.ut,
+                lat = self.lat.decD, lon = self.lon.decD, hoe = self.hoe, temp = self.temp,
+                pressure = self.pressure)
+        self.starData = dict([(star, aaStarData(od)) for (star, od) in zip(self.starList, odRaw)])
+
+
+def _aaRun(lines, lat = 0, lon = 0, hoe = 0, temp = 20, pressure = 1010):
+    """Runs aa once with lines (list of strings) as input, for an observer at
+    lat/lon (E = -) with height of eye hoe, temp and pressure; returns list of
+    aa's output lines. Input and output go through pipes; aa runs without a
+    shell in a working directory of its own (for its aa.ini), so calls from
+    several threads do not interfere.
+    """
+    aaWorkDir = tempfile.mkdtemp(prefix = 'aa')
+    try:
+        aaIni = open(os.path.join(aaWorkDir, "aa.ini"), 'w')
+        aaIni.write("%f\n" % lon)
+        aaIni.write("%f\n" %  lat)
+        aaIni.write("%.1f\n" % hoe)
+        aaIni.write("%d\n" % int(round(temp)))
+        aaIni.write("%d\n" % int(round(pressure)))
+        aaIni.write("2\n")
+        aaIni.write("0.0\n")
+        aaIni.close()
+
+        aa = subprocess.Popen(shlex.split(AA_EXE_FILE), stdin = subprocess.PIPE,
+                stdout = subprocess.PIPE, cwd = aaWorkDir, close_fds = os.name == 'posix')
+        output = aa.communicate(''.join([l + "\n" for l in lines]))[0]
+    finally:
+        shutil.rmtree(aaWorkDir, ignore_errors = True)
+
+    return output.splitlines(True)
+
+
+def _aaInput(starCatFile, starNums, ut):
+    """Returns list of aa input lines for the stars with catalogue line
+    numbers starNums at ut
+    """
+    # first Y/M/D/h/m/s:
+    lines = ["%d" % ut[i] for i in range(6)]
+    # 0 day interval (aa advances the date by the interval after each star),
+    # 1 tabulation:
+    lines += ["0", "1"]
+    # 88 for star, then catalogue and star number for each star (aa asks for
+    # the next catalogue/star after each one):
+    lines.append("88")
+    for n in starNums:
+        lines += [starCatFile, "%d" % n]
+    # -1 for graceful exit
+    lines.append("-1")
+    return lines
+
+
+def _aaMatch(reDict, output, n):
+    """Returns list of n dictionaries with the matches of reDict (see
+    aaStars()) in output (list of aa output lines), one per star; a new star
+    starts when a key matches again. The list is shorter or longer than n if
+    the number of stars in output differs.
+    """
+    if n == 1:
+        records = [{}]
+    else:
+        records = []
+    for line in output:
+        for key in reDict:
+            m = reDict[key].match(line)
+            if m:
+                if not records or (n > 1 and key in records[-1]):
+                    records.append({})
+                records[-1][key] = line[m.start(key) : m.end(key)]
+    return records
+
+
+def aaStarTable(reDict, starCatFile, starNums, ut = None, lat = 0, lon = 0, hoe = 0,
+        temp = 20, pressure = 1010):
+    """Same as aaStars() for a list of star numbers starNums, with all stars
+    calculated in one run of aa; returns list of dictionaries (one per star in
+    starNums). Falls back to one run per star if the output of the batch does
+    not match the number of stars (e.g. for an aa version that does not ask
+    for another star after each one).
+    """
+    if ut == None:
+        ut = dt.datetime.utcnow().timetuple()[:6]
+
+    starNums = list(starNums)
+    if not starNums:
+        return []
+
+    obs = dict(lat = lat, lon = lon, hoe = hoe, temp = temp, pressure = pressure)
+    records = _aaMatch(reDict, _aaRun(_aaInput(starCatFile, starNums, ut), **obs),
+            len(starNums))
+    if len(records) != len(starNums):
+        records = [_aaMatch(reDict, _aaRun(_aaInput(starCatFile, [n], ut), **obs), 1)[0]
+                for n in starNums]
+    return records
+
+
+def aaStarTables(jobs, threads = None):
+    """Runs aaStarTable() for each item of jobs (dictionaries with its keyword
+    arguments) with up to threads (default AA_THREADS, 0 = number of CPUs)
+    aa processes at a time; returns list of results in the order of jobs
+    """
+    if threads is None:
+        threads = AA_THREADS
+    jobs = list(jobs)
+    if threads == 1 or len(jobs) < 2:
+        return [aaStarTable(**job) for job in jobs]
+
+    pool = ThreadPool(threads or None)
+    try:
+        return pool.map(lambda job: aaStarTable(**job), jobs)
+    finally:
+        pool.close()
+
+
+_aaPool = None
+_aaPoolLock = threading.Lock()
+
+
+def aaStarTableAsync(callback = None, **job):
+    """Starts aaStarTable(**job) in a background thread and returns a
+    multiprocessing AsyncResult (get() returns the result); callback, if
+    given, is called with the result when done. Up to AA_THREADS calls run
+    at a time.
+    """
+    global _aaPool
+
+    with _aaPoolLock:
+        if _aaPool is None:
+            _aaPool = ThreadPool(AA_THREADS or None)
+    return _aaPool.apply_async(aaStarTable, kwds = job, callback = callback)
 
 
 def aaStars(reDict, starCatFile, starNum, ut = None, lat = 0, lon = 0, hoe = 0,
@@ -928,63 +1689,38 @@ def aaStars(reDict, starCatFile, starNum, ut = None, lat = 0, lon = 0, hoe = 0,
     hoe         -   Height of eye in meters
     temp        -   Temperature in deg C
     pressure    -   Atmospheric pressure in mbar
-    """
-
-    if ut == None:
-        ut = dt.datetime.utcnow().timetuple()[:6]
-
-    # create and change into working directory and write aa.ini file
-    currentDir = os.getcwd()
-    aaWorkDir = tempfile.mkdtemp()
-    os.chdir(aaWorkDir)
-
-    aaIni = open("aa.ini", 'w')
-    aaIni.write("%f\n" % lon)
-    aaIni.write("%f\n" %  lat)
-    aaIni.write("%.1f\n" % hoe)
-    aaIni.write("%d\n" % int(round(temp)))
-    aaIni.write("%d\n" % int(round(pressure)))
-    aaIni.write("2\n")
-    aaIni.write("0.0\n")
-    aaIni.close()
-
-    aaInfile = open("aa.infile", 'w')
-    # first Y/M/D/h/m/s:
-    for i in range(6):
-        aaInfile.write("%d\n" % ut[i])
-    # 1 tabulation, 1 day intervall:
-    aaInfile.write("1\n1\n")
-    # 88 for star and catalogue:
-    aaInfile.write("88\n%s\n" % starCatFile)
-    # star number:
-    aaInfile.write("%d\n" % starNum)
-    # -1 for graceful exit
-    aaInfile.write("-1\n")
-
-    aaInfile.close()
-
-    # call aa and write to aaOutfile:
-    os.system(AA_EXE_FILE + " < " + aaInfile.name + " > aa.outfile")
 
-    # process aa output
-    aaOutfile = open("aa.outfile", 'r')
-    outDict = {}
-    for line in aaOutfile:
-        for key in reDict:
-            m = reDict[key].match(line)
-            if m:
-                outDict[key] = line[m.start(key) : m.end(key)]
-
-    aaOutfile.close()
+    Use aaStarTable() for several stars.
+    """
+    return aaStarTable(reDict, starCatFile, [starNum], ut, lat, lon, hoe, temp, pressure)[0]
 
-    # clean-up
-    os.remove(aaIni.name)
-    os.remove(aaInfile.name)
-    os.remove(aaOutfile.name)
-    os.rmdir(aaWorkDir)
-    os.chdir(currentDir)
 
-    return outDict
+def aaStarData(odRaw):
+    """Converts dictionary odRaw returned by aaStars() for StarFinder.reDict
+    into a starData entry: 'mag' as float, 'dec' and 'sha' as Angle objects,
+    all other keys as Angle objects from degrees
+    """
+    od = {}
+    for key in odRaw:
+        if key == 'dec':
+            s = odRaw[key].replace('d', '').replace('"', '').replace("'", "").split()
+            if len(s) == 4:
+                offs = 1
+                sign = -1
+            else:
+                offs = 0
+                sign = 1
+            od[key] = Angle(sign * (float(s[0+offs]) + float(s[1+offs])/60 + float(s[2+offs])/3600))
+        elif key == 'sha':
+            s = odRaw[key].replace('h', '').replace('m', '').replace("s", "").split()
+            # convert RA hrs to rad:
+            r = (float(s[0]) + float(s[1])/60 + float(s[2])/3600) * pi / 12.0
+            od[key] = Angle(sha(r))
+        elif key == 'mag':
+            od[key] = float(odRaw[key])
+        else:
+            od[key] = Angle(float(odRaw[key]))
+    return od
 
 
 class aaStarFinder(classprint.AttrDisplay):
@@ -1044,36 +1780,13 @@ class aaStarFinder(classprint.AttrDisplay):
 
     def updateStarData(self):
         """Updates self.starData based on current values of self.UT, self.lat,
-        self.lon, ...
+        self.lon, ... (one run of aa for all stars in self.starList)
         """
-        self.starData = {}
-        for s in self.starList:
-            i = starNum(s)
-            odRaw = aaStars(aaStarFinder.reDict, AA_STAR_CAT_FILE, i, ut =
-                    self.UT, lat = self.lat.decD, lon = self.lon.decD, hoe =
-                    self.hoe, temp = self.temp, pressure = self.pressure)
-            od = {}
-            for key in odRaw:
-                if key == 'dec':
-                    s = odRaw[key].replace('d', '').replace('"', '').replace("'", "").split()
-                    if len(s) == 4:
-                        offs = 1
-                        sign = -1
-                    else:
-                        offs = 0
-                        sign = 1
-                    od[key] = Angle(sign * (float(s[0+offs]) + float(s[1+offs])/60 + float(s[2+offs])/3600))
-                elif key == 'sha':
-                    s = odRaw[key].replace('h', '').replace('m', '').replace("s", "").split()
-                    # convert RA hrs to rad:
-                    r = (float(s[0]) + float(s[1])/60 + float(s[2])/3600) * pi / 12.0
-                    od[key] = Angle(sha(r))
-                elif key == 'mag':
-                    od[key] = float(odRaw[key])
-                else:
-                    od[key] = Angle(float(odRaw[key]))
-
-            self.starData[s] = od
+        nums = [starNum(star) for star in self.starList]
+        odRaw = aaStarTable(aaStarFinder.reDict, AA_STAR_CAT_FILE, nums, ut = self.UT,
+                lat = self.lat.decD, lon = self.lon.decD, hoe = self.hoe, temp = self.temp,
+                pressure = self.pressure)
+        self.starData = dict([(star, aaStarData(od)) for (star, od) in zip(self.starList, odRaw)])
 
 
 def aaBuildStarList(starList):
@@ -1171,6 +1884,7 @@ class PlanetFinder(classprint.AttrDisplay):
                     self.planets[p][key] = None
             return None
 
+        # private objects: rise/set searches recompute them outside ephpool's lock
         sun = ephem.Sun()
 
         # switch off ephem's atmospheric refraction correction by setting pressure to 0...
@@ -1298,6 +2012,25 @@ def bigT(ut):
     return T
 
 
+def utArray(ut):
+    """Returns a NumPy float array with ephem dates (days since 1899/12/31 12:00
+    UT) for a sequence ut of (Y, M, D, h, m, s) tuples, ephem dates or floats
+    """
+    return np.array([float(ephem.Date(t)) for t in ut], dtype = np.float64)
+
+
+def _bcast(value, n):
+    """Returns value as a list of length n; scalars (incl. strings and None)
+    will be repeated n times
+    """
+    if value is None or isinstance(value, basestring) or np.isscalar(value):
+        return [value] * n
+    value = list(value)
+    if len(value) != n:
+        raise ValueError("expected %d values, got %d" % (n, len(value)))
+    return value
+
+
 def normAngle(angle):
     """Returns angle with multiples of 360 removed; angle is float in degrees.
     Does not preserve sign: normAngle(-370) will return 350.
@@ -1317,6 +2050,20 @@ def ghaAries(ut):
     return st.decD
 
 
+def ghaAriesArray(ut):
+    """Returns NumPy array with GHA Aries in degrees incl. decimal fraction
+    for a sequence ut of (Y, M, D, h, m, s) tuples or ephem dates; uses a
+    single ephem Observer for all values
+    """
+    utcz = ephem.Observer()
+    utcz.lon = 0
+    st = np.empty(len(ut))
+    for (i, t) in enumerate(ut):
+        utcz.date = t
+        st[i] = utcz.sidereal_time()
+    return np.degrees(st)
+
+
 def sha(ra):
     """Returns SHA for Right Ascension ra (in radians which is how ephem stores them).
     SHA is provided in degrees incl., decimal fraction.
@@ -1436,7 +2183,7 @@ if __name__ == '__main__':
 
                 for h in range(24):
 
-                    sf = StarFinder(list(starcat.navStarObj.keys()), lat = lat, lon = -178,
+                    sf = StarFinder(list(starcat.navStarNum.keys()), lat = lat, lon = -178,
                         ut = date + (h, 0, 0))
 
                     for s in sf.starData:
@@ -0,0 +1,272 @@
+"""chebeph: support module for celnav
+Chebyshev-polynomial compressed ephemeris: geocentric apparent GHA, Dec,
+horizontal parallax and semidiameter of the Sun, Moon, Venus, Mars, Jupiter
+and Saturn (plus GHA Aries) as one set of Chebyshev coefficients per body,
+quantity and day, fitted to PyEphem results and saved to a file. Evaluating
+the polynomials for an array of UTs only takes a few array operations, so
+positions for many sights or a whole almanac page are obtained without
+calling ephem.
+
+Fitting: per day, each quantity is sampled at 2 * (DEGREE + 1) Chebyshev
+nodes and fitted by least squares (GHA unwrapped, so it is continuous over
+the day). Every fit is checked against ephem every CHECK_STEP minutes; if
+any difference exceeds TOLERANCE arc minutes the file is not written.
+
+When CHEB_FILE is set, celnav.geoPositions() (sight reduction with
+ICAZ_CALC == 'navtri') and celnav.AlmanacPage use it for all UTs it covers
+and fall back to ephem for all others and for stars.
+
+Exports:
+
+    generate()      -   fits coefficients for a range of days and saves them
+
+    ChebEphemeris   -   evaluator for a coefficient file; see positions()
+                        and covers()
+
+    ephemeris()     -   shared ChebEphemeris for CHEB_FILE used by celnav, or
+                        None if CHEB_FILE is not set or cannot be loaded
+
+    BODIES          -   body names (ephem class names plus 'Aries')
+
+    ChebEphError    -   raised if a fit is outside TOLERANCE or positions are
+                        requested for UTs not covered
+
+The constants below can be overwritten in celnav.ini in section [chebeph].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import os
+
+import numpy as np
+from numpy.polynomial import chebyshev
+import ephem
+
+import navtri
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [chebeph].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'chebeph'
+
+# coefficient file used by celnav (None: ephem only):
+CHEB_FILE = None
+if cncfg.cncfg.has_option(SECTION_ID, 'CHEB_FILE'):
+    CHEB_FILE = cncfg.cncfg.get(SECTION_ID, 'CHEB_FILE')
+
+# degree of the Chebyshev polynomials (one per day):
+DEGREE = 6
+if cncfg.cncfg.has_option(SECTION_ID, 'DEGREE'):
+    DEGREE = cncfg.cncfg.getint(SECTION_ID, 'DEGREE')
+
+# max. difference to ephem in arc minutes:
+TOLERANCE = 0.05
+if cncfg.cncfg.has_option(SECTION_ID, 'TOLERANCE'):
+    TOLERANCE = cncfg.cncfg.getfloat(SECTION_ID, 'TOLERANCE')
+
+# interval of the check against ephem in minutes:
+CHECK_STEP = 20
+if cncfg.cncfg.has_option(SECTION_ID, 'CHECK_STEP'):
+    CHECK_STEP = cncfg.cncfg.getint(SECTION_ID, 'CHECK_STEP')
+
+#-----------------------------------------------------------------------------
+
+BODIES = ('Aries', 'Sun', 'Moon', 'Venus', 'Mars', 'Jupiter', 'Saturn')
+
+# fitted quantities (degrees): GHA, Dec, HP and SD
+QUANTITIES = ('gha', 'dec', 'hp', 'sd')
+
+
+class ChebEphError(Exception):
+    """Raised if fitted positions differ from ephem by more than the
+    tolerance, or for positions not covered by a coefficient file
+    """
+    pass
+
+
+def _samples(t, ariesRad):
+    """Returns array (len(BODIES), len(QUANTITIES), len(t)) with the values
+    for ephem dates t; ariesRad is GHA Aries at t in radians. GHA is not
+    reduced to 0..360.
+    """
+    s = np.zeros((len(BODIES), len(QUANTITIES), len(t)))
+    s[0, 0] = np.degrees(ariesRad)
+
+    ra = np.empty(len(t))
+    dec = np.empty(len(t))
+    dist = np.empty(len(t))
+    radius = np.empty(len(t))
+    for (b, name) in enumerate(BODIES[1:], 1):
+        body = ephem.__dict__[name]()
+        for (i, x) in enumerate(t):
+            body.compute(x)
+            ra[i] = body.ra
+            dec[i] = body.dec
+            dist[i] = body.earth_distance
+            radius[i] = body.radius
+        s[b] = (np.degrees(ariesRad - ra), np.degrees(dec), navtri.hpFromDist(dist),
+                np.degrees(radius))
+
+    return s
+
+
+def _clenshaw(c, x):
+    """Evaluates Chebyshev series with coefficients c[..., k] at x (broadcast
+    against c[..., 0])
+    """
+    b1 = np.zeros(np.broadcast(c[..., 0], x).shape)
+    b2 = np.zeros(b1.shape)
+    for k in range(c.shape[-1] - 1, 0, -1):
+        (b1, b2) = (2 * x * b1 - b2 + c[..., k], b1)
+    return x * b1 - b2 + c[..., 0]
+
+
+def _fit(firstDay, days, degree):
+    """Returns tuple (coefficients, max. error): coefficients as array (days,
+    len(BODIES), len(QUANTITIES), degree + 1), max. error in arc minutes as
+    array (len(BODIES), len(QUANTITIES))
+    """
+    import celnav
+
+    nNodes = 2 * (degree + 1)
+    x = np.sort(np.cos(np.pi * (np.arange(nNodes) + 0.5) / nNodes))
+    xCheck = 2 * np.arange(0, 1440, CHECK_STEP) / 1440.0 - 1
+    xAll = np.concatenate((x, xCheck))
+
+    t = (firstDay + np.arange(days)[:, np.newaxis] + (xAll + 1) / 2).ravel()
+    s = _samples(t, np.radians(celnav.ghaAriesArray(t)))
+    s = s.reshape((len(BODIES), len(QUANTITIES), days, len(xAll))).transpose((2, 0, 1, 3))
+
+    # GHA continuous over the nodes of each day:
+    s[:, :, 0, :len(x)] = np.degrees(np.unwrap(np.radians(s[:, :, 0, :len(x)])))
+
+    y = s[..., :len(x)].reshape((-1, len(x)))
+    coeffs = chebyshev.chebfit(x, y.T, degree).T.reshape(s.shape[:3] + (degree + 1, ))
+
+    diff = _clenshaw(coeffs[..., np.newaxis, :], xCheck) - s[..., len(x):]
+    diff[:, :, 0] = np.mod(diff[:, :, 0] + 180.0, 360.0) - 180.0
+    maxError = np.abs(diff).max(axis = 3).max(axis = 0) * 60
+
+    return (coeffs, maxError)
+
+
+def generate(fileName, start, days, degree = None):
+    """Fits coefficients for days days starting at 0h UT of date start (Y,
+    M, D) and saves them to fileName (NumPy .npz format). Returns the max.
+    differences to ephem in arc minutes as array (len(BODIES),
+    len(QUANTITIES)). Raises ChebEphError (and does not write the file) if
+    any difference exceeds TOLERANCE.
+    """
+    if degree is None:
+        degree = DEGREE
+
+    firstDay = float(ephem.Date(tuple(start)[:3] + (0, 0, 0)))
+    (coeffs, maxError) = _fit(firstDay, days, degree)
+
+    if maxError.max() > TOLERANCE:
+        (b, q) = np.unravel_index(maxError.argmax(), maxError.shape)
+        raise ChebEphError("%s %s differs from ephem by %.3f' (tolerance %.3f')"
+                % (BODIES[b], QUANTITIES[q], maxError[b, q], TOLERANCE))
+
+    with open(fileName, 'wb') as f:
+        np.savez_compressed(f, firstDay = firstDay, degree = degree, bodies = BODIES,
+                quantities = QUANTITIES, coeffs = coeffs, maxError = maxError,
+                ephemVersion = ephem.__version__)
+
+    return maxError
+
+
+class ChebEphemeris(classprint.AttrDisplay):
+    """Coefficient file fileName written by generate(). Attributes firstDay
+    (ephem date), days, degree, coeffs and maxError (see generate()).
+    """
+    def __init__(self, fileName):
+        self.fileName = fileName
+        data = np.load(fileName)
+        if tuple(data['bodies']) != BODIES or tuple(data['quantities']) != QUANTITIES:
+            raise ChebEphError("Unexpected layout of %s" % fileName)
+        self.firstDay = float(data['firstDay'])
+        self.degree = int(data['degree'])
+        self.coeffs = data['coeffs']
+        self.maxError = data['maxError']
+        self.days = len(self.coeffs)
+
+
+    def covers(self, body, ut):
+        """Returns bool array: True for each element of ut (ephem dates) for
+        which positions of body (one of BODIES) are available
+        """
+        d = np.asarray(ut, dtype = np.float64) - self.firstDay
+        return (body in BODIES) & (d >= 0) & (d < self.days)
+
+
+    def positions(self, body, ut):
+        """Returns tuple (gha, dec, hp, sd) of NumPy arrays in degrees incl.
+        decimal fraction for body (one of BODIES) at ut (array of ephem
+        dates); gha is reduced to 0..360. Raises ChebEphError if any element
+        of ut is not covered.
+        """
+        ut = np.asarray(ut, dtype = np.float64)
+        if not np.all(self.covers(body, ut)):
+            raise ChebEphError("%s not covered by %s for all UTs" % (body, self.fileName))
+
+        d = ut - self.firstDay
+        day = np.floor(d).astype(int)
+        x = 2 * (d - day) - 1
+        v = _clenshaw(self.coeffs[day, BODIES.index(body)], x[:, np.newaxis])
+
+        return (np.mod(v[:, 0], 360.0), v[:, 1], v[:, 2], v[:, 3])
+
+
+_ephemeris = None
+
+
+def ephemeris():
+    """Returns the ChebEphemeris for CHEB_FILE shared by celnav (loaded on
+    first use), or None if CHEB_FILE is not set or cannot be loaded
+    """
+    global _ephemeris, CHEB_FILE
+
+    if _ephemeris is None and CHEB_FILE:
+        try:
+            _ephemeris = ChebEphemeris(os.path.expandvars(CHEB_FILE))
+        except (ChebEphError, EnvironmentError, KeyError, ValueError):
+            CHEB_FILE = None
+
+    return _ephemeris
+
+
+if __name__ == '__main__':
+
+    import sys
+    import time
+
+    import celnav
+
+    # generate coefficients for one year and compare with ephem:
+    #   python chebeph.py FILE YEAR
+    year = int(sys.argv[2])
+    days = int(round(ephem.Date((year + 1, 1, 1)) - ephem.Date((year, 1, 1))))
+
+    t = time.time()
+    maxError = generate(sys.argv[1], (year, 1, 1), days)
+    print 'fitted %d days in %.1f s, %d bytes' % (days, time.time() - t,
+            os.path.getsize(sys.argv[1]))
+    print "max. error [']" + ''.join(['%8s' % q for q in QUANTITIES])
+    for (b, e) in zip(BODIES, maxError):
+        print '%-14s' % b + ''.join(['%8.5f' % x for x in e])
+
+    e = ChebEphemeris(sys.argv[1])
+    ut = float(ephem.Date((year, 3, 1))) + np.random.random(1000) * 30
+    t = time.time()
+    p = e.positions('Moon', ut)
+    print 'Moon, 1000 UTs: %.1f us per UT' % ((time.time() - t) * 1000)
+
+    t = time.time()
+    q = celnav.geoPositions(ut, 'Moon')
+    print 'ephem (celnav.geoPositions): %.1f us per UT' % ((time.time() - t) * 1000)
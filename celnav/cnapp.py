@@ -33,6 +33,15 @@ import tkFont
 # import celnav classes - will be customized to interact with GUI
 import celnav
 
+# import fixmc for confidence level of fix error ellipse
+import fixmc
+
+# import sightsel for automatic selection of sight for fix
+import sightsel
+
+# import logdb for structured (SQLite) log
+import logdb
+
 # import cncfg to get access to ConfigParser object:
 import cncfg
 
@@ -59,6 +68,14 @@ SPREADSHEET_PATH = "/usr/bin/gnumeric"   # path to spreadsheet executable
 if cncfg.cncfg.has_option(SECTION_ID, 'SPREADSHEET_PATH'):
     SPREADSHEET_PATH = cncfg.cncfg.get(SECTION_ID, 'SPREADSHEET_PATH')
 
+LOG_BACKEND = "csv"                 # 'csv' (LOG_FILE), 'sqlite' (LOG_DB_FILE) or 'both'
+if cncfg.cncfg.has_option(SECTION_ID, 'LOG_BACKEND'):
+    LOG_BACKEND = cncfg.cncfg.get(SECTION_ID, 'LOG_BACKEND')
+
+LOG_DB_FILE = "celnav.db"
+if cncfg.cncfg.has_option(SECTION_ID, 'LOG_DB_FILE'):
+    LOG_DB_FILE = cncfg.cncfg.get(SECTION_ID, 'LOG_DB_FILE')
+
 CSV_COLSEP  = ','   # used for Almanac Page and Star Data files that will be opend
                     # by program specified in SPREADSHEET_PATH
 if cncfg.cncfg.has_option(SECTION_ID, 'CSV_COLSEP'):
@@ -91,8 +108,6 @@ import classprint
 
 # TODO: global style definitions
 
-# TODO: Reducing sights automatically picks median intercept in Radiobutton widget
-
 
 # temporary directory into which Alamanac Pages  and Star Data can be written;
 # will be set by Application which will also clean up before exiting
@@ -657,6 +672,8 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
         self.lopAddCallback = master.register(self.addLOP)      # callback for "+" button
         self.lopDelCallback = master.register(self.delLOP)      # callback for "-" button
 
+        self.logDB = None                                       # logdb.LogDB, opened with first log entry
+
         # create and place entry widgets:
         currentRow = 0
         currentCol = 0
@@ -701,14 +718,14 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
         self.addLOP()
 
         # if it doesn't exist: create log file:
-        if not os.access(os.path.join(APP_DIR, LOG_FILE), os.F_OK):
+        if LOG_BACKEND != 'sqlite' and not os.access(os.path.join(APP_DIR, LOG_FILE), os.F_OK):
             self.__writeLog()
 
 
     def calcFixCallback(self):
         """Callback for Calculate Fix' button; calls reduceSightCallback for each LOP,
         updates Sights and LOPs from entry fields,  and
-        then uses Fix.__calc2LLPFix() and subsequently updates display.
+        then uses Fix.calcFix() and subsequently updates display.
         """
         for lop in self.lopList:
             lop.reduceSightsCallback()
@@ -716,11 +733,13 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
         # update Fix attributes based on user entry:
         self.__entry2attr()
 
-        # calculate plane trig 2 LOP fix:
+        # calculate least-squares fix from all LOPs plus Monte Carlo error ellipse:
         try:
-            self.calc2LOPFix()
+            self.calcFixMC()
         except celnav.FixLOPError:
-            errorStr = "Fix calculation requires two LOPs with one Sight selected in each LOP for inclusion in fix"
+            self.fixMC = None
+            errorStr = ("Fix calculation requires at least two LOPs with one Sight selected in each LOP "
+                    "for inclusion in fix, and LOPs must not be parallel")
             tMB.showerror(title = "Fix Error", message = errorStr, icon = tMB.ERROR)
 
         # update display/entry values:
@@ -813,7 +832,15 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
         else:
             lonStr += " E"
 
-        self.fixPosDisp.configure(text = ("%s - %s" % (latStr, lonStr)))
+        posStr = "%s - %s" % (latStr, lonStr)
+
+        # error ellipse from last Monte Carlo run:
+        if self.fixMC is not None:
+            (a, b, orient) = self.fixMC.ellipse
+            posStr += "\n%d%%: %.1f x %.1f nm, %03d%sT" % (int(round(fixmc.CONFIDENCE * 100)),
+                    a, b, int(round(orient)), u'\xb0')
+
+        self.fixPosDisp.configure(text = posStr)
 
 
     logFileHeadings = [
@@ -859,13 +886,24 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
         ]
 
     def __writeLog(self):
-        """Writes log entry with all dcurrently available data
+        """Writes log entry with all dcurrently available data to LOG_FILE
+        and/or LOG_DB_FILE (see LOG_BACKEND)
         """
         global CSV_COLSEP
 
         if not os.access(APP_DIR, os.F_OK):     # directory for logfile does not exist
             os.makedirs(APP_DIR)
 
+        utNow = dt.datetime.utcnow().timetuple()[:6]
+
+        # structured log:
+        if LOG_BACKEND in ('sqlite', 'both'):
+            if self.logDB is None:
+                self.logDB = logdb.LogDB(os.path.join(APP_DIR, LOG_DB_FILE))
+            self.logDB.writeFix(self, utNow)
+            if LOG_BACKEND == 'sqlite':
+                return
+
         if not os.access(os.path.join(APP_DIR, LOG_FILE), os.F_OK):
             logFile = open(os.path.join(APP_DIR, LOG_FILE), 'w')
             hdgStr = ""
@@ -878,7 +916,7 @@ class AppFix(ttk.Frame, celnav.Fix, classprint.AttrDisplay):
             logFile = open(os.path.join(APP_DIR, LOG_FILE), 'a')
 
         # time stamp
-        timeStamp = "%04d/%02d/%02d,%02d:%02d:%02d" % dt.datetime.utcnow().timetuple()[:6]
+        timeStamp = "%04d/%02d/%02d,%02d:%02d:%02d" % utNow
         # fix SOG, COG, UT
         fixStr = "%.1f, %d" % (self.SOG, int(round(self.COG.decD)))
         fixStr += ", %04d/%02d/%02d,%02d:%02d:%02d" % self.UT
@@ -935,6 +973,7 @@ class AppLOP(ttk.Frame, celnav.LOP, classprint.AttrDisplay):
         self.sightAddDelFrameList = []          # list of frames containing "+/-" buttons (1 per AppSight)
         self.sightForFixRBList = []             # list of radio buttons to pick Sight for inclusion in fix
         self.sightFixRBcVar = tk.IntVar()       # contral variable for radio button group
+        self.sightFixChosen = False             # True once a Sight was picked by radio button
         self.sightAddCallback = master.register(self.addSight)      # callback for "+" button
         self.sightDelCallback = master.register(self.delSight)      # callback for "-" button
 
@@ -1036,6 +1075,14 @@ class AppLOP(ttk.Frame, celnav.LOP, classprint.AttrDisplay):
 
         self.calcIcAz()
 
+        # flag outliers and pick best sight for fix (unless picked by hand):
+        if sightsel.AUTO_SELECT and len(self.sightList) > 0:
+            chosen = self.lopSightIndex
+            self.selectSight()
+            if self.sightFixChosen:
+                self.lopSightIndex = chosen
+            self.sightFixRBcVar.set(self.lopSightIndex)
+
         self.__attr2entry()
 
         for sight in self.sightList:
@@ -1110,7 +1157,8 @@ class AppLOP(ttk.Frame, celnav.LOP, classprint.AttrDisplay):
         self.sightAddDelFrameList[i].grid(row = self.firstSightRow+i, column = 0, sticky = tk.S)
 
         # add radio button
-        self.sightForFixRBList.append(ttk.Radiobutton(self, value = i, variable = self.sightFixRBcVar))
+        self.sightForFixRBList.append(ttk.Radiobutton(self, value = i, variable = self.sightFixRBcVar,
+            command = self.__sightFixChosen))
         self.sightForFixRBList[i].grid(row = self.firstSightRow+i, column = self.sightRBCol)
 
 
@@ -1135,6 +1183,18 @@ class AppLOP(ttk.Frame, celnav.LOP, classprint.AttrDisplay):
         self.sightForFixRBList[i-1].destroy()
         self.sightForFixRBList.pop(i-1)
 
+        # the Sight picked for the fix is gone: back to automatic selection
+        if int(self.sightFixRBcVar.get()) >= i-1:
+            self.sightFixRBcVar.set(0)
+            self.sightFixChosen = False
+
+
+    def __sightFixChosen(self):
+        """Radio button callback: the Sight for the fix was picked by hand and
+        is kept by reduceSightsCallback()
+        """
+        self.sightFixChosen = True
+
 
     def __hideSights(self):
         """Hides all AppSight frames under current LOP.
@@ -1272,6 +1332,9 @@ class AppSight(ttk.Frame, celnav.Sight, classprint.AttrDisplay):
 
         AzStr = "Az = %03d%sT" % (int(round(self.Az.decD)), u'\xb0')
 
+        if self.outlier:
+            AzStr += "    (outlier)"
+
         widget.configure(text = ("  %s    %s    %s" % (IcStr, srfIcStr, AzStr)))
 
 
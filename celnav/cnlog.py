@@ -0,0 +1,255 @@
+"""cnlog: support module for celnav
+Streaming reader for the sight log written by cnapp (AppFix.__writeLog(),
+file LOG_FILE in APP_DIR, default ~/.celnav/celnav.log); also rebuilds celnav
+objects from it.
+
+Each time "Write Log" is pressed one row is appended per Sight, repeating the
+columns for Fix and LOP on every row (see AppFix.logFileHeadings). iterLog()
+reads the log line by line and yields one LogFix record per such log entry
+as soon as its last row has been read, so memory use does not depend on the
+size of the log. The heading row (written with CSV_COLSEP, ',' or ';') and
+the start-up messages written by cnapp.Application (celnav.START_UP_LOG_MSG)
+are skipped. Rows separated by either ',' or ';' are accepted.
+
+Records are typed: UTs as (Y, M, D, h, m, s) tuples, angles in degrees incl.
+decimal fraction (S, W = -), starName None for bodies other than stars.
+
+Exports:
+
+    LogFix          -   named tuple with fields timeStamp (UT of log entry),
+                        SOG, COG, UT, lat, lon (fix as logged) and lops (list
+                        of LogLOP)
+
+    LogLOP          -   named tuple with fields lopNr, body, starName, lat,
+                        lon (AP), heightOfEye, indexError, pressure, temp
+                        and sights (list of LogSight)
+
+    LogSight        -   named tuple with fields sightNr, UT, Hs, Ic, srfIc,
+                        Az and inFix (True for the Sight selected for the fix)
+
+    iterLog()       -   generator yielding LogFix records for a log file
+                        (name, open file or any iterable of lines)
+
+    iterSights()    -   generator turning LogFix records into (fix, lop,
+                        sight) tuples, for chaining per-sight processing
+
+    readLog()       -   list(iterLog())
+
+    buildFix()      -   rebuilds celnav.Fix incl. LOPs and Sights from a
+                        LogFix
+
+    fixRecord()     -   LogFix for a celnav.Fix (inverse of buildFix())
+
+    LogRow          -   named tuple with the typed columns of one log row
+
+    parseRow()      -   parses one line; returns LogRow or None for heading
+                        and start-up message lines
+
+    LogFormatError  -   raised for lines that cannot be parsed
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import celnav
+
+# number of columns per log row (see cnapp.AppFix.logFileHeadings):
+N_COLUMNS = 39
+
+# column separators accepted (cnapp.CSV_COLSEP variants):
+SEPARATORS = (',', ';')
+
+LogRow = collections.namedtuple('LogRow', ' '.join([
+        'timeStamp SOG COG fixUT fixLat fixLon',
+        'lopNr body starName apLat apLon heightOfEye indexError pressure temp',
+        'sightNr sightUT Hs Ic srfIc Az inFix']))
+
+LogFix = collections.namedtuple('LogFix', 'timeStamp SOG COG UT lat lon lops')
+
+LogLOP = collections.namedtuple('LogLOP',
+        'lopNr body starName lat lon heightOfEye indexError pressure temp sights')
+
+LogSight = collections.namedtuple('LogSight', 'sightNr UT Hs Ic srfIc Az inFix')
+
+
+class LogFormatError(Exception):
+    """Raised if a log line has the wrong number of columns or a column
+    cannot be converted
+    """
+    pass
+
+
+def _ut(dateStr, timeStr):
+    """Returns (Y, M, D, h, m, s) tuple for 'Y/M/D' and 'h:m:s'
+    """
+    return tuple([int(x) for x in dateStr.split('/')] + [int(x) for x in timeStr.split(':')])
+
+
+def parseRow(line):
+    """Returns LogRow for one line of the log, None for the heading line,
+    start-up messages and empty lines. Raises LogFormatError if the line
+    cannot be parsed.
+    """
+    line = line.strip()
+    if line == '' or line.startswith('UT Date'):    # heading
+        return None
+    if '###' in line:                               # celnav.START_UP_LOG_MSG
+        return None
+
+    for sep in SEPARATORS:
+        f = line.split(sep)
+        if len(f) == N_COLUMNS:
+            break
+    else:
+        raise LogFormatError(line)
+    f = [x.strip() for x in f]
+
+    try:
+        return LogRow(
+                timeStamp = _ut(f[0], f[1]),
+                SOG = float(f[2]),
+                COG = float(f[3]),
+                fixUT = _ut(f[4], f[5]),
+                fixLat = float(f[6]),
+                fixLon = float(f[10]),
+                lopNr = int(f[14]),
+                body = f[15],
+                starName = None if f[16] == 'None' else f[16],
+                apLat = float(f[17]),
+                apLon = float(f[21]),
+                heightOfEye = float(f[25]),
+                indexError = float(f[26]),
+                pressure = float(f[27]),
+                temp = float(f[28]),
+                sightNr = int(f[29]),
+                sightUT = _ut(f[30], f[31]),
+                Hs = float(f[32]),
+                Ic = float(f[35]),
+                srfIc = float(f[36]),
+                Az = float(f[37]),
+                inFix = int(f[38]) == 1)
+    except ValueError:
+        raise LogFormatError(line)
+
+
+def _newEntry(prev, row):
+    """Returns True if row starts a new log entry after row prev
+    """
+    if prev is None:
+        return True
+    if (row.timeStamp, row.SOG, row.COG, row.fixUT, row.fixLat, row.fixLon) != (
+            prev.timeStamp, prev.SOG, prev.COG, prev.fixUT, prev.fixLat, prev.fixLon):
+        return True
+    # same time stamp and fix data, but numbering starts again:
+    return (row.lopNr, row.sightNr) <= (prev.lopNr, prev.sightNr)
+
+
+def _entry(rows):
+    """Returns LogFix for the LogRows of one log entry
+    """
+    lops = []
+    for r in rows:
+        if len(lops) == 0 or r.lopNr != lops[-1].lopNr:
+            lops.append(LogLOP(r.lopNr, r.body, r.starName, r.apLat, r.apLon, r.heightOfEye,
+                r.indexError, r.pressure, r.temp, []))
+        lops[-1].sights.append(LogSight(r.sightNr, r.sightUT, r.Hs, r.Ic, r.srfIc, r.Az, r.inFix))
+
+    r = rows[0]
+    return LogFix(r.timeStamp, r.SOG, r.COG, r.fixUT, r.fixLat, r.fixLon, lops)
+
+
+def iterLog(source, badLines = None):
+    """Generator yielding one LogFix per log entry in source (file name, open
+    file or other iterable of lines). Lines that cannot be parsed raise
+    LogFormatError unless badLines is a list, in which case (line number,
+    line) is appended to it and the line is skipped.
+    """
+    if isinstance(source, basestring):
+        with open(source) as logFile:
+            for entry in iterLog(logFile, badLines):
+                yield entry
+        return
+
+    rows = []
+    for (lineNr, line) in enumerate(source, 1):
+        try:
+            row = parseRow(line)
+        except LogFormatError:
+            if badLines is None:
+                raise
+            badLines.append((lineNr, line))
+            continue
+        if row is None:
+            continue
+        if len(rows) > 0 and _newEntry(rows[-1], row):
+            yield _entry(rows)
+            rows = []
+        rows.append(row)
+
+    if len(rows) > 0:
+        yield _entry(rows)
+
+
+def iterSights(entries):
+    """Generator yielding (fix, lop, sight) tuples of LogFix, LogLOP and
+    LogSight for all Sights in entries (e.g. iterLog())
+    """
+    for fix in entries:
+        for lop in fix.lops:
+            for sight in lop.sights:
+                yield (fix, lop, sight)
+
+
+def readLog(source, badLines = None):
+    """Returns list of all LogFix records in source (see iterLog())
+    """
+    return list(iterLog(source, badLines))
+
+
+def fixRecord(fix, timeStamp):
+    """Returns LogFix for celnav.Fix fix (incl. all LOPs and Sights) with log
+    time stamp timeStamp as (Y, M, D, h, m, s); inverse of buildFix()
+    """
+    lops = []
+    for (lopNr, lop) in enumerate(fix.lopList):
+        sights = [LogSight(sNr + 1, tuple(s.UT), s.Hs.decD, s.Ic, s.srfIc, s.Az.decD,
+                sNr == lop.lopSightIndex) for (sNr, s) in enumerate(lop.sightList)]
+        lops.append(LogLOP(lopNr + 1, lop.body, lop.starName, lop.observer.latDecD(),
+            lop.observer.lonDecD(), lop.observer.heightOfEye, lop.observer.indexError.decD * 60,
+            lop.observer.pressure, lop.observer.temp, sights))
+
+    return LogFix(tuple(timeStamp), fix.SOG, fix.COG.decD, tuple(fix.UT), fix.lat.decD,
+            fix.lon.decD, lops)
+
+
+def buildFix(entry):
+    """Returns celnav.Fix rebuilt from LogFix entry, with lopSightIndex of
+    each LOP set to the Sight logged for the fix (-1 if none). Sights are not
+    reduced.
+    """
+    fix = celnav.Fix(SOG = entry.SOG, COG = entry.COG, UT = entry.UT, lat = entry.lat,
+            lon = entry.lon)
+
+    for l in entry.lops:
+        lop = celnav.LOP(fix = fix, body = l.body, starName = l.starName,
+                indexError = l.indexError, heightOfEye = l.heightOfEye, lat = l.lat, lon = l.lon,
+                temp = l.temp, pressure = l.pressure)
+        for s in l.sights:
+            if s.inFix:
+                lop.lopSightIndex = len(lop.sightList)
+            lop.sightList.append(celnav.Sight(Hs = s.Hs, UT = s.UT))
+        fix.lopList.append(lop)
+
+    return fix
+
+
+if __name__ == '__main__':
+
+    import sys
+
+    # chained generators: sights per body without loading the log
+    counts = collections.Counter(lop.body for (fix, lop, sight) in iterSights(iterLog(sys.argv[1])))
+    for (body, n) in counts.most_common():
+        print '%-10s %6d' % (body, n)
@@ -0,0 +1,292 @@
+"""cntrack: support module for celnav
+Running-fix tracker: keeps a continuous position estimate with uncertainty
+over a voyage's time-ordered stream of sights and logged COG/SOG changes.
+
+The estimate is an extended Kalman filter in two states (lat, lon). Between
+events the position is advanced by dead reckoning on the last logged SOG/COG
+and the covariance grows by PROCESS_NOISE per hour (current, leeway,
+steering and log errors). Each sight is one scalar measurement: its intercept
+computed at the current estimate, with the gradient (cos Zn, sin Zn) in the
+(north, east) plane. This is the same linearization used by LOP.calcIcAz()
+and lsqfix, but applied to one sight at a time, so every update costs the
+same regardless of how many sights have been processed before; old sights
+are never reduced again.
+
+Exports:
+
+    Track       -   the tracker; feed it with setCourse(), addSight() /
+                    addLOP() / addFix() or, for already reduced data,
+                    update(). Current estimate in Track.lat, Track.lon and
+                    Track.cov, one TrackPoint per event in Track.history.
+
+    TrackPoint  -   named tuple with fields
+                        date        ephem date (float) of the event
+                        lat, lon    estimate after the event (degrees)
+                        cov         2x2 covariance of (north, east) position
+                                    error in nm^2
+                        event       'start', 'course', 'sight' or 'reject'
+                        innovation  intercept (nm) at the predicted position
+                                    for sights, None otherwise
+
+    TrackError  -   raised for events older than the current estimate
+
+The constants below can be overwritten in celnav.ini in section [cntrack].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+from math import *
+import collections
+
+import numpy as np
+import ephem
+
+import celnav
+import navtri
+import lsqfix
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [cntrack].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'cntrack'
+
+# std. deviation of a single sight in nm (arc minutes):
+SIGHT_SIGMA = 1.0
+if cncfg.cncfg.has_option(SECTION_ID, 'SIGHT_SIGMA'):
+    SIGHT_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'SIGHT_SIGMA')
+
+# growth of DR position variance in nm^2 per hour (per axis):
+PROCESS_NOISE = 0.5
+if cncfg.cncfg.has_option(SECTION_ID, 'PROCESS_NOISE'):
+    PROCESS_NOISE = cncfg.cncfg.getfloat(SECTION_ID, 'PROCESS_NOISE')
+
+# std. deviation of the start position in nm:
+INITIAL_SIGMA = 10.0
+if cncfg.cncfg.has_option(SECTION_ID, 'INITIAL_SIGMA'):
+    INITIAL_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'INITIAL_SIGMA')
+
+# sights with an intercept at the predicted position of more than GATE times
+# its expected std. deviation are rejected as outliers (0 = accept all):
+GATE = 4.0
+if cncfg.cncfg.has_option(SECTION_ID, 'GATE'):
+    GATE = cncfg.cncfg.getfloat(SECTION_ID, 'GATE')
+
+#-----------------------------------------------------------------------------
+
+TrackPoint = collections.namedtuple('TrackPoint', 'date lat lon cov event innovation')
+
+
+class TrackError(Exception):
+    """Raised if an event is older than the current track estimate
+    """
+    pass
+
+
+class Track(classprint.AttrDisplay):
+    """Kalman filter track estimate (see module doc). Initialized with
+    lat, lon:       start position (e.g. DR) in degrees incl. decimal fraction
+    ut:             UT of start position as (Y, M, D, h, m, s) or ephem date
+    SOG, COG:       vessel speed in kn and course in degrees true
+    sigma:          std. deviation of start position in nm
+    processNoise:   DR variance growth in nm^2 per hour
+    sightSigma:     default std. deviation of a sight in nm
+    gate:           outlier gate in std. deviations (0 = off)
+    """
+    def __init__(self, lat, lon, ut, SOG = 0, COG = 0, sigma = INITIAL_SIGMA,
+            processNoise = PROCESS_NOISE, sightSigma = SIGHT_SIGMA, gate = GATE):
+
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.date = float(ephem.Date(ut))
+        self.cov = np.eye(2) * sigma**2
+
+        self.SOG = float(SOG)
+        self.COG = float(COG)
+
+        self.processNoise = processNoise
+        self.sightSigma = sightSigma
+        self.gate = gate
+
+        self.nSights = 0
+        self.nRejected = 0
+
+        self.history = []
+        self.__record('start', None)
+
+
+    def __record(self, event, innovation):
+        self.history.append(TrackPoint(self.date, self.lat, self.lon, self.cov.copy(), event,
+                innovation))
+
+
+    def predict(self, ut):
+        """Advances the estimate by DR on self.SOG/self.COG to ut without
+        recording a history entry; raises TrackError if ut is earlier than
+        the current estimate
+        """
+        date = float(ephem.Date(ut))
+        dT = (date - self.date) * 24
+        if dT < 0:
+            raise TrackError
+        if dT == 0:
+            return
+
+        dist = self.SOG * dT
+        dLat = dist * cos(radians(self.COG)) / 60
+        midLat = radians(self.lat + dLat / 2)
+        self.lon += dist * sin(radians(self.COG)) / (60 * cos(midLat))
+        self.lat += dLat
+        self.lon = (self.lon + 180.0) % 360.0 - 180.0
+
+        self.cov = self.cov + np.eye(2) * (self.processNoise * dT)
+        self.date = date
+
+
+    def setCourse(self, ut, SOG, COG):
+        """Logs a change of SOG (kn) and/or COG (degrees true) at ut
+        """
+        self.predict(ut)
+        self.SOG = float(SOG)
+        self.COG = float(COG)
+        self.__record('course', None)
+
+
+    def update(self, ut, gha, dec, Ho, corr = 0, sigma = None):
+        """Processes one reduced sight: geocentric gha/dec of the body
+        (degrees), observed altitude Ho (Hs corrected for index error and dip)
+        and altitude correction corr (parallax, refraction and semidiameter,
+        see lsqfix.altCorrections()) in degrees. sigma is the sight's std.
+        deviation in nm (default self.sightSigma). Returns True if the sight
+        was used, False if it was rejected by the outlier gate.
+        """
+        self.predict(ut)
+        if sigma is None:
+            sigma = self.sightSigma
+
+        (Hc, Zn) = navtri.hcZn(gha, dec, self.lat, self.lon)
+        zRad = radians(float(Zn))
+        H = np.array([cos(zRad), sin(zRad)])
+        innov = (Ho - corr - float(Hc)) * 60        # intercept in nm
+
+        PH = np.dot(self.cov, H)
+        S = np.dot(H, PH) + sigma**2
+        if self.gate > 0 and innov * innov > self.gate**2 * S:
+            self.nRejected += 1
+            self.__record('reject', innov)
+            return False
+
+        K = PH / S
+        self.lat += K[0] * innov / 60
+        self.lon += K[1] * innov / (60 * cos(radians(self.lat)))
+        self.lon = (self.lon + 180.0) % 360.0 - 180.0
+
+        # Joseph form keeps cov symmetric and positive definite:
+        IKH = np.eye(2) - np.outer(K, H)
+        self.cov = np.dot(np.dot(IKH, self.cov), IKH.T) + np.outer(K, K) * sigma**2
+
+        self.nSights += 1
+        self.__record('sight', innov)
+        return True
+
+
+    def addSight(self, lop, sight, sigma = None):
+        """Processes celnav.Sight sight taken of lop.body (celnav.LOP; index
+        error, height of eye and atmospheric data are taken from lop.observer,
+        the AP is not used). Returns same as update().
+        """
+        lop.calcHa()
+        (gha, dec, hp, sd, limb) = celnav.geoPositions([sight.UT], lop.body, lop.starName)
+
+        # corrections at the position predicted for the time of the sight:
+        self.predict(sight.UT)
+        corr = lsqfix.altCorrections(gha, dec, self.lat, self.lon, hp = hp, sd = sd, limb = limb,
+                elevation = lop.observer.elevation, temp = lop.observer.temp,
+                pressure = lop.observer.pressure)
+
+        return self.update(sight.UT, gha[0], dec[0], sight.Ha.decD, corr = float(corr[0]),
+                sigma = sigma)
+
+
+    def addLOP(self, lop, useAllSights = False, sigma = None):
+        """Processes the Sight selected by lop.lopSightIndex (or all Sights of
+        lop if useAllSights is True) in order of UT; returns number of Sights
+        used
+        """
+        if useAllSights:
+            sights = lop.sightList
+        elif 0 <= lop.lopSightIndex < len(lop.sightList):
+            sights = [lop.sightList[lop.lopSightIndex]]
+        else:
+            sights = []
+
+        n = 0
+        for s in sorted(sights, key = lambda s: float(ephem.Date(s.UT))):
+            n += self.addSight(lop, s, sigma = sigma)
+        return n
+
+
+    def addFix(self, fix, useAllSights = False, sigma = None):
+        """Processes all LOPs of celnav.Fix fix in order of UT, using fix.SOG
+        and fix.COG as logged course from the first sight on. Leaves the
+        estimate at fix.UT if that is later than the last sight. Returns number
+        of Sights used.
+        """
+        pairs = []
+        for lop in fix.lopList:
+            if useAllSights:
+                pairs.extend([(lop, s) for s in lop.sightList])
+            elif 0 <= lop.lopSightIndex < len(lop.sightList):
+                pairs.append((lop, lop.sightList[lop.lopSightIndex]))
+        pairs.sort(key = lambda p: float(ephem.Date(p[1].UT)))
+
+        n = 0
+        for (i, (lop, s)) in enumerate(pairs):
+            if i == 0:
+                self.setCourse(s.UT, fix.SOG, fix.COG.decD)
+            n += self.addSight(lop, s, sigma = sigma)
+
+        if float(ephem.Date(fix.UT)) > self.date:
+            self.predict(fix.UT)
+
+        return n
+
+
+    def sigmaNM(self):
+        """Returns tuple (semi-major, semi-minor, orientation) of the 1-sigma
+        error ellipse: axes in nm, orientation of the major axis in degrees
+        true
+        """
+        return lsqfix.errorEllipse(self.cov)
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # 24 hours of simulated star sights every 20 min from a boat making
+    # 6 kn on 250 deg, start DR 15 nm off:
+    rng = np.random.RandomState(1)
+    t0 = float(ephem.Date((2013, 6, 28, 0, 0, 0)))
+    (lat, lon, SOG, COG) = (-18.5, -178.9, 6.0, 250.0)
+    track = Track(lat + 0.2, lon - 0.15, t0, SOG, COG)
+
+    tStart = time.time()
+    for k in range(1, 73):
+        t = t0 + k / 72.0
+        dist = SOG * k / 3.0
+        trueLat = lat + dist * cos(radians(COG)) / 60
+        trueLon = lon + dist * sin(radians(COG)) / (60 * cos(radians(trueLat)))
+        (gha, dec) = (rng.uniform(0, 360), rng.uniform(-60, 60))
+        (Hc, Zn) = navtri.hcZn(gha, dec, trueLat, trueLon)
+        track.update(t, gha, dec, float(Hc) + rng.normal(0, 1.0) / 60)
+    elapsed = time.time() - tStart
+
+    print 'true: %.4f %.4f  track: %.4f %.4f' % (trueLat, trueLon, track.lat, track.lon)
+    print 'error ellipse (nm, nm, deg):', track.sigmaNM()
+    print 'sights used %d, rejected %d, usec per update %.1f' % (track.nSights, track.nRejected,
+            elapsed / 72 * 1e6)
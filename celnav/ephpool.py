@@ -0,0 +1,197 @@
+"""ephpool: support module for celnav
+Provides a pool of re-usable PyEphem body objects and an LRU cache for
+computed body positions, so that repeated calculations for the same body, UT
+and observer (e.g. pressing "Reduce Sights" again or exporting the same
+almanac page twice) are answered from memory instead of re-running ephem.
+
+Exports:
+
+    body()      -   returns the shared ephem object for a body name ('Sun',
+                    'Moon', 'Venus', ...) or for a navigational star
+                    (body == 'star' plus star name). The objects are created
+                    once and re-used by EphemCache.compute(), which computes
+                    them under a lock; they are not for use outside this
+                    module. Code that computes a body itself (e.g. rise/set
+                    searches with an ephem.Observer) uses a private object
+                    (ephem.Sun(), starcat.navStar(), ...).
+
+    cache       -   EphemCache instance used by celnav; exposes hit/miss
+                    counters via cache.hits, cache.misses and cache.info().
+
+    compute()   -   shortcut for cache.compute()
+
+The constant CACHE_SIZE below sets the maximum number of results kept in the
+cache and can be overwritten in celnav.ini in section [ephpool]. Setting it to
+0 disables caching (every call will be a miss).
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+from math import radians
+import threading
+import collections
+
+import ephem
+
+import starcat
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [ephpool].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'ephpool'
+
+# max. number of cached results:
+CACHE_SIZE = 20000
+if cncfg.cncfg.has_option(SECTION_ID, 'CACHE_SIZE'):
+    CACHE_SIZE = cncfg.cncfg.getint(SECTION_ID, 'CACHE_SIZE')
+
+#-----------------------------------------------------------------------------
+
+# number of decimals used when rounding observer parameters for cache keys:
+# lat/lon in degrees (1e-6 deg is about 0.1 m), elevation in m, temp in deg C
+# and pressure in mbar
+KEY_DECIMALS = { 'latlon' : 6, 'elevation' : 1, 'temp' : 1, 'pressure' : 1 }
+
+# result record: angles in radians; alt/az will be None for geocentric results,
+# dist (distance from Earth in AU) will be None for stars
+EphemResult = collections.namedtuple('EphemResult', 'ra dec alt az radius mag dist')
+
+_bodyPool = {}
+_poolLock = threading.Lock()
+
+
+def body(name, starName = None):
+    """Returns the pooled ephem object for name ('Sun', 'Moon', 'Venus',
+    'Mars', 'Jupiter', 'Saturn') or, if name == 'star', for the navigational
+    star starName. A trailing limb indicator ('Sun LL', 'Moon UL') is ignored.
+    """
+    name = name.split()[0]
+    if name == 'star':
+        key = (starName, starcat.DB_SOURCE)     # new object after starcat.setDBSource()
+    else:
+        key = name
+
+    with _poolLock:
+        if key not in _bodyPool:
+            if name == 'star':
+                _bodyPool[key] = starcat.navStar(starName)
+            else:
+                _bodyPool[key] = ephem.__dict__[name]()
+        return _bodyPool[key]
+
+
+class EphemCache(classprint.AttrDisplay):
+    """LRU cache for ephem results keyed by body, UT and rounded observer
+    parameters. Results are EphemResult tuples. Counters self.hits and
+    self.misses are updated with every call to compute().
+    """
+
+    def __init__(self, maxSize = CACHE_SIZE):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.__store = collections.OrderedDict()
+        self.__obs = ephem.Observer()
+        self.__obsKey = None
+        self.__lock = threading.Lock()
+
+
+    def compute(self, name, date, starName = None, lat = None, lon = None, elevation = 0,
+            temp = 20, pressure = 1010):
+        """Returns an EphemResult for body name (see body()) at date (ephem date,
+        float or (Y, M, D, h, m, s) tuple). If lat and lon (degrees incl. decimal
+        fraction) are None the result is geocentric (alt and az will be None),
+        otherwise it is topocentric apparent for the given observer (incl.
+        refraction based on temp and pressure; pressure = 0 switches refraction
+        off).
+        """
+        if not isinstance(date, float):
+            date = float(ephem.Date(date))
+        name = name.split()[0]
+
+        if lat is None:
+            obsKey = None
+        else:
+            obsKey = (round(lat, KEY_DECIMALS['latlon']), round(lon, KEY_DECIMALS['latlon']),
+                    round(elevation, KEY_DECIMALS['elevation']), round(temp, KEY_DECIMALS['temp']),
+                    round(pressure, KEY_DECIMALS['pressure']))
+
+        # UT resolution of 1 ms in cache key:
+        if name == 'star':
+            key = (name, (starName, starcat.DB_SOURCE), int(round(date * 86400000)), obsKey)
+        else:
+            key = (name, starName, int(round(date * 86400000)), obsKey)
+
+        with self.__lock:
+            r = self.__store.pop(key, None)
+            if r is not None:
+                self.hits += 1
+                self.__store[key] = r           # re-insert as most recently used
+                return r
+
+            self.misses += 1
+            e = body(name, starName)
+
+            with _poolLock:
+                if obsKey is None:
+                    e.compute(date)
+                    r = EphemResult(float(e.ra), float(e.dec), None, None, float(e.radius), e.mag,
+                            getattr(e, 'earth_distance', None))
+                else:
+                    obs = self.__obs
+                    if obsKey != self.__obsKey:     # only touch observer if it changed
+                        obs.lat = radians(lat)
+                        obs.lon = radians(lon)
+                        obs.elevation = elevation
+                        obs.temp = temp
+                        obs.pressure = pressure
+                        self.__obsKey = obsKey
+                    obs.date = date
+                    e.compute(obs)
+                    r = EphemResult(float(e.ra), float(e.dec), float(e.alt), float(e.az),
+                            float(e.radius), e.mag, getattr(e, 'earth_distance', None))
+
+            if self.maxSize > 0:
+                self.__store[key] = r
+                while len(self.__store) > self.maxSize:
+                    self.__store.popitem(last = False)
+
+            return r
+
+
+    def clear(self):
+        """Empties cache and resets hit/miss counters
+        """
+        with self.__lock:
+            self.__store.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    def info(self):
+        """Returns dictionary with keys 'hits', 'misses', 'size' and 'maxSize'
+        """
+        return { 'hits' : self.hits, 'misses' : self.misses, 'size' : len(self.__store),
+                'maxSize' : self.maxSize }
+
+
+cache = EphemCache()
+
+
+def compute(*args, **kwargs):
+    """Calls cache.compute() (see EphemCache.compute() for arguments)
+    """
+    return cache.compute(*args, **kwargs)
+
+
+if __name__ == '__main__':
+
+    for i in range(3):
+        r = compute('Sun LL', (2013, 6, 28, 6, 0, 0), lat = -18.6, lon = -178.9)
+    print r
+    print cache.info()
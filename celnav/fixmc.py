@@ -0,0 +1,209 @@
+"""fixmc: support module for celnav
+Monte Carlo estimate of fix uncertainty. The sight inputs (Hs, index error,
+height of eye, UT of each sight, vessel SOG and COG) are perturbed by normally
+distributed errors and the fix is re-solved for every draw. All draws are
+processed together as NumPy arrays (one row per draw, one column per sight);
+the Gauss-Newton iteration of lsqfix is carried out for all rows at once with
+the 2x2 normal equations solved in closed form.
+
+Index error and height of eye are drawn once per draw and applied to all
+sights (same sextant, same observer), Hs and UT errors independently per
+sight. A UT error shifts the body's GHA by its rate of change and changes the
+MOO correction. Parallax, refraction and semidiameter are kept at their
+nominal values.
+
+Exports:
+
+    monteCarloFix() -   runs the simulation; returns an MCResult
+
+    MCResult        -   named tuple with fields
+                            lat, lon    mean fix position of all draws
+                            cov         2x2 covariance of (north, east) fix
+                                        position in nm^2
+                            ellipse     (semi-major, semi-minor, orientation)
+                                        of the error ellipse containing
+                                        CONFIDENCE of the draws (nm, nm,
+                                        degrees true)
+                            percentiles dictionary: percentile -> radial
+                                        distance in nm from the nominal fix
+                                        (see PERCENTILES)
+                            draws       (nDraws, 2) array of (north, east)
+                                        offsets in nm from the nominal fix
+
+The constants below (number of draws and default std. deviations) can be
+overwritten in celnav.ini in section [fixmc].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import numpy as np
+
+import navtri
+import lsqfix
+import cncfg
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [fixmc].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'fixmc'
+
+# number of draws:
+N_DRAWS = 20000
+if cncfg.cncfg.has_option(SECTION_ID, 'N_DRAWS'):
+    N_DRAWS = cncfg.cncfg.getint(SECTION_ID, 'N_DRAWS')
+
+# std. deviations of sextant altitude and index error in arc minutes, height
+# of eye in m, UT of sight in s, SOG in kn and COG in degrees:
+HS_SIGMA = 0.5
+if cncfg.cncfg.has_option(SECTION_ID, 'HS_SIGMA'):
+    HS_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'HS_SIGMA')
+
+IE_SIGMA = 0.2
+if cncfg.cncfg.has_option(SECTION_ID, 'IE_SIGMA'):
+    IE_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'IE_SIGMA')
+
+HOE_SIGMA = 0.3
+if cncfg.cncfg.has_option(SECTION_ID, 'HOE_SIGMA'):
+    HOE_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'HOE_SIGMA')
+
+UT_SIGMA = 2.0
+if cncfg.cncfg.has_option(SECTION_ID, 'UT_SIGMA'):
+    UT_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'UT_SIGMA')
+
+SOG_SIGMA = 0.5
+if cncfg.cncfg.has_option(SECTION_ID, 'SOG_SIGMA'):
+    SOG_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'SOG_SIGMA')
+
+COG_SIGMA = 5.0
+if cncfg.cncfg.has_option(SECTION_ID, 'COG_SIGMA'):
+    COG_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'COG_SIGMA')
+
+# probability covered by MCResult.ellipse:
+CONFIDENCE = 0.95
+if cncfg.cncfg.has_option(SECTION_ID, 'CONFIDENCE'):
+    CONFIDENCE = cncfg.cncfg.getfloat(SECTION_ID, 'CONFIDENCE')
+
+#-----------------------------------------------------------------------------
+
+# radial error percentiles reported in MCResult.percentiles:
+PERCENTILES = (50, 68, 95, 99)
+
+# Gauss-Newton iterations (starting at the nominal fix the perturbed fixes
+# are a few nm away at most, two steps converge to well below 0.01 nm):
+ITERATIONS = 3
+
+MCResult = collections.namedtuple('MCResult', 'lat lon cov ellipse percentiles draws')
+
+
+def monteCarloFix(gha, dec, ghaRate, Hs, indexError, heightOfEye, corr, dT, lat, lon,
+        SOG = 0, COG = 0, nDraws = N_DRAWS, HsSigma = HS_SIGMA, ieSigma = IE_SIGMA,
+        hoeSigma = HOE_SIGMA, utSigma = UT_SIGMA, sogSigma = SOG_SIGMA, cogSigma = COG_SIGMA,
+        seed = None):
+    """Returns MCResult for sights given as arrays (one element per sight):
+        gha, dec    -   geocentric GHA and Dec of body at sight time (degrees)
+        ghaRate     -   rate of change of gha in degrees per second
+        Hs          -   sextant altitude (degrees)
+        indexError  -   in arc minutes
+        heightOfEye -   in m
+        corr        -   altitude corrections from lsqfix.altCorrections()
+                        (degrees)
+        dT          -   fix UT minus sight UT in hours
+    Scalars:
+        lat, lon    -   nominal fix (e.g. lsqfix.lsqFix() result) in degrees;
+                        used as start of the iteration and as reference for
+                        MCResult.draws and percentiles
+        SOG, COG    -   vessel speed in kn and course in degrees true
+        nDraws      -   number of draws
+        *Sigma      -   std. deviations (see module constants for units)
+        seed        -   seed for the random number generator (None = random)
+    Draws for which the LOPs do not intersect are dropped. Raises
+    lsqfix.LSQFixError if there are fewer than two sights or no draw yields
+    a fix.
+    """
+    gha = np.asarray(gha, dtype = np.float64)
+    dec = np.asarray(dec, dtype = np.float64)
+    m = len(gha)
+    if m < 2:
+        raise lsqfix.LSQFixError
+
+    rng = np.random.RandomState(seed)
+    shape = (nDraws, m)
+
+    # perturbed inputs, one row per draw:
+    dUT = rng.normal(0, utSigma, shape)                         # seconds
+    ghaD = gha + np.asarray(ghaRate) * dUT
+    ie = np.asarray(indexError, dtype = np.float64) + rng.normal(0, ieSigma, (nDraws, 1))
+    hoe = np.maximum(np.asarray(heightOfEye, dtype = np.float64)
+            + rng.normal(0, hoeSigma, (nDraws, 1)), 0)
+    Ha = (np.asarray(Hs, dtype = np.float64) + rng.normal(0, HsSigma / 60.0, shape)
+            + ie / 60.0 - 0.0293 * np.sqrt(hoe))
+    HoGeo = (Ha - corr) * 60
+    moo = ((np.asarray(dT, dtype = np.float64) - dUT / 3600.0)
+            * (SOG + rng.normal(0, sogSigma, (nDraws, 1))))
+    cogRad = np.radians(COG + rng.normal(0, cogSigma, (nDraws, 1)))
+
+    latD = np.empty((nDraws, 1))
+    latD.fill(lat)
+    lonD = np.empty((nDraws, 1))
+    lonD.fill(lon)
+    ok = np.ones((nDraws, 1), dtype = bool)
+
+    for it in range(ITERATIONS):
+        (Hc, Zn) = navtri.hcZn(ghaD, dec, latD, lonD)
+        zRad = np.radians(Zn)
+        c = np.cos(zRad)
+        s = np.sin(zRad)
+        r = HoGeo - Hc * 60 + np.cos(cogRad - zRad) * moo
+
+        # 2x2 normal equations per draw, solved by Cramer's rule:
+        a11 = np.sum(c * c, axis = 1, keepdims = True)
+        a12 = np.sum(c * s, axis = 1, keepdims = True)
+        a22 = np.sum(s * s, axis = 1, keepdims = True)
+        b1 = np.sum(c * r, axis = 1, keepdims = True)
+        b2 = np.sum(s * r, axis = 1, keepdims = True)
+        det = a11 * a22 - a12 * a12
+        ok &= det > 1e-6 * (a11 + a22)**2
+        det = np.where(ok, det, 1)
+
+        latD += (a22 * b1 - a12 * b2) / det / 60.0
+        lonD += (a11 * b2 - a12 * b1) / det / (60.0 * np.cos(np.radians(latD)))
+
+    ok = ok[:, 0]
+    if not ok.any():
+        raise lsqfix.LSQFixError
+    dN = (latD[ok, 0] - lat) * 60
+    dE = (((lonD[ok, 0] - lon + 180.0) % 360.0) - 180.0) * 60 * np.cos(np.radians(lat))
+    draws = np.column_stack((dN, dE))
+
+    cov = np.cov(draws, rowvar = False)
+    mean = draws.mean(axis = 0)
+    radial = np.hypot(dN, dE)
+
+    return MCResult(lat + mean[0] / 60, lon + mean[1] / (60 * np.cos(np.radians(lat))), cov,
+            lsqfix.errorEllipse(cov, lsqfix.ellipseScale(CONFIDENCE)),
+            dict(zip(PERCENTILES, np.percentile(radial, PERCENTILES))), draws)
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # 3 star sights around a known position:
+    (lat, lon) = (-18.5, -178.9)
+    gha = np.array([138.9, 218.9, 183.9])
+    dec = np.array([10.0, 15.0, -60.0])
+    (Hc, Zn) = navtri.hcZn(gha, dec, lat, lon)
+    Hs = Hc + 0.0293 * np.sqrt(2.5)
+    rate = np.array([360.9856 / 86400] * 3)
+
+    for n in (10000, 100000):
+        t = time.time()
+        r = monteCarloFix(gha, dec, rate, Hs, 0, 2.5, 0, 0, lat, lon, nDraws = n, seed = 1)
+        print '%6d draws: %.3f s' % (n, time.time() - t)
+    print r.ellipse
+    print r.percentiles
@@ -0,0 +1,235 @@
+"""logdb: support module for celnav
+Structured sight log in an SQLite database, as an alternative (or addition)
+to the CSV log written by cnapp (see LOG_BACKEND in celnav.ini section
+[cnapp]). Fixes, LOPs and Sights are stored in normalized tables:
+
+    fix     id, timeStamp, ut, SOG, COG, lat, lon
+    lop     id, fixId, lopNr, body, starName, lat, lon, heightOfEye,
+            indexError, pressure, temp
+    sight   id, lopId, sightNr, ut, Hs, Ic, srfIc, Az, inFix
+
+with indexes on fix UT and latitude, sight UT, body and star name. UTs are
+stored as 'YYYY-MM-DD hh:mm:ss' text (sorts and compares as time), angles
+in degrees incl. decimal fraction (S, W = -).
+
+Writes are transactional: one transaction per fix written from the GUI, one
+transaction for all fixes of an import (executemany).
+
+Exports:
+
+    LogDB           -   database wrapper; see writeFix(), writeEntries(),
+                        importLog(), sights() and fixesNear()
+
+    distance()      -   great circle distance in nm (also available as SQL
+                        function distance(lat1, lon1, lat2, lon2))
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import sqlite3
+from math import *
+
+import cnlog
+import classprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fix (
+    id          INTEGER PRIMARY KEY,
+    timeStamp   TEXT,
+    ut          TEXT,
+    SOG         REAL,
+    COG         REAL,
+    lat         REAL,
+    lon         REAL
+);
+CREATE TABLE IF NOT EXISTS lop (
+    id          INTEGER PRIMARY KEY,
+    fixId       INTEGER REFERENCES fix(id),
+    lopNr       INTEGER,
+    body        TEXT,
+    starName    TEXT,
+    lat         REAL,
+    lon         REAL,
+    heightOfEye REAL,
+    indexError  REAL,
+    pressure    REAL,
+    temp        REAL
+);
+CREATE TABLE IF NOT EXISTS sight (
+    id          INTEGER PRIMARY KEY,
+    lopId       INTEGER REFERENCES lop(id),
+    sightNr     INTEGER,
+    ut          TEXT,
+    Hs          REAL,
+    Ic          REAL,
+    srfIc       REAL,
+    Az          REAL,
+    inFix       INTEGER
+);
+CREATE INDEX IF NOT EXISTS fixUT ON fix(ut);
+CREATE INDEX IF NOT EXISTS fixLat ON fix(lat);
+CREATE INDEX IF NOT EXISTS lopFix ON lop(fixId);
+CREATE INDEX IF NOT EXISTS lopBody ON lop(body);
+CREATE INDEX IF NOT EXISTS lopStar ON lop(starName);
+CREATE INDEX IF NOT EXISTS sightLOP ON sight(lopId);
+CREATE INDEX IF NOT EXISTS sightUT ON sight(ut);
+"""
+
+# columns returned by LogDB.sights():
+SIGHT_QUERY = """
+SELECT sight.ut, lop.body, lop.starName, sight.Hs, sight.Ic, sight.srfIc, sight.Az,
+    sight.inFix, lop.lat, lop.lon, fix.ut, fix.lat, fix.lon
+FROM sight JOIN lop ON sight.lopId = lop.id JOIN fix ON lop.fixId = fix.id
+"""
+
+
+def utStr(ut):
+    """Returns database representation of (Y, M, D, h, m, s) tuple ut
+    """
+    return "%04d-%02d-%02d %02d:%02d:%02d" % tuple(ut)
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """Returns great circle distance in nm between two positions given in
+    degrees
+    """
+    (lat1, lon1, lat2, lon2) = [radians(x) for x in (lat1, lon1, lat2, lon2)]
+    a = sin((lat2 - lat1) / 2)**2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2)**2
+    return degrees(2 * asin(min(1.0, sqrt(a)))) * 60
+
+
+class LogDB(classprint.AttrDisplay):
+    """Sight log database in file fileName (created with all tables and
+    indexes if it does not exist; ':memory:' for a temporary database)
+    """
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.conn = sqlite3.connect(fileName)
+        self.conn.create_function('distance', 4, distance)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+
+    def close(self):
+        self.conn.close()
+
+
+    def __insertEntry(self, cur, entry):
+        """Inserts cnlog.LogFix entry using cursor cur (no commit)
+        """
+        cur.execute("INSERT INTO fix (timeStamp, ut, SOG, COG, lat, lon) VALUES (?, ?, ?, ?, ?, ?)",
+                (utStr(entry.timeStamp), utStr(entry.UT), entry.SOG, entry.COG, entry.lat,
+                entry.lon))
+        fixId = cur.lastrowid
+
+        for l in entry.lops:
+            cur.execute("INSERT INTO lop (fixId, lopNr, body, starName, lat, lon, heightOfEye, "
+                    "indexError, pressure, temp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (fixId, l.lopNr, l.body, l.starName, l.lat, l.lon, l.heightOfEye,
+                    l.indexError, l.pressure, l.temp))
+            lopId = cur.lastrowid
+            cur.executemany("INSERT INTO sight (lopId, sightNr, ut, Hs, Ic, srfIc, Az, inFix) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(lopId, s.sightNr, utStr(s.UT), s.Hs, s.Ic, s.srfIc, s.Az, int(s.inFix))
+                    for s in l.sights])
+
+        return fixId
+
+
+    def writeFix(self, fix, timeStamp):
+        """Writes celnav.Fix fix incl. all LOPs and Sights in one transaction;
+        timeStamp is the UT of the log entry as (Y, M, D, h, m, s). Returns the
+        id of the new fix row.
+        """
+        with self.conn:
+            return self.__insertEntry(self.conn.cursor(), cnlog.fixRecord(fix, timeStamp))
+
+
+    def writeEntries(self, entries):
+        """Writes cnlog.LogFix records entries (any iterable, e.g.
+        cnlog.iterLog()) in a single transaction; returns number of fixes
+        written
+        """
+        n = 0
+        with self.conn:
+            cur = self.conn.cursor()
+            for entry in entries:
+                self.__insertEntry(cur, entry)
+                n += 1
+        return n
+
+
+    def importLog(self, logFileName, badLines = None):
+        """Imports CSV log file logFileName (see cnlog.iterLog() for
+        badLines); returns number of fixes imported
+        """
+        return self.writeEntries(cnlog.iterLog(logFileName, badLines))
+
+
+    def sights(self, body = None, starName = None, start = None, end = None):
+        """Returns list of tuples (sight UT, body, starName, Hs, Ic, srfIc, Az,
+        inFix, AP lat, AP lon, fix UT, fix lat, fix lon) for all sights matching
+        the arguments that are not None; body without limb ('Sun') matches
+        both limbs; start (inclusive) and end (exclusive) are (Y, M, D, h, m,
+        s) tuples. Ordered by sight UT.
+        """
+        where = []
+        args = []
+        if body is not None:
+            if ' ' in body:
+                where.append("lop.body = ?")
+                args.append(body)
+            else:
+                where.append("(lop.body = ? OR lop.body LIKE ?)")
+                args.extend([body, body + ' %'])
+        if starName is not None:
+            where.append("lop.starName = ?")
+            args.append(starName)
+        if start is not None:
+            where.append("sight.ut >= ?")
+            args.append(utStr(start))
+        if end is not None:
+            where.append("sight.ut < ?")
+            args.append(utStr(end))
+
+        sql = SIGHT_QUERY
+        if where:
+            sql += "WHERE " + " AND ".join(where)
+        sql += " ORDER BY sight.ut"
+
+        return self.conn.execute(sql, args).fetchall()
+
+
+    def fixesNear(self, lat, lon, radius):
+        """Returns list of tuples (fix id, UT, lat, lon, distance) for all
+        fixes within radius nm of lat/lon (degrees), nearest first. Uses the
+        latitude index for a pre-selection.
+        """
+        dLat = radius / 60.0
+        return self.conn.execute(
+                "SELECT id, ut, lat, lon, distance(?, ?, lat, lon) AS d FROM fix "
+                "WHERE lat BETWEEN ? AND ? AND d <= ? ORDER BY d",
+                (lat, lon, lat - dLat, lat + dLat, radius)).fetchall()
+
+
+if __name__ == '__main__':
+
+    import sys
+    import time
+
+    # import CSV log into database and run some queries:
+    #   python logdb.py LOGFILE DBFILE
+    db = LogDB(sys.argv[2])
+
+    t = time.time()
+    n = db.importLog(sys.argv[1])
+    print 'imported %d fixes in %.2f s' % (n, time.time() - t)
+
+    t = time.time()
+    r = db.sights(starName = 'Arcturus', start = (2013, 6, 1, 0, 0, 0), end = (2013, 7, 1, 0, 0, 0))
+    print '%d Arcturus sights in June 2013 (%.1f ms)' % (len(r), (time.time() - t) * 1000)
+
+    t = time.time()
+    r = db.fixesNear(-18.0, -178.0, 50)
+    print '%d fixes within 50 nm (%.1f ms)' % (len(r), (time.time() - t) * 1000)
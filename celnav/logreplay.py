@@ -0,0 +1,206 @@
+#! /usr/bin/python
+
+"""logreplay: support module for celnav
+Command line tool that re-reduces all sights in one or more celnav.log files
+(see cnlog) with the current celnav code and settings and writes the
+recomputed intercepts and fixes next to the logged ones as CSV. Used to
+regression check changes of the star catalogue (starcat.DB_SOURCE) or of the
+sight reduction engine (celnav.ICAZ_CALC) across a whole log archive.
+
+Log entries (one per fix) are distributed over a multiprocessing pool in
+chunks of CHUNK_SIZE fixes; output is written in the order of the logs.
+
+Usage:
+
+    python logreplay.py [options] LOGFILE [LOGFILE ...]
+
+    -o FILE         write CSV to FILE instead of stdout
+    -p N            number of worker processes (default: number of CPUs)
+    -c N            fixes per chunk sent to a worker (default CHUNK_SIZE)
+    -m METHOD       'ephem', 'navtri' or 'almanac', overrides celnav.ICAZ_CALC
+
+A summary (fixes, sights, largest intercept and fix differences) is printed
+to stderr.
+
+Exports:
+
+    replay()        -   generator yielding a ReplayFix per log entry
+
+    ReplayFix       -   named tuple with fields
+                            fileName, entryNr   source of the log entry
+                            fixUT               UT of fix
+                            logLat, logLon      logged fix position
+                            lat, lon            recomputed fix (None if no fix
+                                                can be calculated)
+                            sights              list of ReplaySight
+                            error               message if the entry could
+                                                not be replayed, else None
+
+    ReplaySight     -   named tuple with fields lopNr, sightNr, body,
+                        starName, sightUT, logIc, Ic, logSrfIc, srfIc, logAz,
+                        Az, inFix
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import sys
+import collections
+import multiprocessing
+import argparse
+from math import *
+
+import celnav
+import cnlog
+
+# number of fixes per chunk sent to a worker process:
+CHUNK_SIZE = 20
+
+ReplaySight = collections.namedtuple('ReplaySight',
+        'lopNr sightNr body starName sightUT logIc Ic logSrfIc srfIc logAz Az inFix')
+
+ReplayFix = collections.namedtuple('ReplayFix',
+        'fileName entryNr fixUT logLat logLon lat lon sights error')
+
+CSV_HEADINGS = ['File', 'Entry', 'Fix UT', 'Log Fix Lat', 'Log Fix Lon', 'Fix Lat', 'Fix Lon',
+        'Fix Diff [nm]', 'LOP number', 'Sight number', 'Body', 'Star', 'Sight UT',
+        'Log Ic [nm]', 'Ic [nm]', 'Log srfIc [nm]', 'srfIc [nm]', 'Ic Diff [nm]',
+        'Log Az [deg T]', 'Az [deg T]', 'Sight in Fix?']
+
+
+def _initWorker(method):
+    """Pool initializer: sets reduction method in worker process
+    """
+    if method is not None:
+        celnav.ICAZ_CALC = method
+
+
+def replayEntry(task):
+    """Re-reduces one log entry; task is tuple (fileName, entryNr, entry) with
+    entry a cnlog.LogFix. Returns ReplayFix.
+    """
+    (fileName, entryNr, entry) = task
+
+    try:
+        fix = cnlog.buildFix(entry)
+        for lop in fix.lopList:
+            lop.calcIcAz()
+    except Exception, e:
+        return ReplayFix(fileName, entryNr, entry.UT, entry.lat, entry.lon, None, None, [],
+                '%s: %s' % (e.__class__.__name__, e))
+
+    try:
+        fix.calcFix()
+        (lat, lon) = (fix.lat.decD, fix.lon.decD)
+    except celnav.FixLOPError:
+        (lat, lon) = (None, None)
+
+    sights = []
+    for (l, lop) in zip(entry.lops, fix.lopList):
+        for (ls, s) in zip(l.sights, lop.sightList):
+            sights.append(ReplaySight(l.lopNr, ls.sightNr, l.body, l.starName, ls.UT,
+                ls.Ic, s.Ic, ls.srfIc, s.srfIc, ls.Az, s.Az.decD, ls.inFix))
+
+    return ReplayFix(fileName, entryNr, entry.UT, entry.lat, entry.lon, lat, lon, sights, None)
+
+
+def _tasks(fileNames, badLines):
+    for fileName in fileNames:
+        for (entryNr, entry) in enumerate(cnlog.iterLog(fileName, badLines), 1):
+            yield (fileName, entryNr, entry)
+
+
+def replay(fileNames, processes = None, chunkSize = CHUNK_SIZE, method = None, badLines = None):
+    """Generator yielding one ReplayFix per log entry in the log files
+    fileNames (in file order). processes is the number of worker processes
+    (None = number of CPUs, 0 = no pool), method overrides celnav.ICAZ_CALC.
+    Log entries are read lazily (see cnlog.iterLog(), also for badLines).
+    """
+    tasks = _tasks(fileNames, badLines)
+
+    if processes == 0:
+        _initWorker(method)
+        for task in tasks:
+            yield replayEntry(task)
+        return
+
+    pool = multiprocessing.Pool(processes, _initWorker, (method, ))
+    try:
+        for result in pool.imap(replayEntry, tasks, chunkSize):
+            yield result
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def fixDiff(lat1, lon1, lat2, lon2):
+    """Returns distance between two positions in nm (plane approximation,
+    adequate for the small differences compared here)
+    """
+    dLon = (lon2 - lon1 + 180.0) % 360.0 - 180.0
+    return 60 * hypot(lat2 - lat1, dLon * cos(radians((lat1 + lat2) / 2)))
+
+
+def _utStr(ut):
+    return "%04d/%02d/%02d %02d:%02d:%02d" % ut
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Re-reduce sights in celnav.log files.')
+    parser.add_argument('logFiles', metavar = 'LOGFILE', nargs = '+')
+    parser.add_argument('-o', dest = 'outFile', default = None)
+    parser.add_argument('-p', dest = 'processes', type = int, default = None)
+    parser.add_argument('-c', dest = 'chunkSize', type = int, default = CHUNK_SIZE)
+    parser.add_argument('-m', dest = 'method', choices = ['ephem', 'navtri', 'almanac'],
+            default = None, help = 'reduction method, overrides celnav.ICAZ_CALC')
+    args = parser.parse_args(argv)
+
+    if args.outFile is None:
+        out = sys.stdout
+    else:
+        out = open(args.outFile, 'w')
+
+    out.write(','.join(CSV_HEADINGS) + '\n')
+
+    badLines = []
+    (nFixes, nSights, nErrors, maxIcDiff, maxFixDiff) = (0, 0, 0, 0.0, 0.0)
+
+    for f in replay(args.logFiles, args.processes, args.chunkSize, args.method, badLines):
+        nFixes += 1
+        if f.error is not None:
+            nErrors += 1
+            sys.stderr.write('%s, entry %d: %s\n' % (f.fileName, f.entryNr, f.error))
+            continue
+
+        if f.lat is None:
+            fixStr = "%s,%d,%s,%f,%f,,," % (f.fileName, f.entryNr, _utStr(f.fixUT), f.logLat,
+                    f.logLon)
+        else:
+            d = fixDiff(f.logLat, f.logLon, f.lat, f.lon)
+            maxFixDiff = max(maxFixDiff, d)
+            fixStr = "%s,%d,%s,%f,%f,%f,%f,%.2f" % (f.fileName, f.entryNr, _utStr(f.fixUT),
+                    f.logLat, f.logLon, f.lat, f.lon, d)
+
+        for s in f.sights:
+            nSights += 1
+            maxIcDiff = max(maxIcDiff, abs(s.Ic - s.logIc))
+            out.write("%s,%d,%d,%s,%s,%s,%f,%f,%f,%f,%.2f,%d,%.1f,%d\n" % (fixStr, s.lopNr,
+                s.sightNr, s.body, s.starName, _utStr(s.sightUT), s.logIc, s.Ic, s.logSrfIc,
+                s.srfIc, s.Ic - s.logIc, int(round(s.logAz)), s.Az, int(s.inFix)))
+
+    if out is not sys.stdout:
+        out.close()
+
+    sys.stderr.write('%d fixes (%d not replayed), %d sights, %d unreadable lines\n'
+            % (nFixes, nErrors, nSights, len(badLines)))
+    sys.stderr.write('max. intercept difference %.2f nm, max. fix difference %.2f nm\n'
+            % (maxIcDiff, maxFixDiff))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
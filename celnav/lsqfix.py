@@ -0,0 +1,182 @@
+"""lsqfix: support module for celnav
+Least-squares fix from any number of LOPs/sights, each with its own AP.
+Used by celnav.Fix.calcFix().
+
+The observed altitudes are compared to altitudes computed for the current
+position estimate (navigational triangle solved by navtri for all sights at
+once). Each residual is the intercept at the estimate, corrected for motion
+of the observer between sight and fix time the same way LOP.calcIcAz()
+corrects srfIc. The position is then improved by a Gauss-Newton step
+
+    residual_i = cos(Zn_i) * dN + sin(Zn_i) * dE
+
+(all in nm) until the step falls below a tolerance. Parallax, refraction and
+semidiameter are evaluated once at each sight's AP (see altCorrections()) as
+they change by far less than 0.01' over the few miles between AP and fix;
+inside the iteration only the geocentric triangle is solved.
+
+Exports:
+
+    lsqFix()            -   iterative solution; returns a FixResult
+
+    altCorrections()    -   difference between apparent topocentric and
+                            geocentric altitude for each sight
+
+    errorEllipse()      -   axes and orientation of the error ellipse for a
+                            (north, east) covariance matrix
+
+    ellipseScale()      -   scale factor for a given probability
+
+    FixResult           -   named tuple with fields
+                                lat, lon    fix position in degrees
+                                cov         2x2 covariance matrix of the
+                                            (north, east) position error in nm^2
+                                residuals   residual per sight in nm
+                                sigma       std. deviation of unit weight in nm
+                                            (sigmaPrior if less than 3 sights)
+                                iterations  number of Gauss-Newton steps
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import numpy as np
+
+import navtri
+
+FixResult = collections.namedtuple('FixResult', 'lat lon cov residuals sigma iterations')
+
+
+class LSQFixError(Exception):
+    """Raised if the fix cannot be solved: fewer than two sights or LOPs that
+    are (nearly) parallel
+    """
+    pass
+
+
+def altCorrections(gha, dec, lat, lon, hp = 0, sd = 0, limb = 0, elevation = 0, temp = 20,
+        pressure = 1010):
+    """Returns array with apparent topocentric altitude minus geocentric
+    altitude (degrees) for each sight at its AP, i.e. the combined parallax,
+    refraction and semidiameter correction (see navtri.apparentHcZn() for
+    arguments)
+    """
+    (HcApp, ZnApp) = navtri.apparentHcZn(gha, dec, lat, lon, hp = hp, sd = sd, limb = limb,
+            elevation = elevation, temp = temp, pressure = pressure)
+    (HcGeo, ZnGeo) = navtri.hcZn(gha, dec, lat, lon)
+    return HcApp - HcGeo
+
+
+def errorEllipse(cov, scale = 1.0):
+    """Returns tuple (semi-major, semi-minor, orientation) of the error
+    ellipse for 2x2 covariance matrix cov of (north, east) position error in
+    nm^2: axes in nm multiplied by scale (1.0 = 1-sigma, see ellipseScale()),
+    orientation of the major axis in degrees true (0..180)
+    """
+    (w, v) = np.linalg.eigh(cov)
+    return (scale * np.sqrt(max(w[1], 0)), scale * np.sqrt(max(w[0], 0)),
+            np.degrees(np.arctan2(v[1, 1], v[0, 1])) % 180.0)
+
+
+def ellipseScale(p):
+    """Returns factor for errorEllipse() that turns the 1-sigma ellipse into
+    one containing the position with probability p (2-dimensional normal
+    distribution)
+    """
+    return np.sqrt(-2 * np.log(1 - p))
+
+
+def lsqFix(gha, dec, Ho, lat0, lon0, corr = 0, dT = 0, SOG = 0, COG = 0, weights = None,
+        sigmaPrior = 1.0, maxIter = 20, tol = 1e-4):
+    """Returns FixResult for sights given as arrays (one element per sight):
+        gha, dec    -   geocentric GHA and Dec of body at sight time (degrees)
+        Ho          -   observed altitude (degrees), i.e. Hs corrected for index
+                        error and dip (Sight.Ha)
+        corr        -   altitude corrections from altCorrections() (degrees)
+        dT          -   fix UT minus sight UT in hours
+        weights     -   optional relative weight per sight (e.g. 1/sigma^2)
+    Scalars:
+        lat0, lon0  -   start position (e.g. DR or AP) in degrees
+        SOG, COG    -   vessel speed in kn and course in degrees true for MOO
+        sigmaPrior  -   assumed sight std. deviation in nm, used for the
+                        covariance if there are only two sights
+        maxIter     -   max. number of iterations
+        tol         -   convergence tolerance for the position step in nm
+    Raises LSQFixError if there are fewer than two sights or if the azimuths
+    do not determine a position.
+    """
+    gha = np.asarray(gha, dtype = np.float64)
+    dec = np.asarray(dec, dtype = np.float64)
+    n = len(gha)
+    if n < 2:
+        raise LSQFixError
+
+    # observed altitude reduced to geocentric, in arc minutes:
+    HoGeo = (np.asarray(Ho, dtype = np.float64) - corr) * 60
+    moo = np.asarray(dT, dtype = np.float64) * SOG
+    cogRad = np.radians(COG)
+
+    if weights is None:
+        w = np.ones(n)
+    else:
+        w = np.asarray(weights, dtype = np.float64)
+    sw = np.sqrt(w)
+
+    lat = float(lat0)
+    lon = float(lon0)
+
+    for it in range(1, maxIter+1):
+        (Hc, Zn) = navtri.hcZn(gha, dec, lat, lon)
+        zRad = np.radians(Zn)
+        A = np.column_stack((np.cos(zRad), np.sin(zRad)))
+        r = HoGeo - Hc * 60 + np.cos(cogRad - zRad) * moo
+
+        N = np.dot(A.T * w, A)
+        if abs(np.linalg.det(N)) < 1e-6 * np.trace(N)**2:
+            raise LSQFixError
+        step = np.linalg.solve(N, np.dot(A.T, w * r))
+
+        lat += step[0] / 60.0
+        lon += step[1] / (60.0 * np.cos(np.radians(lat)))
+
+        if np.hypot(step[0], step[1]) < tol:
+            break
+
+    # residuals at final position:
+    (Hc, Zn) = navtri.hcZn(gha, dec, lat, lon)
+    zRad = np.radians(Zn)
+    A = np.column_stack((np.cos(zRad), np.sin(zRad)))
+    r = HoGeo - Hc * 60 + np.cos(cogRad - zRad) * moo
+
+    if n > 2:
+        sigma = np.sqrt(np.sum((sw * r)**2) / (n - 2))
+    else:
+        sigma = sigmaPrior
+    cov = sigma**2 * np.linalg.inv(np.dot(A.T * w, A))
+
+    lon = (lon + 180.0) % 360.0 - 180.0
+
+    return FixResult(lat, lon, cov, r, sigma, it)
+
+
+if __name__ == '__main__':
+
+    import timeit
+
+    # 24 synthetic star sights around a known position:
+    rng = np.random.RandomState(0)
+    n = 24
+    lat, lon = -18.5, -178.9
+    gha = rng.uniform(0, 360, n)
+    dec = rng.uniform(-60, 60, n)
+    (Hc, Zn) = navtri.hcZn(gha, dec, lat, lon)
+    Ho = Hc + rng.normal(0, 0.3, n) / 60
+
+    r = lsqFix(gha, dec, Ho, lat + 0.5, lon - 0.5)
+    print r.lat, r.lon, r.iterations, r.sigma
+    print r.cov
+
+    t = timeit.Timer(lambda: lsqFix(gha, dec, Ho, lat + 0.1, lon - 0.1))
+    print 'usec per fix: %.1f' % (min(t.repeat(3, 1000)) / 1000 * 1e6)
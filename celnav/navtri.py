@@ -0,0 +1,186 @@
+"""navtri: support module for celnav
+Vectorized solution of the navigational triangle: computes altitude (Hc) and
+azimuth (Zn) for any number of sights at once from GHA, Dec, lat and lon
+arrays, without calling ephem.compute() for each AP. All functions accept
+NumPy arrays (or scalars that broadcast against them) with angles in degrees
+incl. decimal fraction (S, W = -) and return NumPy arrays.
+
+Exports:
+
+    hcZn()          -   geocentric or (if hp is given) topocentric altitude and
+                        azimuth, no refraction
+
+    refraction()    -   refraction correction to be added to a true altitude
+                        in order to get the apparent altitude (same model as
+                        PyEphem's refract())
+
+    apparentHcZn()  -   topocentric apparent altitude and azimuth incl.
+                        parallax, refraction and (for limb sights) topocentric
+                        semidiameter, i.e. the value PyEphem provides as
+                        body.alt (+/- body.radius) for an observer. This is
+                        what LOP.calcIcAz() compares Ha against.
+
+The formulation avoids arcsin/arccos: the body's direction is expressed as a
+vector in the observer's north/east/up frame and altitude and azimuth are
+obtained via arctan2, which stays accurate near the zenith (where arcsin loses
+precision) and near the poles (where the usual azimuth formulas divide by
+cos(lat)).
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import numpy as np
+
+# WGS84 Earth model (used for the observer's geocentric position when
+# applying parallax):
+EARTH_RADIUS = 6378137.0            # equatorial radius in m
+EARTH_FLATTENING = 1 / 298.257223563
+
+AU = 149597870.7                    # astronomical unit in km
+
+# limb indicators for apparentHcZn():
+LIMB = { 'UL' : 1, 'LL' : -1, None : 0 }
+
+
+def hcZn(gha, dec, lat, lon, hp = 0, elevation = 0):
+    """Returns tuple (Hc, Zn) of arrays with altitude and azimuth (0..360) in
+    degrees for bodies at gha/dec seen from lat/lon. If hp (horizontal
+    parallax in degrees) is 0 the result is geocentric, otherwise the body is
+    placed at its distance and the altitude is topocentric for an observer at
+    elevation (m above sea level) on the WGS84 ellipsoid.
+    """
+    lat = np.radians(lat)
+    lha = np.radians(np.asarray(gha, dtype = np.float64) + lon)
+    dec = np.radians(dec)
+
+    sinLat = np.sin(lat)
+    cosLat = np.cos(lat)
+    cosDec = np.cos(dec)
+    sinDec = np.sin(dec)
+    cosLHA = np.cos(lha)
+
+    # unit vector towards body in north/east/up frame:
+    north = cosLat * sinDec - sinLat * cosDec * cosLHA
+    east = -cosDec * np.sin(lha)
+    up = sinLat * sinDec + cosLat * cosDec * cosLHA
+
+    hp = np.asarray(hp, dtype = np.float64)
+    if np.any(hp != 0):
+        # body distance in Earth radii, observer position relative to Earth's
+        # centre expressed in the same frame (geocentric vs geodetic lat):
+        with np.errstate(divide = 'ignore'):
+            dist = np.where(hp > 0, 1 / np.sin(np.radians(hp)), np.inf)
+        (rhoSinLatGc, rhoCosLatGc) = _geocentricObserver(lat, elevation)
+        obsNorth = rhoSinLatGc * cosLat - rhoCosLatGc * sinLat
+        obsUp = rhoCosLatGc * cosLat + rhoSinLatGc * sinLat
+        fin = np.isfinite(dist)
+        north = np.where(fin, dist * north - obsNorth, north)
+        east = np.where(fin, dist * east, east)
+        up = np.where(fin, dist * up - obsUp, up)
+
+    Hc = np.degrees(np.arctan2(up, np.hypot(north, east)))
+    Zn = np.degrees(np.arctan2(east, north)) % 360.0
+
+    return (Hc, Zn)
+
+
+def _geocentricObserver(lat, elevation):
+    """Returns (rho*sin(lat'), rho*cos(lat')) for geodetic lat (radians) and
+    elevation (m) where lat' is the geocentric latitude and rho the distance
+    from the Earth's centre in equatorial radii
+    """
+    f = EARTH_FLATTENING
+    u = np.arctan((1 - f) * np.tan(lat))
+    h = np.asarray(elevation, dtype = np.float64) / EARTH_RADIUS
+    return ((1 - f) * np.sin(u) + h * np.sin(lat), np.cos(u) + h * np.cos(lat))
+
+
+def _unrefract(h, temp, pressure):
+    """Returns true altitude for apparent altitude h (degrees); same model as
+    PyEphem's unrefract() (blend between low-altitude formula below 14.5 deg
+    and the standard 1/tan law above 15.5 deg)
+    """
+    t = 273.0 + temp
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        rGE = np.degrees(7.888888e-5 * pressure / (t * np.tan(np.radians(h))))
+    rLT = (((2e-5 * h + 1.96e-2) * h + 1.594e-1) * pressure
+            / (t * ((8.45e-2 * h + 5.05e-1) * h + 1)))
+    rLT = np.where((h < 0) & (rLT < 0), 0, rLT)
+    p = np.clip((h - 14.5) / (15.5 - 14.5), 0, 1)
+    r = np.where(h < 14.5, rLT, np.where(h >= 15.5, rGE, rLT + (rGE - rLT) * p))
+    return h - r
+
+
+def refraction(h, temp = 20, pressure = 1010, iterations = 8):
+    """Returns refraction in degrees for true altitude h (degrees), i.e.
+    apparent altitude = h + refraction(h). temp in deg C, pressure in mbar
+    (pressure = 0 yields 0). Inverts _unrefract() by the secant method, for
+    all elements at once.
+    """
+    h = np.asarray(h, dtype = np.float64)
+    t = _unrefract(h, temp, pressure)
+    d = 0.8 * (h - t)
+    t0 = t
+    a = h.copy()
+    for i in range(iterations):
+        a = a + d
+        t = _unrefract(a, temp, pressure)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            d = np.where(np.abs(h - t) > 1e-10, d * -(h - t) / (t0 - t), 0)
+        d = np.where(np.isfinite(d), d, 0)
+        if not d.any():                 # all converged
+            break
+        t0 = t
+    return a - h
+
+
+def apparentHcZn(gha, dec, lat, lon, hp = 0, sd = 0, limb = 0, elevation = 0, temp = 20,
+        pressure = 1010):
+    """Returns tuple (Hc, Zn) with topocentric apparent altitude and azimuth
+    in degrees, comparable to a sextant altitude corrected for index error and
+    dip (Ha):
+        gha, dec    -   geocentric apparent GHA and Dec of body
+        lat, lon    -   AP
+        hp          -   horizontal parallax (0 for stars)
+        sd          -   geocentric semidiameter (0 for stars/planets)
+        limb        -   +1 for upper limb, -1 for lower limb, 0 for centre
+                        (see LIMB)
+        elevation   -   observer elevation above sea level in m
+        temp        -   in deg C
+        pressure    -   in mbar
+    Parallax and semidiameter are applied the same way PyEphem does for
+    topocentric results (the semidiameter is augmented to its topocentric
+    value), refraction is applied to the body's centre.
+    """
+    (Hc, Zn) = hcZn(gha, dec, lat, lon, hp = hp, elevation = elevation)
+
+    sd = np.asarray(sd, dtype = np.float64)
+    limb = np.asarray(limb)
+    if np.any((sd != 0) & (limb != 0)):
+        # topocentric semidiameter: scale by ratio of geocentric to topocentric
+        # distance
+        (HcGeo, ZnGeo) = hcZn(gha, dec, lat, lon)
+        sinHP = np.sin(np.radians(hp))
+        sinH = np.sin(np.radians(HcGeo))
+        sdTopo = sd / np.sqrt(1 - 2 * sinHP * sinH + sinHP * sinHP)
+    else:
+        sdTopo = sd
+
+    Hc = Hc + refraction(Hc, temp, pressure) + limb * sdTopo
+
+    return (Hc, Zn)
+
+
+def hpFromDist(dist):
+    """Returns horizontal parallax in degrees for distance dist (AU) from the
+    Earth's centre (e.g. ephem's earth_distance)
+    """
+    return np.degrees(np.arcsin(EARTH_RADIUS / 1000.0 / (np.asarray(dist, dtype = np.float64) * AU)))
+
+
+if __name__ == '__main__':
+
+    # zenith, pole and horizon checks:
+    print hcZn([0, 0, 90], [10, 0, 0], [10, 90, 0], [0, 0, 0])
+    print apparentHcZn(0, 0, 0, 90, temp = 10, pressure = 1010)
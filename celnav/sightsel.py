@@ -0,0 +1,154 @@
+"""sightsel: support module for celnav
+Automatic selection of the sight to be used for a fix from a series of sights
+of the same body (LOP.lopSightIndex). The series is fitted robustly against
+time, outliers are flagged and the inlier closest to the fitted curve is
+picked. Two fit methods are available:
+
+    curve   -   fits the MOO corrected intercepts (Sight.srfIc) of the
+                reduced sights by a constant: the reduction already removes
+                the expected altitude curve of the body (incl. its altitude
+                rate and curvature), so for a good series these intercepts
+                only scatter around a common value
+
+    linear  -   fits the sextant altitudes Hs by a straight line against
+                time; does not require reduced sights, but is only adequate
+                for series of a few minutes away from meridian passage
+
+All calculations for a series are done at once with NumPy arrays. The fit
+starts from a median based estimate (median for the constant, Theil-Sen
+slope for the line), takes the median absolute deviation of the residuals as
+robust scatter, drops points beyond OUTLIER_K times that scatter and re-fits
+the remaining points by least squares.
+
+Exports:
+
+    fitSeries()     -   robust fit of values against time; returns SeriesFit
+
+    SeriesFit       -   named tuple with fields
+                            index       index of best sight (inlier with the
+                                        smallest residual)
+                            outliers    boolean array, True for outliers
+                            residuals   value minus fit in arc minutes
+                            coeffs      polynomial coefficients of the fit
+                                        (highest power first, time in s)
+                            sigma       std. deviation of the inliers about
+                                        the fit in arc minutes
+                            synthIndex  index of the inlier closest to the
+                                        mean inlier time
+                            synthValue  fitted value at the time of
+                                        synthIndex (i.e. that sight with its
+                                        residual removed)
+
+The constants below can be overwritten in celnav.ini in section [sightsel].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import numpy as np
+
+import cncfg
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [sightsel].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'sightsel'
+
+# fit method ('curve' or 'linear', see above):
+METHOD = 'curve'
+if cncfg.cncfg.has_option(SECTION_ID, 'METHOD'):
+    METHOD = cncfg.cncfg.get(SECTION_ID, 'METHOD')
+
+# residuals of more than OUTLIER_K times the robust scatter are outliers:
+OUTLIER_K = 3.0
+if cncfg.cncfg.has_option(SECTION_ID, 'OUTLIER_K'):
+    OUTLIER_K = cncfg.cncfg.getfloat(SECTION_ID, 'OUTLIER_K')
+
+# lower limit for the robust scatter in arc minutes (avoids flagging sights
+# that differ by no more than the usual sextant reading error):
+MIN_SIGMA = 0.3
+if cncfg.cncfg.has_option(SECTION_ID, 'MIN_SIGMA'):
+    MIN_SIGMA = cncfg.cncfg.getfloat(SECTION_ID, 'MIN_SIGMA')
+
+# select sight for fix automatically when sights are reduced in the GUI (a
+# sight picked by hand is kept; outliers are flagged either way):
+AUTO_SELECT = True
+if cncfg.cncfg.has_option(SECTION_ID, 'AUTO_SELECT'):
+    AUTO_SELECT = cncfg.cncfg.getboolean(SECTION_ID, 'AUTO_SELECT')
+
+#-----------------------------------------------------------------------------
+
+# scale factor turning the median absolute deviation into a std. deviation
+# for normally distributed values:
+MAD_SCALE = 1.4826
+
+SeriesFit = collections.namedtuple('SeriesFit',
+        'index outliers residuals coeffs sigma synthIndex synthValue')
+
+
+def fitSeries(t, y, degree = 0, k = OUTLIER_K, minSigma = MIN_SIGMA):
+    """Returns SeriesFit for values y (arc minutes) observed at times t
+    (seconds, any origin). degree is 0 (constant) or 1 (straight line); it
+    is reduced if there are too few points to check the fit. k and minSigma
+    see OUTLIER_K and MIN_SIGMA.
+    """
+    t = np.asarray(t, dtype = np.float64)
+    y = np.asarray(y, dtype = np.float64)
+    n = len(y)
+    degree = max(0, min(degree, n - 3))
+    t = t - t.mean()
+
+    # robust start: median or Theil-Sen line (median of all pairwise slopes):
+    if degree == 0:
+        coeffs = np.array([np.median(y)])
+    else:
+        (i, j) = np.triu_indices(n, 1)
+        dt = t[j] - t[i]
+        use = dt != 0
+        slope = np.median((y[j] - y[i])[use] / dt[use]) if use.any() else 0.0
+        coeffs = np.array([slope, np.median(y - slope * t)])
+
+    res = y - np.polyval(coeffs, t)
+    scatter = max(MAD_SCALE * np.median(np.abs(res - np.median(res))), minSigma)
+    outliers = np.abs(res) > k * scatter
+
+    # least squares re-fit of the inliers:
+    inl = ~outliers
+    if inl.sum() > degree:
+        coeffs = np.polyfit(t[inl], y[inl], degree)
+        res = y - np.polyval(coeffs, t)
+        outliers = np.abs(res) > k * scatter
+        inl = ~outliers
+    if inl.sum() > degree + 1:
+        sigma = np.sqrt(np.sum(res[inl]**2) / (inl.sum() - degree - 1))
+    else:
+        sigma = scatter
+
+    candidates = np.where(inl)[0] if inl.any() else np.arange(n)
+    index = int(candidates[np.argmin(np.abs(res[candidates]))])
+    synthIndex = int(candidates[np.argmin(np.abs(t[candidates] - t[candidates].mean()))])
+
+    return SeriesFit(index, outliers, res, coeffs, sigma, synthIndex,
+            y[synthIndex] - res[synthIndex])
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # 40 sun sights over 6 min: altitude rising 8'/min, 0.4' scatter, two
+    # misreadings of 10' and -5':
+    rng = np.random.RandomState(0)
+    t = np.sort(rng.uniform(0, 360, 40))
+    y = 45 * 60 + 8 * t / 60 + rng.normal(0, 0.4, 40)
+    y[[7, 23]] += [10, -5]
+
+    start = time.time()
+    fit = fitSeries(t, y, degree = 1)
+    print 'usec per fit: %.1f' % ((time.time() - start) * 1e6)
+    print 'outliers:', np.where(fit.outliers)[0], 'best:', fit.index, 'sigma: %.2f' % fit.sigma
+    print 'rate [\'/min]: %.2f' % (fit.coeffs[0] * 60)
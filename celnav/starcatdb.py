@@ -0,0 +1,132 @@
+"""starcatdb: support module for celnav
+Precompiled navigational star catalogue, generated by
+starcat.compileCatalogue() from starcat.navStarDB - do not edit.
+
+CATALOGUE maps DB_SOURCE ('hip', 'aa') to a tuple of records, see FIELDS
+(ra/dec in radians for epoch 2000.0, pmRA/pmDec in mas/yr as used by ephem).
+"""
+
+FIELDS = ('num', 'name', 'spect', 'ra', 'dec', 'pmRA', 'pmDec', 'mag')
+
+CATALOGUE = {
+    'aa' : (
+        (7, 'Acamar', 'A4', 0.7778128170241767, -0.7034500583981352, -53.52999700610117, 25.710000150773496, 2.88),
+        (5, 'Achernar', 'B3', 0.42635848354395645, -0.9989692073458152, 88.0199981256161, -40.08000077686035, 0.45),
+        (30, 'Acrux', 'B1', 3.2576476677026864, -1.101286177380528, -35.36999847493379, -14.73000006319668, 0.77),
+        (19, 'Adhara', 'B2', 1.8265996359488197, -0.5056582453288404, 2.629999999581718, 2.2899999634986306, 1.5),
+        (10, 'Aldebaran', 'K5', 1.2039306632975142, 0.2881411573858187, 62.7800006548202, -189.35999046941888, 0.87),
+        (32, 'Alioth', 'A0', 3.377339293478267, 0.9766836799035171, 111.74000170058544, -8.989999567852903, 1.76),
+        (34, 'Alkaid', 'B3', 3.610827113704399, 0.8606796924305602, -121.22999209107314, -15.559999491673254, 1.85),
+        (55, "Al Na'ir", 'B7', 5.795511007185349, -0.8196239730663208, 127.59999504571032, -147.91000208933448, 1.73),
+        (15, 'Alnilam', 'B0', 1.4670080684414364, -0.02097798494434584, 1.4899999509766495, -1.0599999694037114, 1.69),
+        (25, 'Alphard', 'K3', 2.476567521596724, -0.15112204824054326, -14.490000525908703, 33.24999992326969, 1.99),
+        (41, 'Alphecca', 'A0', 4.078345624276086, 0.466259425201161, 120.37999035792943, -89.44000191728627, 2.22),
+        (1, 'Alpheratz', 'B', 0.036598318139434254, 0.5077238909799439, 135.68000144338467, -162.9500018130704, 2.07),
+        (51, 'Altair', 'A7', 5.1957723884129, 0.1547812764614537, 536.8199868037227, 385.539979745511, 0.76),
+        (2, 'Ankaa', 'K0', 0.11468463976186924, -0.7383800599388194, 232.75998212806164, -353.63998424766345, 2.4),
+        (42, 'Antares', 'M1', 4.317103902510928, -0.46132518548030066, -10.159999177868862, -23.20999877262473, 1.06),
+        (37, 'Arcturus', 'K2', 3.7335270326119474, 0.33479618387866467, -1093.4500140512405, -1999.3999255359138, -0.05),
+        (43, 'Atria', 'K2', 4.4011292159676385, -1.204761076411203, 17.84999916242667, -32.919999306300575, 1.91),
+        (22, 'Avior', 'K3', 2.1926304502873313, -1.0386382141379769, -25.33999987732324, 22.719998870629748, 1.86),
+        (13, 'Bellatrix', 'B2', 1.4186513216872123, 0.11082225036788983, -8.749999713212489, -13.27999922203833, 1.64),
+        (16, 'Betelgeuse', 'M2', 1.549729257336647, 0.12927726491574165, 27.32999821382938, 10.859999578005779, 0.45),
+        (17, 'Canopus', 'F0', 1.675306569682265, -0.9197134666431759, 19.989998384032912, 23.66999880867736, -0.62),
+        (12, 'Capella', 'M1', 1.3818172386546543, 0.802817131108769, 75.51999633952875, -427.1299884160259, 0.08),
+        (53, 'Deneb', 'A2', 5.416768741738404, 0.7902914363622549, 1.5599999723573053, 1.5500000021238969, 1.25),
+        (28, 'Denebola', 'A3', 3.0938568077169655, 0.2543300088583991, -499.02000721913157, -113.7799977320094, 2.14),
+        (4, 'Diphda', 'K0', 0.19019492813041272, -0.313925779090157, 232.78998855302325, 32.71000024470413, 2.04),
+        (27, 'Dubhe', 'F7', 2.8960590071987093, 1.07775642410703, -136.45998978452684, -35.24999935250608, 1.81),
+        (14, 'Elnath', 'B7', 1.4237167762308651, 0.4992934658791302, 23.279997718538787, -174.21999537574837, 1.65),
+        (47, 'Eltanin', 'K5', 4.697580370735882, 0.8986515604506301, -8.519999462861014, -23.04999948759887, 2.24),
+        (54, 'Enif', 'K2', 5.690585230491901, 0.17235087578349514, 30.020000129707512, 1.3799999774326892, 2.38),
+        (56, 'Fomalhaut', 'A3', 6.01113545523937, -0.5170058913116264, 329.22000124852553, -164.2199898631533, 1.17),
+        (31, 'Gacrux', 'M4', 3.2775777278753138, -0.9968132893872893, 27.939998532555702, -264.3299963906837, 1.59),
+        (29, 'Gienah', 'B8', 3.210559775314662, -0.30616454231337875, -159.57998821721588, 22.309998611147698, 2.58),
+        (35, 'Hadar', 'B1', 3.681874595175593, -1.0537075808251684, -33.95999945118134, -25.05999887214937, 0.61),
+        (6, 'Hamal', 'K2', 0.5548983468507305, 0.40949617890128565, 190.72999184459994, -145.76999073608073, 2.01),
+        (48, 'Kaus Australis', 'B9', 4.817859736137072, -0.6001253061645001, -39.61000208500621, -124.04999576327576, 1.79),
+        (40, 'Kochab', 'K4', 3.8864375100407362, 1.2942574395371826, -32.28999922838055, 11.910000114996196, 2.07),
+        (57, 'Markab', 'B9', 6.04215940991409, 0.2653816276074996, 61.099998919181445, -42.55999806117431, 2.49),
+        (8, 'Menkar', 'M2', 0.7953445766384075, 0.0713787789001802, -11.809999370262329, -78.7599994433313, 2.54),
+        (36, 'Menkent', 'K0', 3.6943496996144836, -0.6347764428758101, -519.2899800885825, -517.869997073767, 2.06),
+        (24, 'Miaplacidus', 'A2', 2.4137875193481233, -1.2167949761595995, -157.66000720557446, 108.91000066960524, 1.67),
+        (9, 'Mirfak', 'F5', 0.8915260356132066, 0.8702422544395011, 24.109999818555767, -26.009998810196983, 1.79),
+        (50, 'Nunki', 'B2', 4.953529778492609, -0.45896453070424204, 13.869999910383056, -52.64999689678657, 2.05),
+        (52, 'Peacock', 'B2', 5.347896231403404, -0.9902143934109711, 7.7099997821773885, -86.15000197771903, 1.94),
+        (58, 'Polaris', 'F7', 0.6624015385170604, 1.557952254903998, 44.220000601721814, -11.739999828854577, 1.97),
+        (21, 'Pollux', 'K0', 2.030323192887858, 0.4891492244155942, -625.6899485503476, -45.94999755388271, 1.16),
+        (20, 'Procyon', 'F5', 2.0040828220825926, 0.09119330797259939, -716.5699858316018, -1034.5800076975097, 0.4),
+        (46, 'Rasalhague', 'A5', 4.603020613524396, 0.219213887345537, 110.07999312226111, -222.6099903926886, 2.08),
+        (26, 'Regulus', 'B7', 2.654523401069579, 0.208866848319193, -249.4000017340741, 4.91000002106556, 1.36),
+        (11, 'Rigel', 'B8', 1.372430057994855, -0.14314603900303347, 1.8699999732907324, -0.5599999813694096, 0.18),
+        (38, 'Rigil Kentaurus', 'G2', 3.8379766253078094, -1.0617773530286048, -3678.189918147729, 481.8399719243139, -0.01),
+        (44, 'Sabik', 'A2', 4.495872305472638, -0.2744516673978012, 41.160001681990025, 97.64999660422495, 2.43),
+        (3, 'Schedar', 'K0', 0.1767471662437964, 0.986762907852416, 50.360002378184845, -32.169998474535284, 2.24),
+        (45, 'Shaula', 'B1', 4.597236083328921, -0.6475836689269445, -8.900000257719533, -29.95000002838834, 1.62),
+        (18, 'Sirius', 'A0', 1.7677909849690272, -0.2917522920895631, -546.0099764892809, -1223.0799141625766, -1.44),
+        (33, 'Spica', 'B1', 3.5133178227790927, -0.19480162772831555, -42.499999763324, -31.729998349110886, 0.98),
+        (23, 'Suhail', 'K4', 2.3910848582145987, -0.7580420181457935, -23.209998850727118, 14.279999982458166, 2.23),
+        (49, 'Vega', 'A0', 4.8735651917068195, 0.6769020005901538, 201.0199960595113, 287.4599829711758, 0.03),
+        (39, 'Zubenelgenubi', 'A3', 3.887191201389389, -0.2799819855395858, -105.68999313021429, -68.99999704148158, 2.75),
+    ),
+    'hip' : (
+        (7, 'Acamar', 'A4', 0.777814707797533, -0.7034501068795033, -53.529994804837564, 25.710000150773496, 2.88),
+        (5, 'Achernar', 'B3', 0.4263548474413481, -0.998968286199821, 88.01999733893444, -40.08000077686035, 0.45),
+        (30, 'Acrux', 'B1', 3.2576497766421992, -1.1012869046010496, -35.36999698645437, -14.73000006319668, 0.77),
+        (19, 'Adhara', 'B2', 1.8266034174955321, -0.505660669397246, 2.629999900713773, 2.2899999634986306, 1.5),
+        (10, 'Aldebaran', 'K5', 1.2039281180256884, 0.2881490113674527, 62.779998897832556, -189.35999046941888, 0.87),
+        (32, 'Alioth', 'A0', 3.377328457892494, 0.9766814012792158, 111.73999457863644, -8.989999567852903, 1.76),
+        (34, 'Alkaid', 'B3', 3.6108353312962933, 0.8606795469864559, -121.22999078301282, -15.559999491673254, 1.85),
+        (55, "Al Na'ir", 'B7', 5.795502498705245, -0.8196172826375216, 127.59999566037706, -147.91000208933448, 1.73),
+        (15, 'Alnilam', 'B0', 1.4670074139429672, -0.02097788798160962, 1.4899999540078703, -1.0599999694037114, 1.69),
+        (25, 'Alphard', 'K3', 2.476571303143437, -0.15112127253865346, -14.49000016978916, 33.24999992326969, 1.99),
+        (41, 'Alphecca', 'A0', 4.078339951956017, 0.4662647096702851, 120.37999155766981, -89.44000191728627, 2.22),
+        (1, 'Alpheratz', 'B', 0.03659155498858278, 0.5077308238155838, 135.67998985759488, -162.9500018130704, 2.07),
+        (51, 'Altair', 'A7', 5.195750644519302, 0.15476707142059717, 536.8199861951125, 385.539979745511, 0.76),
+        (2, 'Ankaa', 'K0', 0.1146732223996791, -0.7383634793109255, 232.7599800089096, -353.63998424766345, 2.4),
+        (42, 'Antares', 'M1', 4.317108265834057, -0.46132445825977897, -10.159999104812037, -23.20999877262473, 1.06),
+        (37, 'Arcturus', 'K2', 3.733575610942795, 0.3348811717169631, -1093.4499192047792, -1999.3999255359138, -0.05),
+        (43, 'Atria', 'K2', 4.401129143245587, -1.2047595734887913, 17.850000277583334, -32.919999306300575, 1.91),
+        (22, 'Avior', 'K3', 2.1926324137827398, -1.0386371960292466, -25.339999118563476, 22.719998870629748, 1.86),
+        (13, 'Bellatrix', 'B2', 1.4186545214575075, 0.11082355936482882, -8.74999947804157, -13.27999922203833, 1.64),
+        (16, 'Betelgeuse', 'M2', 1.5497287482822817, 0.12927556806785778, 27.330000094327115, 10.859999578005779, 0.45),
+        (17, 'Canopus', 'F0', 1.6753051879632737, -0.9197157937488453, 19.989998173980126, 23.66999880867736, -0.62),
+        (12, 'Capella', 'M1', 1.3818135298299938, 0.8028369115069584, 75.51999550147046, -427.1299884160259, 0.08),
+        (53, 'Deneb', 'A2', 5.416767505463517, 0.7902899334398434, 1.559999948404313, 1.5500000021238969, 1.25),
+        (28, 'Denebola', 'A3', 3.0938797151633985, 0.2543332571100626, -499.02000689563897, -113.7799977320094, 2.14),
+        (4, 'Diphda', 'K0', 0.19018489248721376, -0.3139270396057279, 232.78998877601907, 32.71000024470413, 2.04),
+        (27, 'Dubhe', 'F7', 2.896068461065491, 1.0777602056537428, -136.45999557155457, -35.24999935250608, 1.81),
+        (14, 'Elnath', 'B7', 1.4237159762882912, 0.49929991390108897, 23.279998481806548, -174.21999537574837, 1.65),
+        (47, 'Eltanin', 'K5', 4.6975813161225615, 0.898651608931998, -8.519999594962286, -23.04999948759887, 2.24),
+        (54, 'Enif', 'K2', 5.690583485162649, 0.17235126363444003, 30.02000016348061, 1.3799999774326892, 2.38),
+        (56, 'Fomalhaut', 'A3', 6.011117565614537, -0.5170004613983981, 329.219999465075, -164.2199898631533, 1.17),
+        (31, 'Gacrux', 'M4', 3.2775778005973657, -0.9968021386726237, 27.939998812992997, -264.3299963906837, 1.59),
+        (29, 'Gienah', 'B8', 3.2105695200696527, -0.3061646877574831, -159.57999683515047, 22.309998611147698, 2.58),
+        (35, 'Hadar', 'B1', 3.6818767768371576, -1.0537071444928554, -33.95999862300965, -25.05999887214937, 0.61),
+        (6, 'Hamal', 'K2', 0.5548910746455139, 0.40950272388598064, 190.7299872539863, -145.76999073608073, 2.01),
+        (48, 'Kaus Australis', 'B9', 4.81786504484688, -0.6001217670246279, -39.610001353169245, -124.04999576327576, 1.79),
+        (40, 'Kochab', 'K4', 3.88644100069924, 1.2942586030900174, -32.28999933413298, 11.910000114996196, 2.07),
+        (57, 'Markab', 'B9', 6.042155337479169, 0.2653821609025489, 61.09999813652719, -42.55999806117431, 2.49),
+        (8, 'Menkar', 'M2', 0.7953465401338159, 0.07138396640656808, -11.809999162233128, -78.7599994433313, 2.54),
+        (36, 'Menkent', 'K0', 3.694376243163524, -0.6347534627073255, -519.2899835856158, -517.869997073767, 2.06),
+        (24, 'Miaplacidus', 'A2', 2.4138078088006774, -1.2167994364454657, -157.66000696728165, 108.91000066960524, 1.67),
+        (9, 'Mirfak', 'F5', 0.8915250902265285, 0.8702429816600227, 24.109997902350386, -26.009998810196983, 1.79),
+        (50, 'Nunki', 'B2', 4.953528033163357, -0.45896341563277554, 13.870000052478488, -52.64999689678657, 2.05),
+        (52, 'Peacock', 'B2', 5.347899722061909, -0.9902125511189829, 7.710000210203472, -86.15000197771903, 1.94),
+        (58, 'Polaris', 'F7', 0.6622870012848983, 1.5579536123823048, 44.21999983339685, -11.739999828854577, 1.97),
+        (21, 'Pollux', 'K0', 2.0303560632554367, 0.48915276355546633, -625.6899514754343, -45.94999755388271, 1.16),
+        (20, 'Procyon', 'F5', 2.0041106746285724, 0.09123708664800358, -716.5699824855903, -1034.5800076975097, 0.4),
+        (46, 'Rasalhague', 'A5', 4.6030150139263775, 0.21922305032410996, 110.07999704692672, -222.6099903926886, 2.08),
+        (26, 'Regulus', 'B7', 2.6545367092051255, 0.2088674300956103, -249.40000371828597, 4.91000002106556, 1.36),
+        (11, 'Rigel', 'B8', 1.3724323851005242, -0.14314608748440158, 1.8699999602237145, -0.5599999813694096, 0.18),
+        (38, 'Rigil Kentaurus', 'G2', 3.8383353631911463, -1.061773474519156, -3678.1899090451484, 481.8399719243139, -0.01),
+        (44, 'Sabik', 'A2', 4.49587070558749, -0.27445544894451385, 41.15999812423681, 97.64999660422495, 2.43),
+        (3, 'Schedar', 'K0', 0.17674367558529244, 0.9867655258462942, 50.36000126992915, -32.169998474535284, 2.24),
+        (45, 'Shaula', 'B1', 4.597233610779147, -0.6475801782684405, -8.899999568426919, -29.95000002838834, 1.62),
+        (18, 'Sirius', 'A0', 1.7678221827294063, -0.2916978475131745, -546.0099929947341, -1223.0799141625766, -1.44),
+        (33, 'Spica', 'B1', 3.5133186954437186, -0.19479813706981158, -42.50000030503834, -31.729998349110886, 0.98),
+        (23, 'Suhail', 'K4', 2.391085076380755, -0.7580420666271614, -23.209999304302713, 14.279999982458166, 2.23),
+        (49, 'Vega', 'A0', 4.873555592395933, 0.6768920134283231, 201.01999186273554, 287.4599829711758, 0.03),
+        (39, 'Zubenelgenubi', 'A3', 3.887195855600728, -0.27997893121339484, -105.68999750233877, -68.99999704148158, 2.75),
+    ),
+}
@@ -0,0 +1,217 @@
+"""starid: support module for celnav
+Identification of an unknown star from its sextant altitude (Hs) and an
+approximate (e.g. hand bearing compass) azimuth, for the UT of the sight and
+the DR position.
+
+StarIdentifier projects all stars of a catalogue (starindex.catalogue() by
+default, i.e. the navigational stars or the stars loaded from HIP_FILE)
+once into altitude and azimuth for an epoch (UT and DR) and indexes their
+horizontal unit vectors with starindex.GridIndex. An observation at any UT
+within EPOCH_MINUTES of the epoch is turned back to the epoch about the
+celestial pole (diurnal motion), the stars near it are taken from the
+index, and only for these altitude and azimuth at the UT of the observation
+are calculated exactly. Candidates within the altitude and azimuth
+tolerances are ranked by their normalized residual:
+
+    score = sqrt((dAlt / ALT_TOLERANCE)**2 + (dAz / AZ_TOLERANCE)**2)
+
+Close to the zenith (above about 85 deg) a DR error alone shifts the
+azimuth by more than AZ_TOLERANCE, so such stars may not be found.
+
+Exports:
+
+    StarIdentifier  -   alt/az projection of a catalogue for an epoch; see
+                        identify()
+
+    identify()      -   identification with a shared StarIdentifier (a new
+                        projection is made when UT or DR change)
+
+    StarMatch       -   result record: name, mag, alt, az (calculated), dAlt,
+                        dAz (calculated - observed, degrees) and score
+
+All angles are in degrees incl. decimal fraction.
+
+The constants below can be overwritten in celnav.ini in section [starid].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import numpy as np
+
+import starindex
+import starvec
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [starid].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'starid'
+
+# max. difference between calculated and observed altitude in degrees (DR
+# error plus sight error):
+ALT_TOLERANCE = 2.0
+if cncfg.cncfg.has_option(SECTION_ID, 'ALT_TOLERANCE'):
+    ALT_TOLERANCE = cncfg.cncfg.getfloat(SECTION_ID, 'ALT_TOLERANCE')
+
+# max. difference between calculated and observed azimuth in degrees:
+AZ_TOLERANCE = 10.0
+if cncfg.cncfg.has_option(SECTION_ID, 'AZ_TOLERANCE'):
+    AZ_TOLERANCE = cncfg.cncfg.getfloat(SECTION_ID, 'AZ_TOLERANCE')
+
+# max. time between epoch of a projection and the UT of a sight in minutes:
+EPOCH_MINUTES = 60
+if cncfg.cncfg.has_option(SECTION_ID, 'EPOCH_MINUTES'):
+    EPOCH_MINUTES = cncfg.cncfg.getint(SECTION_ID, 'EPOCH_MINUTES')
+
+#-----------------------------------------------------------------------------
+
+# diurnal motion in degrees per day (sidereal rate):
+SIDEREAL_RATE = 360.98564736629
+
+StarMatch = collections.namedtuple('StarMatch', 'name mag alt az dAlt dAz score')
+
+
+def _horizontal(alt, az):
+    """Returns horizontal unit vectors (n, 3) (north, east, up) for alt, az in
+    degrees
+    """
+    (alt, az) = (np.radians(alt), np.radians(az))
+    cosAlt = np.cos(alt)
+    return np.column_stack((cosAlt * np.cos(az), cosAlt * np.sin(az), np.sin(alt)))
+
+
+def _rotate(v, axis, angle):
+    """Returns vector v rotated by angle (radians) about unit vector axis
+    (right-handed)
+    """
+    (c, s) = (np.cos(angle), np.sin(angle))
+    return v * c + np.cross(axis, v) * s + axis * axis.dot(v) * (1 - c)
+
+
+class StarIdentifier(classprint.AttrDisplay):
+    """Altitude/azimuth projection of catalogue (starindex.StarCatalogue,
+    default starindex.catalogue()) for epoch ut ((Y, M, D, h, m, s) tuple or
+    ephem date) and DR lat/lon, for an observer at elevation with temp and
+    pressure
+    """
+    def __init__(self, ut, lat, lon, catalogue = None, elevation = 0, temp = 20,
+            pressure = 1010):
+        if catalogue is None:
+            catalogue = starindex.catalogue()
+
+        self.catalogue = catalogue
+        self.epoch = float(starvec._jd(ut)[0] - starvec.JD_EPHEM)
+        (self.lat, self.lon) = (lat, lon)
+        (self.elevation, self.temp, self.pressure) = (elevation, temp, pressure)
+
+        p = catalogue.places(self.epoch, np.arange(len(catalogue)), lat, lon, elevation, temp,
+                pressure)
+        self.index = starindex.GridIndex(_horizontal(p['alt'], p['az']))
+
+        # celestial north pole in the horizontal frame:
+        self.pole = np.array([np.cos(np.radians(lat)), 0, np.sin(np.radians(lat))])
+
+
+    def covers(self, ut):
+        """Returns True if ut is within EPOCH_MINUTES of the epoch
+        """
+        dt = float(starvec._jd(ut)[0] - starvec.JD_EPHEM) - self.epoch
+        return abs(dt) * 1440 <= EPOCH_MINUTES
+
+
+    def identify(self, Hs, az, ut, indexError = 0, heightOfEye = 0, altTolerance = None,
+            azTolerance = None):
+        """Returns list of StarMatch records for the stars matching sextant
+        altitude Hs and approximate azimuth az observed at ut (within
+        EPOCH_MINUTES of the epoch), best match first; indexError in arc
+        minutes, heightOfEye in m, tolerances in degrees (default
+        ALT_TOLERANCE and AZ_TOLERANCE)
+        """
+        if altTolerance is None:
+            altTolerance = ALT_TOLERANCE
+        if azTolerance is None:
+            azTolerance = AZ_TOLERANCE
+
+        # apparent altitude (same as celnav.reduceSights()):
+        Ha = Hs + indexError / 60.0 - 0.0293 * np.sqrt(heightOfEye)
+
+        # observed direction at the epoch: turned back eastward about the pole
+        # (negative angle since the (north, east, up) frame is left-handed):
+        dt = float(starvec._jd(ut)[0] - starvec.JD_EPHEM) - self.epoch
+        u = _rotate(_horizontal(Ha, az)[0], self.pole, -np.radians(SIDEREAL_RATE * dt))
+
+        i = self.index.near(u, np.hypot(altTolerance, azTolerance) + starindex.MARGIN)
+        if len(i) == 0:
+            return []
+
+        p = self.catalogue.places(ut, i, self.lat, self.lon, self.elevation, self.temp,
+                self.pressure)
+        dAlt = p['alt'] - Ha
+        dAz = np.mod(p['az'] - az + 180.0, 360.0) - 180.0
+        m = (np.abs(dAlt) <= altTolerance) & (np.abs(dAz) <= azTolerance)
+        score = np.hypot(dAlt / altTolerance, dAz / azTolerance)
+
+        return [StarMatch(p['names'][j], p['mag'][j], p['alt'][j], p['az'][j], dAlt[j], dAz[j],
+            score[j]) for j in np.flatnonzero(m)[np.argsort(score[m], kind = 'mergesort')]]
+
+
+_identifier = None
+
+
+def identify(Hs, az, ut, lat, lon, indexError = 0, heightOfEye = 0, elevation = 0, temp = 20,
+        pressure = 1010, altTolerance = None, azTolerance = None):
+    """Same as StarIdentifier.identify() with a shared StarIdentifier for
+    starindex.catalogue(), made anew if ut is not covered or DR, observer
+    parameters or catalogue have changed
+    """
+    global _identifier
+
+    c = _identifier
+    if (c is None or not c.covers(ut) or c.catalogue is not starindex.catalogue() or
+            (c.lat, c.lon, c.elevation, c.temp, c.pressure) != (lat, lon, elevation, temp,
+            pressure)):
+        c = _identifier = StarIdentifier(ut, lat, lon, elevation = elevation, temp = temp,
+                pressure = pressure)
+
+    return c.identify(Hs, az, ut, indexError, heightOfEye, altTolerance, azTolerance)
+
+
+if __name__ == '__main__':
+
+    import time
+
+    import ephem
+
+    # identify every star above 10 deg from its altitude/azimuth 40 minutes
+    # after the epoch, with the DR 20' off and a 5 deg compass error:
+    #   python starid.py [HIP_MAIN_DAT]
+    import sys
+    if len(sys.argv) > 1:
+        catalogue = starindex.hipparcosCatalogue(sys.argv[1])
+    else:
+        catalogue = starindex.navCatalogue()
+
+    epoch = (2013, 6, 28, 6, 0, 0)
+    ut = ephem.Date(ephem.Date(epoch) + 40 * ephem.minute)
+    (lat, lon) = (30, -40)
+
+    t = time.time()
+    s = StarIdentifier(epoch, lat + 0.33, lon - 0.33, catalogue)
+    print 'projection of %d stars: %.2f ms' % (len(catalogue), (time.time() - t) * 1000)
+
+    p = catalogue.visible(ut, lat, lon, minAlt = 10)
+    (found, first, tq) = (0, 0, 0.0)
+    for (n, alt, az) in zip(p['names'], p['alt'], p['az']):
+        t = time.time()
+        r = s.identify(alt, az + 5, ut)
+        tq += time.time() - t
+        found += n in [m.name for m in r]
+        first += len(r) > 0 and r[0].name == n
+    print '%d stars: found %d, ranked first %d, %.3f ms per sight' % (len(p['names']), found,
+            first, tq / len(p['names']) * 1000)
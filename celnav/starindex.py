@@ -0,0 +1,365 @@
+"""starindex: support module for celnav
+Star catalogue with a spatial index, for the navigational stars of starcat
+or for several thousand stars loaded from the Hipparcos main catalogue
+(hip_main.dat), answering queries like "which stars are within 5 deg of
+this altitude/azimuth" or "stars brighter than magnitude 3 above 15 deg".
+
+The index is a grid of GRID x GRID x GRID cells over the J2000 unit vectors
+of the stars (star numbers sorted by cell, with the start of every cell, as
+NumPy arrays). A query is converted to a J2000 vector (precession, nutation
+and sidereal time from starvec), the cells around it supply the candidates,
+and altitude/azimuth of the candidates only are calculated with starvec and
+navtri for the exact selection. The search radius is widened by a margin
+for refraction, aberration and proper motion since J2000.
+
+Exports:
+
+    StarCatalogue   -   catalogue arrays plus index; see near(), cone() and
+                        visible()
+
+    GridIndex       -   the index for any unit vectors; see near()
+
+    catalogue()     -   shared StarCatalogue used by celnav.StarFinder
+                        (HIP_FILE if set, navigational stars otherwise)
+
+    navCatalogue()  -   StarCatalogue of the navigational stars of starcat
+
+    hipparcosCatalogue()
+                    -   StarCatalogue of the stars in hip_main.dat up to a
+                        given magnitude (names are 'HIP <number>')
+
+All angles are in degrees incl. decimal fraction.
+
+The constants below can be overwritten in celnav.ini in section [starindex].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import os
+
+import numpy as np
+
+import starcat
+import starvec
+import navtri
+import cncfg
+import classprint
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [starindex].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'starindex'
+
+# Hipparcos main catalogue used by catalogue() (None: navigational stars):
+HIP_FILE = None
+if cncfg.cncfg.has_option(SECTION_ID, 'HIP_FILE'):
+    HIP_FILE = cncfg.cncfg.get(SECTION_ID, 'HIP_FILE')
+
+# faintest visual magnitude loaded from HIP_FILE:
+MAX_MAG = 4.5
+if cncfg.cncfg.has_option(SECTION_ID, 'MAX_MAG'):
+    MAX_MAG = cncfg.cncfg.getfloat(SECTION_ID, 'MAX_MAG')
+
+# index cells per axis (cell size about 115 / GRID deg):
+GRID = 16
+if cncfg.cncfg.has_option(SECTION_ID, 'GRID'):
+    GRID = cncfg.cncfg.getint(SECTION_ID, 'GRID')
+
+#-----------------------------------------------------------------------------
+
+# epoch of the Hipparcos positions (J1991.25) in Julian years before J2000:
+HIP_EPOCH_YEARS = 8.75
+
+# margin added to query radii for refraction (up to 1.46 deg, for true
+# altitudes around -4 deg with the PyEphem model) and aberration:
+MARGIN = 1.5
+
+# above this radius all stars are candidates (no cell lookup):
+MAX_CELL_RADIUS = 30
+
+
+def _vectors(ra, dec):
+    """Returns unit vectors (n, 3) for ra, dec in radians
+    """
+    cosDec = np.cos(dec)
+    return np.column_stack((cosDec * np.cos(ra), cosDec * np.sin(ra), np.sin(dec)))
+
+
+def _haDec(alt, az, lat):
+    """Returns tuple (lha, dec) in radians for altitude alt, azimuth az and
+    latitude lat (radians); lha is measured westward
+    """
+    dec = np.arcsin(np.sin(alt) * np.sin(lat) + np.cos(alt) * np.cos(lat) * np.cos(az))
+    lha = np.arctan2(-np.sin(az) * np.cos(alt),
+            np.sin(alt) * np.cos(lat) - np.cos(alt) * np.sin(lat) * np.cos(az))
+    return (lha, dec)
+
+
+class GridIndex(classprint.AttrDisplay):
+    """Index for unit vectors (array (n, 3)) with grid cells per axis
+    (default GRID): vector numbers sorted by cell (cellOrder) and the start
+    of every cell in cellOrder (cellStart)
+    """
+    def __init__(self, vectors, grid = None):
+        if grid is None:
+            grid = GRID
+
+        self.vectors = vectors
+        self.grid = grid
+        cells = self.__cells(vectors)
+        self.cellOrder = np.argsort(cells, kind = 'mergesort')
+        self.cellStart = np.searchsorted(cells[self.cellOrder], np.arange(grid**3 + 1))
+
+
+    def __cells(self, v):
+        ijk = np.clip(((v + 1) / 2 * self.grid).astype(int), 0, self.grid - 1)
+        return (ijk[..., 0] * self.grid + ijk[..., 1]) * self.grid + ijk[..., 2]
+
+
+    def near(self, u, radius):
+        """Returns sorted array of the numbers of the vectors within radius
+        (degrees) of unit vector u
+        """
+        if radius > MAX_CELL_RADIUS:
+            i = np.arange(len(self.vectors))
+        else:
+            chord = 2 * np.sin(np.radians(radius) / 2)
+            (lo, hi) = [np.clip(((np.asarray(u) + d + 1) / 2 * self.grid).astype(int), 0,
+                self.grid - 1) for d in (-chord, chord)]
+            cells = ((np.arange(lo[0], hi[0] + 1)[:, np.newaxis, np.newaxis] * self.grid
+                + np.arange(lo[1], hi[1] + 1)[:, np.newaxis]) * self.grid
+                + np.arange(lo[2], hi[2] + 1)).ravel()
+            i = np.sort(np.concatenate([self.cellOrder[self.cellStart[c]:self.cellStart[c + 1]]
+                for c in cells]))
+
+        return i[self.vectors[i].dot(u) >= np.cos(np.radians(min(radius, 180)))]
+
+
+class StarCatalogue(classprint.AttrDisplay):
+    """Stars names with J2000 ra/dec in radians, proper motion pmRA/pmDec in
+    radians per Julian year (pmRA as change of RA) and visual magnitude mag,
+    held in order of magnitude (brightest first) and indexed with grid cells
+    per axis (default GRID, see GridIndex). Query results are in the same
+    order.
+    """
+    def __init__(self, names, ra, dec, pmRA, pmDec, mag, grid = None):
+        order = np.argsort(mag, kind = 'mergesort')
+        self.names = np.array(names, dtype = object)[order]
+        self.mag = np.asarray(mag, dtype = np.float64)[order]
+        self.catalogue = tuple([np.asarray(a, dtype = np.float64)[order]
+            for a in (ra, dec, pmRA, pmDec)])
+        (ra, dec, pmRA, pmDec) = self.catalogue
+
+        self.maxPM = np.hypot(pmRA * np.cos(dec), pmDec).max() if len(ra) else 0.0
+        self.index = GridIndex(_vectors(ra, dec), grid)
+
+
+    def __len__(self):
+        return len(self.names)
+
+
+    def near(self, u, radius):
+        """Returns sorted array of star numbers whose J2000 vector is within
+        radius of unit vector u
+        """
+        return self.index.near(u, radius)
+
+
+    def places(self, ut, i, lat, lon, elevation = 0, temp = 20, pressure = 1010, within = None):
+        """Returns dictionary with 'names', 'mag' and arrays 'sha', 'dec',
+        'gha', 'alt' and 'az' (see starvec.table()) for stars i at ut (single
+        UT) for an observer at lat/lon. If given, within(alt, az) is called
+        with the altitudes (without refraction) and azimuths and returns a
+        bool array of the stars to keep; refraction is only calculated for
+        those.
+        """
+        (ra, dec, gha) = [a[0] for a in starvec._apparent(starvec._jd(ut), i, self.catalogue)]
+        if within is not None:
+            m = within(*navtri.hcZn(gha, dec, lat, lon))
+            (i, ra, dec, gha) = (i[m], ra[m], dec[m], gha[m])
+
+        if len(i) == 0:
+            (alt, az) = (np.zeros(0), np.zeros(0))
+        else:
+            (alt, az) = navtri.apparentHcZn(gha, dec, lat, lon, elevation = elevation,
+                    temp = temp, pressure = pressure)
+        return { 'names' : list(self.names[i]), 'mag' : self.mag[i],
+                'sha' : np.mod(360.0 - ra, 360.0), 'dec' : dec, 'gha' : gha, 'alt' : alt,
+                'az' : az }
+
+
+    def __candidates(self, ut, alt, az, radius, lat, lon, maxMag):
+        """Returns star numbers within radius (plus margin) of altitude alt
+        and azimuth az at ut for an observer at lat/lon, not fainter than
+        maxMag
+        """
+        jd = starvec._jd(ut)[:1]
+        (M, beta, eqEq) = starvec._matrices(jd)
+        (lha, dec) = _haDec(np.radians(alt), np.radians(az), np.radians(lat))
+        ra = np.radians(starvec._gast(jd, eqEq)[0] + lon) - lha
+        u = M[0].T.dot(_vectors(np.array([ra]), np.array([dec]))[0])   # to J2000
+
+        margin = MARGIN + np.degrees(self.maxPM * abs(jd[0] - starvec.JD_2000) / 365.25)
+        i = self.near(u, radius + margin)
+        if maxMag is not None:
+            i = i[self.mag[i] <= maxMag]
+        return i
+
+
+    def cone(self, ut, alt, az, radius, lat, lon, maxMag = None, elevation = 0, temp = 20,
+            pressure = 1010):
+        """Returns dictionary (see places()) for the stars within radius of
+        topocentric apparent altitude alt and azimuth az at ut for an observer
+        at lat/lon, optionally only those not fainter than maxMag; entry
+        'distance' holds the angular distances from alt/az
+        """
+        def distanceTo(h, z):
+            (a1, a2) = (np.radians(alt), np.radians(h))
+            cosD = np.sin(a1) * np.sin(a2) + np.cos(a1) * np.cos(a2) * np.cos(np.radians(z - az))
+            return np.degrees(np.arccos(np.clip(cosD, -1, 1)))
+
+        i = self.__candidates(ut, alt, az, radius, lat, lon, maxMag)
+        p = self.places(ut, i, lat, lon, elevation, temp, pressure,
+                within = lambda h, z: distanceTo(h, z) <= radius + MARGIN)
+        distance = distanceTo(p['alt'], p['az'])
+        m = distance <= radius
+
+        result = self.__select(p, m)
+        result['distance'] = distance[m]
+        return result
+
+
+    def visible(self, ut, lat, lon, minAlt = 15, maxMag = None, elevation = 0, temp = 20,
+            pressure = 1010):
+        """Returns dictionary (see places()) for the stars at or above
+        topocentric apparent altitude minAlt at ut for an observer at lat/lon,
+        optionally only those not fainter than maxMag
+        """
+        i = self.__candidates(ut, 90, 0, 90 - minAlt, lat, lon, maxMag)
+        p = self.places(ut, i, lat, lon, elevation, temp, pressure,
+                within = lambda h, z: h >= minAlt - MARGIN)
+        return self.__select(p, p['alt'] >= minAlt)
+
+
+    def __select(self, p, m):
+        result = dict([(k, v[m]) for (k, v) in p.items() if k != 'names'])
+        result['names'] = [n for (n, x) in zip(p['names'], m) if x]
+        return result
+
+
+_navCatalogues = {}
+
+
+def navCatalogue():
+    """Returns StarCatalogue of the navigational stars for the current
+    starcat.DB_SOURCE (built once per source)
+    """
+    source = starcat.DB_SOURCE
+    if source not in _navCatalogues:
+        _navCatalogues[source] = StarCatalogue(starvec.NAMES, *(starvec._catalogue(source)
+            + (starvec.MAG, )))
+    return _navCatalogues[source]
+
+
+def hipparcosCatalogue(fileName, maxMag = None):
+    """Returns StarCatalogue with all stars of Hipparcos main catalogue
+    fileName (hip_main.dat, fields separated by '|') with astrometric data
+    and visual magnitude up to maxMag (default MAX_MAG). Positions are
+    propagated from the Hipparcos epoch J1991.25 to J2000.
+    """
+    if maxMag is None:
+        maxMag = MAX_MAG
+
+    (hip, mag, ra, dec, pmRA, pmDec) = ([], [], [], [], [], [])
+    for line in open(fileName):
+        f = line.split('|')
+        try:
+            row = (int(f[1]), float(f[5]), float(f[8]), float(f[9]), float(f[12]), float(f[13]))
+        except (IndexError, ValueError):        # no astrometric solution
+            continue
+        if row[1] <= maxMag:
+            for (a, x) in zip((hip, mag, ra, dec, pmRA, pmDec), row):
+                a.append(x)
+
+    dec = np.radians(dec)
+    pmDec = np.array(pmDec) / 1000.0 * starvec.ARCSEC
+    pmRA = np.array(pmRA) / 1000.0 * starvec.ARCSEC / np.cos(dec)   # mu_alpha* -> change of RA
+    ra = np.radians(ra) + pmRA * HIP_EPOCH_YEARS
+    dec = dec + pmDec * HIP_EPOCH_YEARS
+
+    return StarCatalogue(['HIP %d' % h for h in hip], ra, dec, pmRA, pmDec, mag)
+
+
+_hipCatalogue = None
+
+
+def catalogue():
+    """Returns the StarCatalogue used by celnav: stars from HIP_FILE (loaded
+    on first use) if set, the navigational stars otherwise
+    """
+    global _hipCatalogue, HIP_FILE
+
+    if HIP_FILE and _hipCatalogue is None:
+        try:
+            _hipCatalogue = hipparcosCatalogue(os.path.expandvars(HIP_FILE))
+        except EnvironmentError:
+            HIP_FILE = None
+
+    if _hipCatalogue is not None:
+        return _hipCatalogue
+    return navCatalogue()
+
+
+if __name__ == '__main__':
+
+    import sys
+    import time
+
+    # query times and check against starvec.table():
+    #   python starindex.py [HIP_MAIN_DAT]
+    if len(sys.argv) > 1:
+        c = hipparcosCatalogue(sys.argv[1])
+    else:
+        c = navCatalogue()
+    print '%d stars' % len(c)
+
+    ut = (2013, 6, 28, 6, 0, 0)
+    (lat, lon) = (30, -40)
+
+    # cone of RADIUS about the navigational star above 15 deg with the most
+    # others within RADIUS (by starvec.table()):
+    RADIUS = 30
+    tab = starvec.table(ut, lat = lat, lon = lon)
+    alt = dict(zip(starvec.NAMES, tab['alt'][0]))
+    az = dict(zip(starvec.NAMES, tab['az'][0]))
+
+    def distance(n, h, z):
+        (a1, a2) = (np.radians(h), np.radians(alt[n]))
+        return np.degrees(np.arccos(np.clip(np.sin(a1) * np.sin(a2) + np.cos(a1) * np.cos(a2)
+            * np.cos(np.radians(az[n] - z)), -1, 1)))
+
+    centre = max([n for n in starvec.NAMES if alt[n] >= 15], key = lambda m:
+            sum([distance(n, alt[m], az[m]) <= RADIUS for n in starvec.NAMES]))
+    (cAlt, cAz) = (alt[centre], az[centre])
+
+    t = time.time()
+    for k in range(100):
+        r = c.cone(ut, cAlt, cAz, RADIUS, lat, lon)
+    print 'cone %d deg about %s: %d stars, %.3f ms' % (RADIUS, centre, len(r['names']),
+            (time.time() - t) * 10)
+
+    t = time.time()
+    for k in range(100):
+        v = c.visible(ut, lat, lon, minAlt = 15, maxMag = 3)
+    print 'above 15 deg, mag <= 3: %d stars, %.3f ms' % (len(v['names']), (time.time() - t) * 10)
+
+    if len(sys.argv) == 1:
+        assert len(r['names']) > 1
+        for n in starvec.NAMES:
+            assert (distance(n, cAlt, cAz) <= RADIUS) == (n in r['names']), n
+            assert ((alt[n] >= 15) and (starvec.MAG[starvec.NAMES.index(n)] <= 3)) == (
+                    n in v['names']), n
+        print 'same selection as starvec.table()'
@@ -0,0 +1,226 @@
+"""starplan: support module for celnav
+Star selection for twilight fixes: finds the combinations of navigational
+stars with the best fix geometry during the twilight window between civil
+twilight (Sun 6 deg below the horizon) and nautical twilight (12 deg) as
+calculated by celnav.SunMoonRiseSet, and returns them as a ranked shooting
+plan.
+
+Altitudes and azimuths of all stars are calculated with starvec for
+SAMPLES UTs spread over the window. At each UT the stars between MIN_ALT and
+MAX_ALT not fainter than MAX_MAG (at most MAX_CANDIDATES, brightest first)
+are candidates, and all combinations of size stars of them are scored at
+once as NumPy arrays (all 58-choose-4 = 424,270 combinations take about
+0.1 s):
+
+    spread      -   1 for azimuths evenly spaced around the horizon (360 /
+                    size apart), 0 for all stars at the same azimuth (RMS
+                    deviation of the azimuth gaps from 360 / size)
+
+    altitude    -   mean over the stars: 1 within ALT_BAND, falling to 0 at
+                    MIN_ALT and MAX_ALT
+
+    magnitude   -   mean over the stars: 1 for magnitude -1.5 and brighter,
+                    0 at MAX_MAG
+
+    score       -   WEIGHTS[0] * spread + WEIGHTS[1] * altitude + WEIGHTS[2]
+                    * magnitude
+
+Exports:
+
+    plan()          -   ranked shooting plans for a twilight
+
+    twilightWindow()
+                    -   UTs of civil and nautical twilight
+
+    scoreCombinations()
+                    -   scores for all combinations of a set of stars
+
+    StarPlan        -   record for a plan: ut, names, alt, az and mag (per
+                        star, in order of azimuth), score, spread, altitude
+                        and magnitude
+
+The constants below can be overwritten in celnav.ini in section [starplan].
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import collections
+
+import numpy as np
+import ephem
+
+import celnav
+import starvec
+import cncfg
+
+#-----------------------------------------------------------------------------
+# The following constants can be overritten in celnav.ini in section
+# [starplan].
+#-----------------------------------------------------------------------------
+
+SECTION_ID = 'starplan'
+
+# number of stars per plan:
+SIZE = 4
+if cncfg.cncfg.has_option(SECTION_ID, 'SIZE'):
+    SIZE = cncfg.cncfg.getint(SECTION_ID, 'SIZE')
+
+# altitude limits and preferred altitude band in degrees:
+MIN_ALT = 15.0
+if cncfg.cncfg.has_option(SECTION_ID, 'MIN_ALT'):
+    MIN_ALT = cncfg.cncfg.getfloat(SECTION_ID, 'MIN_ALT')
+
+MAX_ALT = 75.0
+if cncfg.cncfg.has_option(SECTION_ID, 'MAX_ALT'):
+    MAX_ALT = cncfg.cncfg.getfloat(SECTION_ID, 'MAX_ALT')
+
+ALT_BAND = (25.0, 60.0)
+if cncfg.cncfg.has_option(SECTION_ID, 'ALT_BAND'):
+    ALT_BAND = tuple([float(x) for x in cncfg.cncfg.get(SECTION_ID, 'ALT_BAND').split(',')])
+
+# faintest magnitude:
+MAX_MAG = 2.5
+if cncfg.cncfg.has_option(SECTION_ID, 'MAX_MAG'):
+    MAX_MAG = cncfg.cncfg.getfloat(SECTION_ID, 'MAX_MAG')
+
+# max. number of candidate stars per UT (limits the number of combinations,
+# e.g. 30 choose 5 = 142,506):
+MAX_CANDIDATES = 30
+if cncfg.cncfg.has_option(SECTION_ID, 'MAX_CANDIDATES'):
+    MAX_CANDIDATES = cncfg.cncfg.getint(SECTION_ID, 'MAX_CANDIDATES')
+
+# weights of spread, altitude and magnitude scores:
+WEIGHTS = (0.6, 0.25, 0.15)
+if cncfg.cncfg.has_option(SECTION_ID, 'WEIGHTS'):
+    WEIGHTS = tuple([float(x) for x in cncfg.cncfg.get(SECTION_ID, 'WEIGHTS').split(',')])
+
+# number of UTs evaluated in the twilight window:
+SAMPLES = 5
+if cncfg.cncfg.has_option(SECTION_ID, 'SAMPLES'):
+    SAMPLES = cncfg.cncfg.getint(SECTION_ID, 'SAMPLES')
+
+#-----------------------------------------------------------------------------
+
+# magnitude with full magnitude score:
+BRIGHT_MAG = -1.5
+
+StarPlan = collections.namedtuple('StarPlan',
+        'ut names alt az mag score spread altitude magnitude')
+
+
+def _combinations(n, k):
+    """Returns array (n choose k, k) with all k-combinations of range(n) in
+    lexicographic order
+    """
+    c = np.arange(n)[:, np.newaxis]
+    for j in range(1, k):
+        last = c[:, -1]
+        counts = n - 1 - last                   # larger elements per row
+        rows = np.repeat(np.arange(len(c)), counts)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        c = np.column_stack((c[rows], last[rows] + 1 + offsets))
+    return c
+
+
+def scoreCombinations(alt, az, mag, size = None):
+    """Returns tuple (combinations, score, spread, altitude, magnitude) for
+    all combinations of size stars (default SIZE) of the stars with altitude
+    alt, azimuth az and magnitude mag (arrays of equal length):
+    combinations as array (n choose size, size) of indexes into alt, az and
+    mag, all others as arrays with one element per combination (see module
+    doc string)
+    """
+    if size is None:
+        size = SIZE
+
+    c = _combinations(len(alt), size)
+
+    # azimuth gaps (sorted azimuths, incl. the gap across north):
+    a = np.sort(np.asarray(az)[c], axis = 1)
+    gaps = np.diff(np.column_stack((a, a[:, :1] + 360.0)), axis = 1)
+    ideal = 360.0 / size
+    worst = np.sqrt(((360.0 - ideal)**2 + (size - 1) * ideal**2) / size)
+    spread = 1 - np.sqrt(np.mean((gaps - ideal)**2, axis = 1)) / worst
+
+    h = np.asarray(alt, dtype = np.float64)
+    hScore = np.clip(np.minimum((h - MIN_ALT) / max(ALT_BAND[0] - MIN_ALT, 1e-9),
+        (MAX_ALT - h) / max(MAX_ALT - ALT_BAND[1], 1e-9)), 0, 1)
+    altitude = hScore[c].mean(axis = 1)
+
+    mScore = np.clip((MAX_MAG - np.asarray(mag)) / (MAX_MAG - BRIGHT_MAG), 0, 1)
+    magnitude = mScore[c].mean(axis = 1)
+
+    score = WEIGHTS[0] * spread + WEIGHTS[1] * altitude + WEIGHTS[2] * magnitude
+    return (c, score, spread, altitude, magnitude)
+
+
+def twilightWindow(lat, lon, ut = None, twilight = 'pm'):
+    """Returns tuple (start, end) of ephem dates for the twilight ('am' or
+    'pm') of the day of ut (default: now) at lat/lon: from civil to nautical
+    twilight in the evening, from nautical to civil twilight in the morning.
+    Returns None if the Sun does not reach the twilight altitudes.
+    """
+    d = celnav.SunMoonRiseSet(lat, lon, ut).sunData
+    (civil, naut) = (d['twl_civil_' + twilight], d['twl_naut_' + twilight])
+    if civil is None or naut is None:
+        return None
+    return tuple(sorted((float(ephem.Date(civil)), float(ephem.Date(naut)))))
+
+
+def plan(lat, lon, ut = None, twilight = 'pm', size = None, count = 5, temp = 20,
+        pressure = 1010):
+    """Returns list of up to count StarPlan records (best first, each with a
+    different set of stars) for the twilight ('am' or 'pm') of the day of ut
+    (default: now) at DR lat/lon; size is the number of stars per plan
+    (default SIZE). Returns an empty list if there is no twilight window or
+    not enough stars.
+    """
+    if size is None:
+        size = SIZE
+
+    window = twilightWindow(lat, lon, ut, twilight)
+    if window is None:
+        return []
+
+    uts = np.linspace(window[0], window[1], SAMPLES)
+    t = starvec.table(uts, lat = lat, lon = lon, temp = temp, pressure = pressure)
+    names = np.array(starvec.NAMES, dtype = object)
+    order = np.argsort(t['mag'], kind = 'mergesort')
+
+    plans = {}
+    for (k, ut) in enumerate(uts):
+        i = order[(t['alt'][k, order] >= MIN_ALT) & (t['alt'][k, order] <= MAX_ALT) &
+                (t['mag'][order] <= MAX_MAG)][:MAX_CANDIDATES]
+        if len(i) < size:
+            continue
+
+        (c, score, spread, altitude, magnitude) = scoreCombinations(t['alt'][k, i], t['az'][k, i],
+                t['mag'][i], size)
+        for j in np.argsort(-score, kind = 'mergesort')[:count]:
+            s = i[c[j]]
+            s = s[np.argsort(t['az'][k, s])]
+            key = frozenset(names[s])
+            if key not in plans or plans[key].score < score[j]:
+                plans[key] = StarPlan(ephem.Date(ut).tuple(), list(names[s]), t['alt'][k, s],
+                        t['az'][k, s], t['mag'][s], score[j], spread[j], altitude[j], magnitude[j])
+
+    return sorted(plans.values(), key = lambda p: -p.score)[:count]
+
+
+if __name__ == '__main__':
+
+    import time
+
+    t = time.time()
+    alt = np.random.uniform(MIN_ALT, MAX_ALT, 58)
+    c = scoreCombinations(alt, np.random.uniform(0, 360, 58), starvec.MAG, 4)
+    print '58 choose 4 = %d combinations: %.3f s' % (len(c[0]), time.time() - t)
+
+    for (lat, lon, twilight) in ((30, -40, 'pm'), (-18, -178, 'am')):
+        t = time.time()
+        plans = plan(lat, lon, (2013, 6, 28, 12, 0, 0), twilight)
+        print '\n%s twilight at %d/%d: %.3f s' % (twilight, lat, lon, time.time() - t)
+        for p in plans:
+            print '%02d:%02d  %.3f  ' % (p.ut[3:5] + (p.score, )) + ', '.join(['%s %.0f/%.0f'
+                % x for x in zip(p.names, p.alt, p.az)])
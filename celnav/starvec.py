@@ -0,0 +1,290 @@
+"""starvec: support module for celnav
+Vectorized apparent places of the navigational stars: the starcat catalogue
+(J2000 RA and Dec, proper motion, magnitude; for the current
+starcat.DB_SOURCE) is held as NumPy arrays and proper motion, precession
+(IAU 1976), nutation (main terms of IAU 1980) and annual aberration are
+applied to all stars and all UTs in one pass of array operations. GHA uses
+Greenwich apparent sidereal time; altitude and azimuth (incl. refraction)
+are obtained from navtri.
+
+Results agree with PyEphem to within about 0.01' for 1950..2050 (see the
+check at the end of this module), far inside the 0.1' required for sight
+reduction. A table of all 58 stars for 1000 UTs takes about 40 ms (most
+of it the refraction in navtri), i.e. about as long as updating a
+StarFinder with ephem for a few dozen UTs.
+
+With STAR_CALC == 'vector' celnav.StarFinder, celnav.geoPositions() and
+celnav.reduceSights() (navtri method for star sights) take the stars from
+here.
+
+Exports:
+
+    NAMES           -   star names (sorted by NA star number)
+
+    MAG             -   visual magnitudes (array, same order as NAMES)
+
+    table()         -   SHA/Dec, GHA and (for an observer) altitude/azimuth
+                        of all (or selected) stars for one or more UTs
+
+    positions()     -   GHA and Dec of one star per UT (e.g. the star of each
+                        sight)
+
+    gast()          -   Greenwich apparent sidereal time (GHA Aries)
+
+All angles are in degrees incl. decimal fraction.
+"""
+
+__author__ = "markus@namaniatsea.org"
+__version__ = "0.2.2"
+
+import numpy as np
+import ephem
+
+import starcat
+import navtri
+
+# Julian date of ephem date 0 and of J2000.0:
+JD_EPHEM = 2415020.0
+JD_2000 = 2451545.0
+
+# arc seconds in radians:
+ARCSEC = np.pi / (180 * 3600)
+
+# constant of aberration:
+KAPPA = 20.49552 * ARCSEC
+
+
+_catalogues = {}
+
+
+def _catalogue(source = None):
+    """Returns tuple (ra, dec, pmRA, pmDec) of arrays in NA star number order
+    for starcat source (default starcat.DB_SOURCE): J2000 RA/Dec in radians,
+    proper motion in radians per Julian year (pmRA as change of RA, i.e.
+    divided by cos(Dec)); cached per source
+    """
+    source = source or starcat.DB_SOURCE
+    if source not in _catalogues:
+        r = sorted(starcat.catalogue(source))
+        (ra, dec, pmRA, pmDec) = [np.array([x[k] for x in r]) for k in range(3, 7)]
+        _catalogues[source] = (ra, dec, pmRA / 1000.0 * ARCSEC / np.cos(dec),
+                pmDec / 1000.0 * ARCSEC)
+    return _catalogues[source]
+
+NAMES = tuple([r[1] for r in sorted(starcat.catalogue())])
+
+MAG = np.array([r[7] for r in sorted(starcat.catalogue())])
+
+_INDEX = dict([(n, i) for (i, n) in enumerate(NAMES)])
+
+
+def _jd(ut):
+    """Returns array of Julian dates for ut (sequence of (Y, M, D, h, m, s)
+    tuples or ephem dates, or a single one)
+    """
+    if isinstance(ut, tuple) or np.ndim(ut) == 0:
+        ut = [ut]
+    return np.array([float(ephem.Date(t)) if isinstance(t, tuple) else float(t) for t in ut]) + JD_EPHEM
+
+
+def _rx(a):
+    """Rotation matrices about the x axis for angles a (array), shape (n, 3, 3)
+    """
+    (c, s, o, z) = (np.cos(a), np.sin(a), np.ones(len(a)), np.zeros(len(a)))
+    return np.array([[o, z, z], [z, c, s], [z, -s, c]]).transpose((2, 0, 1))
+
+
+def _ry(a):
+    (c, s, o, z) = (np.cos(a), np.sin(a), np.ones(len(a)), np.zeros(len(a)))
+    return np.array([[c, z, -s], [z, o, z], [s, z, c]]).transpose((2, 0, 1))
+
+
+def _rz(a):
+    (c, s, o, z) = (np.cos(a), np.sin(a), np.ones(len(a)), np.zeros(len(a)))
+    return np.array([[c, s, z], [-s, c, z], [z, z, o]]).transpose((2, 0, 1))
+
+
+def _nutation(T):
+    """Returns tuple (dPsi, dEps, eps0) in radians for Julian centuries T
+    since J2000: nutation in longitude and obliquity (main terms, error
+    below 0.5") and mean obliquity
+    """
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    L = np.radians(280.4665 + 36000.7698 * T)           # mean longitude Sun
+    Lm = np.radians(218.3165 + 481267.8813 * T)         # mean longitude Moon
+    dPsi = (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * L) - 0.23 * np.sin(2 * Lm)
+            + 0.21 * np.sin(2 * omega)) * ARCSEC
+    dEps = (9.20 * np.cos(omega) + 0.57 * np.cos(2 * L) + 0.10 * np.cos(2 * Lm)
+            - 0.09 * np.cos(2 * omega)) * ARCSEC
+    eps0 = (84381.448 - 46.8150 * T - 0.00059 * T**2 + 0.001813 * T**3) * ARCSEC
+    return (dPsi, dEps, eps0)
+
+
+_lastMatrices = (None, None)
+
+
+def _matrices(jd):
+    """Returns tuple (M, beta, eqEq): matrices (n, 3, 3) for precession and
+    nutation from J2000 to the true equator and equinox of date, aberration
+    vectors (n, 3) (Earth velocity / c, true equator of date) and equation
+    of the equinoxes in radians. The result for the last jd is kept (several
+    calls for the same UTs, e.g. by starindex).
+    """
+    global _lastMatrices
+
+    key = jd.tostring()
+    (lastKey, result) = _lastMatrices
+    if key == lastKey:
+        return result
+
+    T = (jd - JD_2000) / 36525.0
+
+    # precession (IAU 1976):
+    zeta = (2306.2181 * T + 0.30188 * T**2 + 0.017998 * T**3) * ARCSEC
+    z = (2306.2181 * T + 1.09468 * T**2 + 0.018203 * T**3) * ARCSEC
+    theta = (2004.3109 * T - 0.42665 * T**2 - 0.041833 * T**3) * ARCSEC
+    P = np.einsum('nij,njk,nkl->nil', _rz(-z), _ry(theta), _rz(-zeta))
+
+    # nutation:
+    (dPsi, dEps, eps0) = _nutation(T)
+    eps = eps0 + dEps
+    N = np.einsum('nij,njk,nkl->nil', _rx(-eps), _rz(-dPsi), _rx(eps0))
+
+    # Earth's velocity from the Sun's true longitude (low precision) and the
+    # longitude of perihelion:
+    M = np.radians(357.52911 + 35999.05029 * T)
+    C = np.radians((1.914602 - 0.004817 * T) * np.sin(M) + 0.019993 * np.sin(2 * M)
+            + 0.000289 * np.sin(3 * M))
+    sun = np.radians(280.46646 + 36000.76983 * T) + C
+    e = 0.016708634 - 0.000042037 * T
+    pi = np.radians(102.93735 + 1.71946 * T)
+    vx = np.sin(sun) - e * np.sin(pi)
+    vy = np.cos(sun) - e * np.cos(pi)
+    beta = KAPPA * np.column_stack((vx, -vy * np.cos(eps), -vy * np.sin(eps)))
+
+    result = (np.einsum('nij,njk->nik', N, P), beta, dPsi * np.cos(eps))
+    _lastMatrices = (key, result)
+    return result
+
+
+def gast(ut):
+    """Returns array with Greenwich apparent sidereal time (GHA Aries) in
+    degrees for ut (sequence of (Y, M, D, h, m, s) tuples or ephem dates)
+    """
+    jd = _jd(ut)
+    return _gast(jd, _matrices(jd)[2])
+
+
+def _gast(jd, eqEq):
+    T = (jd - JD_2000) / 36525.0
+    gmst = (280.46061837 + 360.98564736629 * (jd - JD_2000) + 0.000387933 * T**2
+            - T**3 / 38710000.0)
+    return np.mod(gmst + np.degrees(eqEq), 360.0)
+
+
+def _apparent(jd, i, catalogue = None):
+    """Returns tuple (ra, dec, gha) in degrees for Julian dates jd (array of
+    shape (n, )) and star indexes i (array broadcasting against jd[:,
+    np.newaxis], e.g. shape (m, ) for a table or (n, 1) for one star per UT)
+    into catalogue (tuple (ra, dec, pmRA, pmDec) as returned by _catalogue(),
+    default: navigational stars)
+    """
+    (M, beta, eqEq) = _matrices(jd)
+    years = ((jd - JD_2000) / 365.25)[:, np.newaxis]
+    if catalogue is None:
+        catalogue = _catalogue()
+    (ra0, dec0, pmRA, pmDec) = catalogue
+
+    # proper motion:
+    ra = ra0[i] + pmRA[i] * years
+    dec = dec0[i] + pmDec[i] * years
+    cosDec = np.cos(dec)
+    u = np.empty((len(jd), 3, ra.shape[1]))
+    u[:, 0] = cosDec * np.cos(ra)
+    u[:, 1] = cosDec * np.sin(ra)
+    u[:, 2] = np.sin(dec)
+
+    # precession and nutation, then annual aberration:
+    u = np.matmul(M, u) + beta[:, :, np.newaxis]
+    raApp = np.degrees(np.arctan2(u[:, 1], u[:, 0]))
+    decApp = np.degrees(np.arctan2(u[:, 2], np.hypot(u[:, 0], u[:, 1])))
+
+    gha = np.mod(_gast(jd, eqEq)[:, np.newaxis] - raApp, 360.0)
+    return (np.mod(raApp, 360.0), decApp, gha)
+
+
+def table(ut, names = None, lat = None, lon = None, elevation = 0, temp = 20, pressure = 1010):
+    """Returns dictionary with arrays of shape (len(ut), len(names)) for the
+    stars names (default: NAMES) at ut (sequence of (Y, M, D, h, m, s) tuples
+    or ephem dates, or a single one):
+        'sha', 'dec', 'gha' -   geocentric apparent SHA, Dec and GHA
+        'alt', 'az'         -   topocentric apparent altitude (incl.
+                                refraction for temp/pressure) and azimuth for
+                                an observer at lat/lon, only if lat and lon
+                                are given (scalars or arrays of shape
+                                (len(ut), 1))
+        'mag'               -   magnitude (shape (len(names), ))
+    """
+    if names is None:
+        names = NAMES
+    i = np.array([_INDEX[n] for n in names])
+
+    (ra, dec, gha) = _apparent(_jd(ut), i)
+    result = { 'sha' : np.mod(360.0 - ra, 360.0), 'dec' : dec, 'gha' : gha, 'mag' : MAG[i] }
+
+    if lat is not None and lon is not None:
+        (result['alt'], result['az']) = navtri.apparentHcZn(gha, dec, lat, lon,
+                elevation = elevation, temp = temp, pressure = pressure)
+
+    return result
+
+
+def positions(ut, names):
+    """Returns tuple (gha, dec) of arrays with geocentric apparent GHA and Dec
+    of star names[k] at ut[k]
+    """
+    i = np.array([_INDEX[n] for n in names])[:, np.newaxis]
+    (ra, dec, gha) = _apparent(_jd(ut), i)
+    return (gha[:, 0], dec[:, 0])
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # compare with ephem: geocentric apparent SHA/Dec for 1950..2050 and
+    # topocentric altitude/azimuth for 3 observers
+    years = range(1950, 2051, 10)
+    ut = [float(ephem.Date((y, 3, 21, 3, 17, 0))) for y in years]
+    t = table(ut)
+    maxSha = maxDec = 0.0
+    for (j, n) in enumerate(NAMES):
+        for (k, d) in enumerate(ut):
+            s = starcat.navStar(n, d)
+            # SHA difference as arc on the sky (large for Polaris otherwise):
+            maxSha = max(maxSha, abs(((360 - np.degrees(s.ra)) - t['sha'][k, j] + 180) % 360 - 180)
+                    * np.cos(s.dec))
+            maxDec = max(maxDec, abs(np.degrees(s.dec) - t['dec'][k, j]))
+    print "SHA (x cos Dec)/Dec %d..%d: max. difference %.4f' / %.4f'" % (years[0], years[-1], maxSha * 60,
+            maxDec * 60)
+
+    obs = ephem.Observer()
+    maxAlt = maxAz = 0.0
+    for (lat, lon) in ((-30, -178), (0, 10), (45, 120)):
+        obs.lat = np.radians(lat)
+        obs.lon = np.radians(lon)
+        obs.date = (2013, 6, 28, 6, 0, 0)
+        obs.temp = 20
+        obs.pressure = 1010
+        t = table(obs.date, lat = lat, lon = lon)
+        for (j, n) in enumerate(NAMES):
+            s = starcat.navStar(n, obs)
+            if np.degrees(s.alt) > 5:
+                maxAlt = max(maxAlt, abs(np.degrees(s.alt) - t['alt'][0, j]))
+                maxAz = max(maxAz, abs(np.degrees(s.az) - t['az'][0, j]))
+    print "altitude/azimuth above 5 deg: max. difference %.4f' / %.4f'" % (maxAlt * 60, maxAz * 60)
+
+    ut = float(ephem.Date((2013, 6, 28))) + np.arange(1000) / 1000.0
+    t0 = time.time()
+    table(ut, lat = -18, lon = -178)
+    print '%d stars x %d UTs: %.1f ms' % (len(NAMES), len(ut), (time.time() - t0) * 1000)
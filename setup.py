@@ -148,7 +148,7 @@ setup(  name = 'CelNav',
         author = 'Markus Schweitzer',
         author_email = 'markus@namaniatsea.org',
         url = 'http://navigatrix.net/viewforum.php?f=21',
-        requires = [ 'ephem', 'Tkinter', 'ttk' ],
+        requires = [ 'ephem', 'numpy', 'Tkinter', 'ttk' ],
         provides = [ 'celnav' ],
         packages = [ 'celnav' ],
         data_files = dataFiles